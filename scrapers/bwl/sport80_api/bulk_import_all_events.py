@@ -1,32 +1,53 @@
 # bulk_import_all_events.py
 import os
+import sys
+import argparse
 import requests
 import logging
 from datetime import datetime, timezone
-import time
+from typing import Optional
+import asyncio
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
-from sport80 import SportEighty
+from sport80 import SportEighty, AsyncSportEighty, ResponseCache, RequestMetrics, Sport80FetchError, event_datetime, \
+    event_sort_key
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'shared'))
+from lifting_results_db import LiftingResultsWriter, LiftingResultRow, find_existing_event_ids
+from import_journal import ImportJournal, FETCHED, FORMATTED, INSERTED, SKIPPED
 
 # --- Configuration ---
 # Supabase Configuration
 SUPABASE_URL = os.environ.get("SUPABASE_URL")
 SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
 SUPABASE_TABLE_NAME = "lifting_results"
-SUPABASE_MEET_NAME_COLUMN = "meet"
+# Rows per upsert request
+SUPABASE_BATCH_SIZE = int(os.environ.get("SUPABASE_BATCH_SIZE", "500"))
+EXISTENCE_CHECK_CHUNK_SIZE = int(os.environ.get("EXISTENCE_CHECK_CHUNK_SIZE", "150"))  # event IDs per lookup
+EXISTENCE_CHECK_WORKERS = 4  # lookups in flight at once
 
 # Sport80 Configuration
 BWL_DOMAIN = "https://bwl.sport80.com"
+# Pages fetched at once when an event index or result set spans several pages
+SPORT80_PAGE_WORKERS = int(os.environ.get("SPORT80_PAGE_WORKERS", "8"))
+# On-disk response cache so reruns don't re-download unchanged pages, set to "" to turn it off
+SPORT80_CACHE_PATH = os.environ.get("SPORT80_CACHE_PATH", ".sport80_cache.sqlite")
+# Log every Sport80 request as a JSON line as well as the end of run summary
+SPORT80_JSON_LOGS = os.environ.get("SPORT80_JSON_LOGS", "").lower() in ("1", "true", "yes")
 
 # Years to scrape - adjust these to cover all historical data you want
 START_YEAR = 2014 # Adjust to earliest year you want to scrape
 END_YEAR = datetime.now(timezone.utc).year
 
 # Rate limiting to avoid overwhelming the API
-DELAY_BETWEEN_EVENTS = 1  # seconds between fetching each event's results
+SPORT80_MAX_CONCURRENCY = int(os.environ.get("SPORT80_MAX_CONCURRENCY", "20"))  # requests in flight at once
+IMPORT_FETCHERS = int(os.environ.get("IMPORT_FETCHERS", "8"))  # events being fetched at once
+PIPELINE_QUEUE_SIZE = 16  # meets held between stages, keeps memory flat if the writer falls behind
+
+# Checkpoint journal of each event's progress, --resume carries on from it without any network calls
+IMPORT_CHECKPOINT_PATH = os.environ.get("IMPORT_CHECKPOINT_PATH", "bulk_import_checkpoint.jsonl")
 
 # Slack Configuration (optional for notifications)
 SLACK_WEBHOOK_URL = os.environ.get("SLACK_WEBHOOK_URL")
@@ -39,113 +60,35 @@ logging.basicConfig(
 )
 
 
-def get_nested_value(data_dict, primary_key, column_name=None, sub_key="value"):
-    """
-    Helper to get values from potentially nested Sport80 data.
-    """
-    if column_name and "columns" in data_dict:
-        return data_dict.get("columns", {}).get(column_name, {}).get(sub_key)
-    return data_dict.get(primary_key)
-
-
 def parse_event_date(event_data_dict):
     """
-    Tries to parse a date string from event data into a datetime object.
+    The event's date as a UTC datetime, datetime.min (UTC) if it has none.
+    Events from the sport80 event index already carry a parsed_date, so this doesn't parse anything for them.
     """
-    date_str = get_nested_value(event_data_dict, "date", "Start Date") or \
-               get_nested_value(event_data_dict, "start_date")
-
-    if not date_str:
-        return datetime.min.replace(tzinfo=timezone.utc)
-
-    possible_formats = [
-        "%Y-%m-%d %H:%M:%S",
-        "%Y-%m-%d",
-        "%d/%m/%Y %H:%M:%S",
-        "%d/%m/%Y",
-        "%m/%d/%Y %H:%M:%S",
-        "%m/%d/%Y",
-    ]
-    for fmt in possible_formats:
-        try:
-            dt_str_part = str(date_str).split(" ")[0]
-            dt = datetime.strptime(dt_str_part, fmt)
-            return dt.replace(tzinfo=timezone.utc)
-        except (ValueError, TypeError):
-            continue
-    logging.warning(f"Could not parse date string: {date_str} for event.")
-    return datetime.min.replace(tzinfo=timezone.utc)
+    return event_datetime(event_data_dict)
 
 
 def filter_already_existing_event_ids(candidate_event_ids: list[str]) -> set[str]:
-    """Given a list of candidate event IDs, query Supabase to find which ones already exist."""
+    """Given a list of candidate event IDs, query Supabase to find which ones already exist for BWL."""
     if not candidate_event_ids:
         logging.info("No candidate event IDs provided to check for existence.")
         return set()
 
     if not SUPABASE_URL or not SUPABASE_KEY:
         logging.error("Supabase URL or Key not configured for checking event IDs.")
-        return set()
+        return set() # Return empty set, so script might try to re-add
 
-    # Filter by both event_id AND federation to avoid conflicts between BWL and USAW events
-    # We need to get DISTINCT event_ids since each event has multiple rows (one per lifter)
-    # Fetch in batches to handle large datasets
-    
-    existing_ids_in_db = set()
-    batch_size = 5000
-    offset = 0
-    total_rows_fetched = 0
-    
-    try:
-        logging.info(f"Querying Supabase for existing BWL event IDs...")
-        
-        while True:
-            url = f"{SUPABASE_URL}/rest/v1/{SUPABASE_TABLE_NAME}?select=event_id&federation=eq.BWL&limit={batch_size}&offset={offset}"
-            
-            headers = {
-                "apikey": SUPABASE_KEY,
-                "Authorization": f"Bearer {SUPABASE_KEY}",
-                "Accept": "application/json"
-            }
-            
-            resp = requests.get(url, headers=headers, timeout=45)
-            resp.raise_for_status()
-            
-            results = resp.json()
-            
-            if not results:
-                break  # No more results
-            
-            total_rows_fetched += len(results)
-            for row in results:
-                if "event_id" in row and row["event_id"]:
-                    existing_ids_in_db.add(str(row["event_id"]).strip())
-            
-            if len(results) < batch_size:
-                break  # Last batch
-            
-            offset += batch_size
-        
-        logging.info(f"Query returned {total_rows_fetched} total rows from database")
-        logging.info(f"Found {len(existing_ids_in_db)} unique BWL event IDs already in database")
-        
-        # Now filter to only return the candidate event IDs that exist
-        candidate_ids_set = set(candidate_event_ids)
-        matching_existing = existing_ids_in_db.intersection(candidate_ids_set)
-        logging.info(f"Of the {len(candidate_event_ids)} candidates, {len(matching_existing)} already exist in DB")
-        return matching_existing
-    except requests.exceptions.RequestException as e:
-        logging.error(f"Error querying Supabase for existing event IDs: {e}")
-        if hasattr(e, 'response') and e.response is not None:
-            logging.error(f"Supabase response content: {e.response.text}")
-        return set()
-    except ValueError:
-        logging.error(f"Error decoding JSON from Supabase event_id check")
-        return set()
+    # Only the candidates are looked up, in chunks checked concurrently, and only distinct event IDs come back
+    # (filtered by federation so BWL and USAW events with the same ID don't hide each other)
+    existing_ids_in_db = find_existing_event_ids(SUPABASE_URL, SUPABASE_KEY, candidate_event_ids, federation="BWL",
+                                                 table=SUPABASE_TABLE_NAME, chunk_size=EXISTENCE_CHECK_CHUNK_SIZE,
+                                                 max_workers=EXISTENCE_CHECK_WORKERS)
+    logging.info(f"Of the {len(candidate_event_ids)} candidates, {len(existing_ids_in_db)} already exist in DB")
+    return existing_ids_in_db
 
 
 def add_meet_results_to_supabase(results_to_insert: list):
-    """Insert a batch of results for a meet into Supabase."""
+    """Upsert a meet's results into Supabase in chunks, keyed on (event_id, name, federation)."""
     if not SUPABASE_URL or not SUPABASE_KEY:
         logging.error("Supabase URL or Key not configured for adding results.")
         return None
@@ -153,23 +96,14 @@ def add_meet_results_to_supabase(results_to_insert: list):
         logging.info("No results to insert.")
         return None
 
-    url = f"{SUPABASE_URL}/rest/v1/{SUPABASE_TABLE_NAME}"
-    headers = {
-        "apikey": SUPABASE_KEY,
-        "Authorization": f"Bearer {SUPABASE_KEY}",
-        "Content-Type": "application/json",
-        "Prefer": "return=minimal",
-    }
-    try:
-        resp = requests.post(url, headers=headers, json=results_to_insert, timeout=60)
-        resp.raise_for_status()
-        logging.info(f"Successfully inserted {len(results_to_insert)} results via Supabase API.")
-        return resp
-    except requests.exceptions.RequestException as e:
-        logging.error(f"Error inserting meet results to Supabase: {e}")
-        if hasattr(e, 'response') and e.response is not None:
-            logging.error(f"Supabase response content: {e.response.text}")
-        return None
+    writer = LiftingResultsWriter(SUPABASE_URL, SUPABASE_KEY, SUPABASE_TABLE_NAME, batch_size=SUPABASE_BATCH_SIZE)
+    upsert_result = writer.upsert(results_to_insert)
+    if upsert_result.ok:
+        logging.info(f"Successfully upserted {upsert_result.rows_written} results via Supabase API.")
+    else:
+        logging.error(f"Error upserting meet results to Supabase: {upsert_result.rows_failed} rows failed. "
+                      f"{upsert_result.failed_chunks}")
+    return upsert_result
 
 
 def fetch_all_events_from_sport80(api_client: SportEighty, start_year: int, end_year: int) -> list:
@@ -199,60 +133,179 @@ def fetch_all_events_from_sport80(api_client: SportEighty, start_year: int, end_
         return []
 
     # Sort by date (oldest first for bulk import to maintain chronological order)
-    all_event_dictionaries.sort(key=parse_event_date, reverse=False)
+    all_event_dictionaries.sort(key=event_sort_key, reverse=False)
     
     logging.info(f"Total event items fetched and sorted: {len(all_event_dictionaries)}")
     return all_event_dictionaries
 
 
-def fetch_meet_results_from_sport80(api_client: SportEighty, event_data_dict: dict) -> list:
+def format_meet_results(event_details: dict, detailed_results_list: list) -> list[LiftingResultRow]:
+    """Turn one meet's Sport80 result rows into lifting_results rows."""
+    current_event_id = event_details["id"]
+    current_meet_name = event_details["name"]
+    meet_date_obj = parse_event_date(event_details["data"])
+    meet_date_for_db = meet_date_obj.strftime("%Y-%m-%d") if meet_date_obj > datetime.min.replace(tzinfo=timezone.utc) else None
+
+    return [LiftingResultRow.from_sport80(result_item, current_event_id, current_meet_name, meet_date_for_db, "BWL")
+            for result_item in detailed_results_list]
+
+
+class ImportStats:
+    """Counters shared by the pipeline stages."""
+
+    def __init__(self):
+        self.added_meet_names = []
+        self.total_results_added = 0
+        self.skipped_count = 0
+        self.error_count = 0
+
+
+async def fetch_stage(api_client: AsyncSportEighty, events_queue: asyncio.Queue, results_queue: asyncio.Queue,
+                      stats: ImportStats, journal: ImportJournal):
+    """Fetcher: pulls events off events_queue and puts (event_details, raw result rows) on results_queue."""
+    while True:
+        event_details = await events_queue.get()
+        if event_details is None:
+            return
+        logging.info(f"Fetching results for meet: {event_details['name']}")
+        try:
+            results_dict = await api_client.event_results(event_details["data"])
+        except Sport80FetchError as e:
+            # Left out of the journal, so the next run fetches the whole meet again
+            logging.error(f"Incomplete results for {event_details['name']}, not importing it: {e}")
+            stats.error_count += 1
+            continue
+        except Exception as e:
+            logging.error(f"Error fetching results for {event_details['name']}: {e}")
+            results_dict = None
+        if isinstance(results_dict, dict) and results_dict:
+            journal.record(event_details["id"], FETCHED, len(results_dict))
+            await results_queue.put((event_details, list(results_dict.values())))
+        else:
+            logging.warning(f"No results found for '{event_details['name']}' (ID: {event_details['id']}).")
+            if results_dict is not None:
+                journal.record(event_details["id"], SKIPPED)
+            stats.skipped_count += 1
+
+
+async def format_stage(results_queue: asyncio.Queue, rows_queue: asyncio.Queue, stats: ImportStats,
+                       journal: ImportJournal):
+    """Formatter: turns raw result rows into lifting_results rows for the writer."""
+    try:
+        while True:
+            item = await results_queue.get()
+            if item is None:
+                break
+            event_details, detailed_results_list = item
+            formatted_results_for_supabase = format_meet_results(event_details, detailed_results_list)
+            if formatted_results_for_supabase:
+                journal.record(event_details["id"], FORMATTED, len(formatted_results_for_supabase))
+                await rows_queue.put((event_details, formatted_results_for_supabase))
+            else:
+                logging.warning(f"No results formatted for '{event_details['name']}'")
+                journal.record(event_details["id"], SKIPPED)
+                stats.skipped_count += 1
+    except BaseException:
+        end_of_stream(rows_queue)
+        raise
+    await rows_queue.put(None)
+
+
+async def fetch_stages(api_client: AsyncSportEighty, events_queue: asyncio.Queue, results_queue: asyncio.Queue,
+                       stats: ImportStats, journal: ImportJournal):
+    """IMPORT_FETCHERS fetchers at once, then tells the formatter there's nothing more coming."""
+    try:
+        await asyncio.gather(*(fetch_stage(api_client, events_queue, results_queue, stats, journal)
+                               for _ in range(IMPORT_FETCHERS)))
+    except BaseException:
+        end_of_stream(results_queue)
+        raise
+    await results_queue.put(None)
+
+
+def end_of_stream(queue: asyncio.Queue):
     """
-    Fetches results for a specific event.
+    Marks the end of a queue for a stage that's stopping early. Doesn't wait for room on a full queue, run_stages
+    is cancelling every other stage by then anyway.
     """
-    meet_name_for_log = get_nested_value(event_data_dict, "meet") or "Unknown Event"
     try:
-        if not (isinstance(event_data_dict.get("action"), list) and \
-                len(event_data_dict["action"]) > 0 and \
-                isinstance(event_data_dict["action"][0], dict) and \
-                "route" in event_data_dict["action"][0]):
-            logging.error(f"Event data for '{meet_name_for_log}' is missing 'action':'route' structure. Skipping.")
-            return []
-
-        logging.info(f"Fetching results for meet: {meet_name_for_log}")
-        results_dict = api_client.event_results(event_dict=event_data_dict)
-        if isinstance(results_dict, dict):
-            return list(results_dict.values())
-        logging.warning(f"event_results for {meet_name_for_log} did not return a dict: {type(results_dict)}")
-        return []
-    except Exception as e:
-        logging.error(f"Error fetching results for {meet_name_for_log}: {e}", exc_info=True)
-        return []
+        queue.put_nowait(None)
+    except asyncio.QueueFull:
+        pass
 
 
-def fetch_max_id_from_supabase() -> int:
-    """Fetch the highest ID value from the Supabase database."""
-    if not SUPABASE_URL or not SUPABASE_KEY:
-        logging.error("Supabase URL or Key not configured.")
-        return 0
-
-    url = f"{SUPABASE_URL}/rest/v1/{SUPABASE_TABLE_NAME}?select=id&order=id.desc&limit=1"
-    headers = {
-        "apikey": SUPABASE_KEY,
-        "Authorization": f"Bearer {SUPABASE_KEY}",
-    }
+async def run_stages(*stages):
+    """
+    Runs the pipeline stages together. The first one to raise cancels the others, so none is left blocked on a
+    full queue, and its exception is re-raised.
+    """
+    tasks = [asyncio.ensure_future(stage) for stage in stages]
     try:
-        resp = requests.get(url, headers=headers, timeout=30)
-        resp.raise_for_status()
-        results = resp.json()
-        if results and len(results) > 0:
-            return results[0]["id"]
-        return 0
-    except requests.exceptions.RequestException as e:
-        logging.error(f"Error fetching max ID from Supabase: {e}")
-        return 0
-    except (ValueError, KeyError, IndexError) as e:
-        logging.error(f"Error processing max ID from Supabase: {e}")
-        return 0
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def write_stage(rows_queue: asyncio.Queue, stats: ImportStats, journal: ImportJournal):
+    """Writer: gathers several meets into one upsert of at least SUPABASE_BATCH_SIZE rows, then checkpoints them."""
+    pending_events = []
+    pending_rows = []
+
+    async def flush():
+        if not pending_rows:
+            return
+        result = await asyncio.to_thread(add_meet_results_to_supabase, list(pending_rows))
+        if result and result.ok:
+            for event_details, row_count in pending_events:
+                stats.added_meet_names.append(event_details["name"])
+                stats.total_results_added += row_count
+                logging.info(f"✓ Added {row_count} results for '{event_details['name']}'")
+                journal.record(event_details["id"], INSERTED, row_count)
+        else:
+            stats.error_count += len(pending_events)
+            for event_details, _ in pending_events:
+                logging.error(f"✗ Failed to add results for '{event_details['name']}'")
+        pending_events.clear()
+        pending_rows.clear()
+
+    while True:
+        item = await rows_queue.get()
+        if item is None:
+            await flush()
+            return
+        event_details, formatted_results_for_supabase = item
+        pending_events.append((event_details, len(formatted_results_for_supabase)))
+        pending_rows.extend(formatted_results_for_supabase)
+        if len(pending_rows) >= SUPABASE_BATCH_SIZE:
+            await flush()
+
+
+async def import_events(events_to_import: list[dict], journal: ImportJournal, sport80_cache: ResponseCache = None,
+                        metrics: Optional[RequestMetrics] = None) -> tuple[list[str], int, int, int]:
+    """
+    Fetch -> format -> write pipeline over bounded queues.
+    IMPORT_FETCHERS fetchers pull event results at once, one formatter builds rows and one writer upserts them in
+    batches, recording each event's progress in the journal. If any stage raises, the rest are cancelled and the
+    exception comes out of here. Returns (added meet names, total results added, skipped count, error count).
+    """
+    stats = ImportStats()
+    events_queue = asyncio.Queue()
+    results_queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    rows_queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    for event_details in events_to_import:
+        events_queue.put_nowait(event_details)
+    for _ in range(IMPORT_FETCHERS):
+        events_queue.put_nowait(None)
+
+    async with AsyncSportEighty(BWL_DOMAIN, return_dict=True, max_concurrency=SPORT80_MAX_CONCURRENCY,
+                                cache=sport80_cache, metrics=metrics) as sport80_api:
+        await run_stages(fetch_stages(sport80_api, events_queue, results_queue, stats, journal),
+                         format_stage(results_queue, rows_queue, stats, journal),
+                         write_stage(rows_queue, stats, journal))
+
+    return stats.added_meet_names, stats.total_results_added, stats.skipped_count, stats.error_count
 
 
 def send_slack_notification(message: str):
@@ -271,22 +324,14 @@ def send_slack_notification(message: str):
         logging.error(f"Failed to send Slack notification: {e}")
 
 
-def main():
-    logging.info("="*80)
-    logging.info("Starting BULK Sport80 to Supabase import process...")
-    logging.info(f"Will scrape events from {START_YEAR} to {END_YEAR}")
-    logging.info("="*80)
-
-    if not SUPABASE_URL or not SUPABASE_KEY:
-        logging.critical("SUPABASE_URL and SUPABASE_KEY must be set. Exiting.")
-        return
-
-    # Send start notification
-    send_slack_notification(
-        f"🚀 Started bulk import of Sport80 events ({START_YEAR}-{END_YEAR})"
-    )
-
-    sport80_api = SportEighty(subdomain=BWL_DOMAIN, return_dict=True, debug=logging.WARNING)
+def plan_import(sport80_cache: ResponseCache = None,
+                metrics: Optional[RequestMetrics] = None) -> Optional[tuple[list[dict], int, int]]:
+    """
+    Walks every year's event index and drops events already in Supabase.
+    Returns (events to import, total candidate events, skipped count), or None if there is nothing to do.
+    """
+    sport80_api = SportEighty(subdomain=BWL_DOMAIN, return_dict=True, debug=logging.WARNING,
+                              page_workers=SPORT80_PAGE_WORKERS, cache=sport80_cache, metrics=metrics)
     
     # Fetch ALL events across all years
     all_events_data = fetch_all_events_from_sport80(sport80_api, START_YEAR, END_YEAR)
@@ -294,7 +339,7 @@ def main():
     if not all_events_data:
         logging.info("No events fetched from Sport80. Exiting.")
         send_slack_notification("⚠️ Bulk import completed: No events found")
-        return
+        return None
     
     logging.info(f"Total events fetched: {len(all_events_data)}")
 
@@ -323,7 +368,7 @@ def main():
 
     if not candidate_event_details:
         logging.info("No valid candidate events with IDs to process. Exiting.")
-        return
+        return None
 
     logging.info(f"Valid candidate events with IDs: {len(candidate_event_details)}")
 
@@ -335,23 +380,14 @@ def main():
     logging.info(f"Found {len(already_existing_event_ids_in_db)} already existing in database.")
     logging.info(f"Will process {len(candidate_ids_to_check_in_db) - len(already_existing_event_ids_in_db)} new events.")
 
-    max_id_in_db = fetch_max_id_from_supabase()
-    next_id_for_new_rows = max_id_in_db + 1
-    logging.info(f"Starting ID for new rows: {next_id_for_new_rows}")
-
     processed_event_ids_this_run = set()
-    added_meet_names = []
+    events_to_import = []
     skipped_count = 0
-    error_count = 0
-    total_results_added = 0
 
-    # Process each event
-    for idx, event_details in enumerate(candidate_event_details, 1):
+    # Work out which events actually need importing before fetching anything
+    for event_details in candidate_event_details:
         current_event_id = event_details["id"]
         current_meet_name = event_details["name"]
-        event_data_for_api = event_details["data"]
-
-        logging.info(f"[{idx}/{len(candidate_event_details)}] Processing: '{current_meet_name}' (ID: {current_event_id})")
 
         if not current_meet_name:
             logging.warning(f"Skipping event with ID '{current_event_id}' due to missing meet name.")
@@ -368,78 +404,71 @@ def main():
             skipped_count += 1
             continue
 
-        # Fetch detailed results
-        detailed_results_list = fetch_meet_results_from_sport80(sport80_api, event_data_for_api)
+        events_to_import.append(event_details)
+        processed_event_ids_this_run.add(current_event_id)
 
-        if not detailed_results_list:
-            logging.warning(f"No results found for '{current_meet_name}' (ID: {current_event_id}).")
-            processed_event_ids_this_run.add(current_event_id)
-            skipped_count += 1
-            continue
+    return events_to_import, len(candidate_event_details), skipped_count
 
-        # Format results for Supabase
-        formatted_results_for_supabase = []
-        meet_date_obj = parse_event_date(event_data_for_api)
-        meet_date_for_db = meet_date_obj.strftime("%Y-%m-%d") if meet_date_obj > datetime.min.replace(tzinfo=timezone.utc) else None
-
-        for result_item in detailed_results_list:
-            lifter_name = get_nested_value(result_item, "lifter", "Athlete") or get_nested_value(result_item, "name", "Name")
-            age_cat = get_nested_value(result_item, "age_category", "Age Category") or get_nested_value(result_item, "age", "Age")
-            body_w = get_nested_value(result_item, "body_weight_kg", "Bodyweight") or get_nested_value(result_item, "body_weight_(kg)")
-            sn1 = get_nested_value(result_item, "snatch_lift_1", "Snatch 1")
-            sn2 = get_nested_value(result_item, "snatch_lift_2", "Snatch 2")
-            sn3 = get_nested_value(result_item, "snatch_lift_3", "Snatch 3")
-            best_sn = get_nested_value(result_item, "best_snatch", "Best Snatch")
-            cj1 = get_nested_value(result_item, "cj_lift_1", "Clean & Jerk 1") or get_nested_value(result_item, "c&j_lift_1")
-            cj2 = get_nested_value(result_item, "cj_lift_2", "Clean & Jerk 2") or get_nested_value(result_item, "c&j_lift_2")
-            cj3 = get_nested_value(result_item, "cj_lift_3", "Clean & Jerk 3") or get_nested_value(result_item, "c&j_lift_3")
-            best_cj = get_nested_value(result_item, "best_cj", "Best Clean & Jerk") or get_nested_value(result_item, "best_c&j")
-            total_lifted = get_nested_value(result_item, "total", "Total")
-
-            formatted_results_for_supabase.append({
-                "id": next_id_for_new_rows,
-                "event_id": current_event_id,
-                SUPABASE_MEET_NAME_COLUMN: current_meet_name,
-                "date": meet_date_for_db,
-                "name": lifter_name,
-                "age": age_cat,
-                "body_weight": body_w,
-                "snatch1": sn1, "snatch2": sn2, "snatch3": sn3, "snatch_best": best_sn,
-                "cj1": cj1, "cj2": cj2, "cj3": cj3, "cj_best": best_cj,
-                "total": total_lifted,
-                "federation": "BWL",
-            })
-            next_id_for_new_rows += 1
-
-        # Insert to Supabase
-        if formatted_results_for_supabase:
-            result = add_meet_results_to_supabase(formatted_results_for_supabase)
-            if result:
-                added_meet_names.append(current_meet_name)
-                total_results_added += len(formatted_results_for_supabase)
-                logging.info(f"✓ Added {len(formatted_results_for_supabase)} results for '{current_meet_name}'")
-            else:
-                error_count += 1
-                logging.error(f"✗ Failed to add results for '{current_meet_name}'")
-        else:
-            logging.warning(f"No results formatted for '{current_meet_name}'")
-            skipped_count += 1
-        
-        processed_event_ids_this_run.add(current_event_id)
-        
-        # Rate limiting to be nice to the API
-        time.sleep(DELAY_BETWEEN_EVENTS)
+
+def main(resume: bool = False):
+    logging.info("="*80)
+    logging.info("Starting BULK Sport80 to Supabase import process...")
+    logging.info(f"Will scrape events from {START_YEAR} to {END_YEAR}")
+    logging.info("="*80)
+
+    if not SUPABASE_URL or not SUPABASE_KEY:
+        logging.critical("SUPABASE_URL and SUPABASE_KEY must be set. Exiting.")
+        return
+
+    # Send start notification
+    send_slack_notification(
+        f"🚀 Started bulk import of Sport80 events ({START_YEAR}-{END_YEAR})"
+    )
+
+    sport80_cache = ResponseCache(SPORT80_CACHE_PATH) if SPORT80_CACHE_PATH else None
+    metrics = RequestMetrics(json_logs=SPORT80_JSON_LOGS)
+    journal = ImportJournal(IMPORT_CHECKPOINT_PATH)
+    if resume:
+        resumed = journal.resume()
+        if resumed is None:
+            return
+        events_to_import, event_states = resumed
+        total_events = len(events_to_import) + sum(1 for entry in event_states.values()
+                                                     if entry["state"] in (INSERTED, SKIPPED))
+        skipped_count = 0
+        logging.info(f"Resuming from {IMPORT_CHECKPOINT_PATH}: {len(events_to_import)} of {total_events} "
+                     f"planned events still to import.")
+    else:
+        planned_import = plan_import(sport80_cache, metrics)
+        if planned_import is None:
+            return
+        events_to_import, total_events, skipped_count = planned_import
+        journal.start(events_to_import)
+
+    try:
+        added_meet_names, total_results_added, import_skipped_count, error_count = asyncio.run(
+            import_events(events_to_import, journal, sport80_cache, metrics)
+        )
+    except Exception as e:
+        logging.critical(f"Bulk import stopped: {e}. Run with --resume to carry on from the checkpoint journal.",
+                         exc_info=True)
+        send_slack_notification(f"❌ Bulk import stopped: {e}")
+        raise
+    finally:
+        journal.close()
+    skipped_count += import_skipped_count
 
     # Final summary
     logging.info("="*80)
     logging.info("BULK IMPORT SUMMARY")
     logging.info("="*80)
-    logging.info(f"Total events processed: {len(candidate_event_details)}")
+    logging.info(f"Total events processed: {total_events}")
     logging.info(f"Successfully added: {len(added_meet_names)} meets")
     logging.info(f"Total results added: {total_results_added}")
     logging.info(f"Skipped (already exist or no results): {skipped_count}")
     logging.info(f"Errors: {error_count}")
     logging.info("="*80)
+    metrics.write_summary("BWL bulk import: Sport80 requests")
 
     # Send completion notification
     summary_message = (
@@ -452,6 +481,14 @@ def main():
     send_slack_notification(summary_message)
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Bulk import every BWL event on Sport80 into Supabase.")
+    parser.add_argument("--resume", action="store_true",
+                        help=f"Carry on from the checkpoint journal at {IMPORT_CHECKPOINT_PATH} instead of walking "
+                             f"the event index again. Events already inserted or skipped are not touched.")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    main()
+    main(resume=parse_args().resume)
 
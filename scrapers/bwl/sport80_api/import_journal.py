@@ -0,0 +1,79 @@
+# import_journal.py
+"""
+Append-only JSONL checkpoint journal for bulk_import_all_events.py.
+
+The first line is the plan: every event the run is going to import. After that each line moves one event
+through its states (fetched -> formatted -> inserted, or skipped when Sport80 has no results for it) along
+with a row count. Resuming reads the plan and the latest state per event back, so no event index walk or
+Supabase existence check is needed, and only events that never reached inserted/skipped are worked on again.
+Fetched/formatted events are fetched again on resume; with the sport80 response cache on that is a disk read.
+"""
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+
+FETCHED = "fetched"
+FORMATTED = "formatted"
+INSERTED = "inserted"
+SKIPPED = "skipped"
+DONE_STATES = {INSERTED, SKIPPED}
+
+
+class ImportJournal:
+    """Checkpoint journal at path, one JSON object per line."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def start(self, events: list[dict]):
+        """Begin a fresh journal for this run, replacing any earlier one."""
+        self.close()
+        self._file = open(self.path, "w", encoding="utf-8", buffering=1)
+        self._write({"plan": events, "started_at": datetime.now(timezone.utc).isoformat()})
+
+    def resume(self) -> Optional[tuple[list[dict], dict[str, dict]]]:
+        """
+        Reopen an existing journal for appending.
+        Returns (events still to do, latest state per event ID), or None if there is no usable journal.
+        """
+        events = None
+        states = {}
+        try:
+            with open(self.path, encoding="utf-8") as journal_file:
+                for line in journal_file:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # A half-written last line from a killed run
+                    if "plan" in entry:
+                        events = entry["plan"]
+                    elif "event_id" in entry:
+                        states[entry["event_id"]] = entry
+        except FileNotFoundError:
+            logging.error(f"No checkpoint journal at {self.path} to resume from.")
+            return None
+        if events is None:
+            logging.error(f"Checkpoint journal at {self.path} has no plan line, can't resume from it.")
+            return None
+
+        self.close()
+        self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+        pending = [event for event in events if states.get(event["id"], {}).get("state") not in DONE_STATES]
+        return pending, states
+
+    def record(self, event_id: str, state: str, rows: int = 0):
+        """Move an event to a new state."""
+        self._write({"event_id": event_id, "state": state, "rows": rows,
+                     "at": datetime.now(timezone.utc).isoformat()})
+
+    def _write(self, entry: dict):
+        if self._file is None:
+            raise RuntimeError("Journal not started; call start() or resume() first.")
+        self._file.write(json.dumps(entry) + "\n")
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
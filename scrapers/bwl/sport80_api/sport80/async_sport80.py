@@ -0,0 +1,328 @@
+""" Async version of the client for pulling lots of events at once """
+import asyncio
+import logging
+import time
+from typing import Union, Optional
+from urllib.parse import urljoin
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+from .pages_enum import EndPoint, LegacyEndPoint
+from .request_dataclasses import FilterByYear, RequestHeaders
+from .response_cache import ResponseCache
+from .event_dates import EventDateParser, event_sort_key
+from .instrumentation import RequestMetrics
+from .exceptions import Sport80FetchError
+from .sport80_http_client import AUTH_ERRORS, RETRY_STATUSES
+from .helpers import pull_tables, convert_to_json, collate_index, event_dict_to_list, remaining_page_urls, \
+    parse_domain_env, event_id_from_dict, retry_delay
+
+
+class AsyncSportEightyHTTP:
+    """ Same calls as SportEightyHTTP but on a pooled httpx.AsyncClient, capped at max_concurrency requests """
+
+    def __init__(self, domain: str, return_dict: bool = True, max_concurrency: int = 10, timeout: float = 60.0,
+                 cache: Optional[ResponseCache] = None, metrics: Optional[RequestMetrics] = None,
+                 max_retries: int = 4, backoff_seconds: float = 0.5):
+        if httpx is None:
+            raise ImportError("AsyncSportEighty needs httpx, install it with: pip install sport80[async]")
+        self.domain: str = domain
+        self.return_dict: bool = return_dict
+        self.cache: Optional[ResponseCache] = cache
+        self.metrics: RequestMetrics = metrics or RequestMetrics()
+        self.max_concurrency: int = max(1, max_concurrency)
+        self.max_retries: int = max(0, max_retries)
+        self.backoff_seconds: float = backoff_seconds
+        self.date_parser = EventDateParser()
+        self.http_session = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=self.max_concurrency,
+                                max_keepalive_connections=self.max_concurrency))
+        self.domain_env: dict = {}
+        self.standard_headers: dict = {}
+        self.__request_slots = asyncio.Semaphore(self.max_concurrency)
+        self.__env_lock = asyncio.Lock()
+
+    async def close(self):
+        """ Closes the connection pool """
+        await self.http_session.aclose()
+
+    async def load_domain_env(self, stale_headers: Optional[dict] = None) -> dict:
+        """
+        Pulls window.env once, every other call waits on the first one.
+        Passing the headers that just got an auth error pulls it again, unless another call already has.
+        """
+        async with self.__env_lock:
+            refresh = stale_headers is not None and stale_headers is self.standard_headers
+            if not self.domain_env or refresh:
+                cached_env = self.cache.lookup_domain_env(self.domain) if self.cache and not refresh else None
+                if cached_env:
+                    self.domain_env = cached_env
+                else:
+                    get_page = await self.__timed("GET", EndPoint.INDEX_PAGE.name,
+                                                  urljoin(self.domain, EndPoint.INDEX_PAGE.value))
+                    self.domain_env = parse_domain_env(get_page.text)
+                    if self.cache and self.domain_env:
+                        self.cache.store_domain_env(self.domain, self.domain_env)
+                self.standard_headers = RequestHeaders(self.domain_env['SERVICES_API_PUBLIC_KEY'],
+                                                       self.domain_env['RANKINGS_DOMAIN_URL']).as_dict()
+        return self.domain_env
+
+    async def __api_url(self, end_point: str) -> str:
+        """ Joins the endpoint onto the rankings domain """
+        await self.load_domain_env()
+        return urljoin(self.domain_env['RANKINGS_DOMAIN_URL'], end_point)
+
+    async def __timed(self, method: str, endpoint: str, url: str, **kwargs):
+        """
+        Sends one request once a slot is free, recording how long it took and how much came back.
+        Retried the same way as SportEightyHTTP, the slot is given back while waiting to retry
+        """
+        attempt = 0
+        while True:
+            async with self.__request_slots:
+                started = time.perf_counter()
+                try:
+                    response = await self.http_session.request(method, url, **kwargs)
+                except httpx.HTTPError as e:
+                    self.metrics.record_request(endpoint, url, None, time.perf_counter() - started, 0)
+                    if not isinstance(e, httpx.TransportError) or attempt >= self.max_retries:
+                        raise
+                    response = None
+            if response is not None:
+                self.metrics.record_request(endpoint, url, response.status_code, time.perf_counter() - started,
+                                            len(response.content))
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+                delay = retry_delay(attempt, self.backoff_seconds, response.headers.get("Retry-After"))
+            else:
+                delay = retry_delay(attempt, self.backoff_seconds)
+            self.metrics.record_retry(endpoint)
+            logging.warning("Retrying %s in %.1fs (%s/%s)", url, delay, attempt + 1, self.max_retries)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def __post(self, api_url: str, payload: Optional[dict] = None, required: bool = False,
+                     event_date: Optional[str] = None) -> Optional[dict]:
+        """
+        Single POST call through the response cache if there is one.
+        If it didn't come back ok that's None, or a Sport80FetchError when required
+        """
+        endpoint = EndPoint.name_for_url(api_url)
+        cached = self.cache.lookup(api_url, payload) if self.cache else None
+        if cached and cached.is_fresh():
+            self.metrics.record_cache_hit(endpoint)
+            return cached.json()
+        standard_headers = self.standard_headers
+        headers = {**standard_headers, **cached.validators()} if cached else standard_headers
+        get_page = await self.__timed("POST", endpoint, api_url, headers=headers, json=payload)
+        if get_page.status_code in AUTH_ERRORS:
+            # The cached window.env may hold an API key that's since been rotated
+            self.metrics.record_retry(endpoint)
+            await self.load_domain_env(stale_headers=standard_headers)
+            headers = {**self.standard_headers, **cached.validators()} if cached else self.standard_headers
+            get_page = await self.__timed("POST", endpoint, api_url, headers=headers, json=payload)
+        if get_page.status_code == 304 and cached:
+            self.metrics.record_revalidated(endpoint)
+            self.cache.revalidated(api_url, payload, event_date)
+            return cached.json()
+        if not get_page.is_success:
+            logging.warning("POST %s returned %s", api_url, get_page.status_code)
+            if required:
+                raise Sport80FetchError(api_url, status=get_page.status_code)
+            return None
+        page = get_page.json()
+        if self.cache and self.cache.worth_storing(page):
+            self.cache.store(api_url, payload, get_page.content, get_page.headers, event_date=event_date)
+        return page
+
+    async def __next_page(self, next_url: str, payload: Optional[dict] = None,
+                          event_date: Optional[str] = None) -> dict:
+        """ Any page after the first, raises Sport80FetchError rather than letting the results come back short """
+        try:
+            return await self.__post(next_url, payload, required=True, event_date=event_date)
+        except httpx.HTTPError as e:
+            raise Sport80FetchError(next_url, reason=str(e)) from e
+
+    async def __collate_results(self, page_one: dict, payload: Optional[dict] = None,
+                                event_date: Optional[str] = None) -> dict:
+        """
+        Fetches every page after the first at once if the page count can be worked out, else walks them.
+        Raises Sport80FetchError if any of them still fails after retrying
+        """
+        all_pages = {0: page_one}
+        page_urls = remaining_page_urls(page_one)
+        if page_urls:
+            fetched_pages = await asyncio.gather(*(self.__next_page(page_url, payload, event_date)
+                                                   for page_url in page_urls))
+            all_pages.update(enumerate(fetched_pages, start=1))
+            return all_pages
+
+        current_page = page_one
+        index = 1
+        while current_page.get('next_page_url'):
+            next_page = await self.__next_page(current_page['next_page_url'], payload, event_date)
+            all_pages[index] = next_page
+            current_page = next_page
+            index += 1
+        return all_pages
+
+    async def get_event_index(self, year: int) -> dict:
+        """ Fetches the event index per year """
+        year_filter = FilterByYear(year)
+        return await self.get_event_index_range(year_filter.start_date, year_filter.end_date)
+
+    async def get_event_index_range(self, a_date: str, z_date: str) -> dict:
+        """ Fetches the event index between two YYYY-MM-DD dates """
+        api_url = await self.__api_url(EndPoint.EVENT_INDEX.value)
+        payload = {"date_range_start": a_date, "date_range_end": z_date}
+        front_page = await self.__post(api_url, payload)
+        if not front_page:
+            return {}
+        return self.date_parser.attach(collate_index(await self.__collate_results(front_page, payload)))
+
+    async def get_event_results(self, event_dict: dict) -> Union[list, dict, None]:
+        """ Uses the integer that follows the event url API, None if the first page couldn't be fetched """
+        api_url = await self.__api_url(EndPoint.event_results_url(event_id_from_dict(event_dict)))
+        event_date = event_sort_key(event_dict) or None  # recent events are cached for less time
+        front_page = await self.__post(api_url, event_date=event_date)
+        if not front_page:
+            return None
+        combined_data = collate_index(await self.__collate_results(front_page, event_date=event_date))
+        if self.return_dict:
+            return combined_data
+        return event_dict_to_list(combined_data)
+
+    async def get_lifter_data(self, lifter_id) -> Optional[dict]:
+        """ Historical performance of a lifter  """
+        api_url = await self.__api_url(EndPoint.lifter_url(lifter_id))
+        front_page = await self.__post(api_url)
+        if front_page:
+            return await self.__collate_results(front_page)
+        return None
+
+    async def get_rankings(self, a_date: str, z_date: str, additional_args=None) -> list[dict]:
+        """ Returns a dict containing the rankings for the given date range """
+        api_url = await self.__api_url(EndPoint.ALL_RANKINGS.value + "?p=0&l=1000&sort=&d=&s=")
+        payload = {"date_range_start": a_date, "date_range_end": z_date}
+        if additional_args:
+            payload.update(additional_args)
+        front_page = await self.__post(api_url, payload)
+        if not front_page:
+            return []
+        collated_pages = await self.__collate_results(front_page, payload)
+        return [item for sublist in collated_pages.values() for item in sublist['data']]
+
+    async def get_start_list(self, event_id: str) -> Union[list, dict]:
+        """ Returns a specific upcoming events start list """
+        api_url = urljoin(self.domain, LegacyEndPoint.START_LIST.value + event_id)
+        get_page = await self.__timed("GET", LegacyEndPoint.START_LIST.name, api_url)
+        start_list = pull_tables(get_page)
+        if self.return_dict:
+            return convert_to_json(start_list)
+        return start_list
+
+
+class AsyncSportEighty:
+    """
+    Async twin of SportEighty. Use it as an async context manager so the connection pool gets closed:
+
+        async with AsyncSportEighty("https://bwl.sport80.com", max_concurrency=20) as api:
+            results = await api.event_results_many(events)
+    """
+
+    def __init__(self, subdomain: str, return_dict=True, max_concurrency: int = 10, timeout: float = 60.0,
+                 cache: ResponseCache = None, metrics: Optional[RequestMetrics] = None, max_retries: int = 4,
+                 backoff_seconds: float = 0.5):
+        """
+        :param subdomain: Full URL of the sport80 site, e.g. https://bwl.sport80.com
+        :param return_dict: Return results as dicts rather than lists
+        :param max_concurrency: Most requests in flight at once, also the size of the connection pool
+        :param timeout: Per request timeout in seconds
+        :param cache: Optional ResponseCache so repeat calls are served from disk
+        :param metrics: Optional RequestMetrics to count requests into, available as .metrics either way
+        :param max_retries: Times a transport error, 429 or 5xx is sent again before giving up
+        :param backoff_seconds: Base of the exponential backoff between retries, a Retry-After header wins over it.
+        A page after the first that still fails raises Sport80FetchError instead of returning a short result set
+        """
+        self.__http_client = AsyncSportEightyHTTP(subdomain, return_dict=return_dict,
+                                                  max_concurrency=max_concurrency, timeout=timeout, cache=cache,
+                                                  metrics=metrics, max_retries=max_retries,
+                                                  backoff_seconds=backoff_seconds)
+        self.metrics: RequestMetrics = self.__http_client.metrics
+
+    async def __aenter__(self):
+        await self.__http_client.load_domain_env()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def close(self):
+        """ Closes the connection pool """
+        await self.__http_client.close()
+
+    async def event_index(self, year: int) -> dict[dict]:
+        """
+        Returns a dict containing all events for the given year
+        :param year: Integer for the year you want to search
+        :return: dict containing all events for the given year, each with a parsed_date of YYYY-MM-DD or None
+        """
+        return await self.__http_client.get_event_index(year)
+
+    async def event_index_range(self, a_date: str, z_date: str) -> dict[dict]:
+        """
+        Returns a dict containing all events between two dates
+        :param a_date:  Start date in format YYYY-MM-DD
+        :param z_date:  End date in format YYYY-MM-DD
+        :return: dict containing all events in the date range, each with a parsed_date of YYYY-MM-DD or None
+        """
+        return await self.__http_client.get_event_index_range(a_date, z_date)
+
+    async def event_results(self, event_dict: dict) -> Union[list, dict, None]:
+        """
+        Returns a dict or list containing the results for the given event
+        :param event_dict: The event dict from event_index()
+        :return: Default is a dict of dicts containing the results for the given event, this is configurable in the
+        init with the return_dict parameter. None if the first page couldn't be fetched, like SportEighty
+        """
+        return await self.__http_client.get_event_results(event_dict)
+
+    async def event_results_many(self, event_dicts: list[dict]) -> list:
+        """
+        Fetches the results for every event passed in at once, still capped by max_concurrency
+        :param event_dicts: Event dicts from event_index()
+        :return: List in the same order as event_dicts, holding either the results or the exception that was raised
+        """
+        return await asyncio.gather(*(self.event_results(event_dict) for event_dict in event_dicts),
+                                    return_exceptions=True)
+
+    async def start_list(self, event_id: str) -> Union[list, dict]:
+        """
+        Returns a dict or list containing the start list for the given event
+        :param event_id: The event id from event_index()
+        :return: Default is a dict of dicts containing the start list for the given event, this is configurable in the
+        init with the return_dict parameter
+        """
+        return await self.__http_client.get_start_list(event_id)
+
+    async def lifter_history(self, lifter_id: int) -> Optional[dict]:
+        """ Returns a dict containing a lifter history.
+        The lifter_id does NOT correlate to the membership number
+        :param lifter_id: The lifter id from event_index()
+        :return: dict of the raw result pages for the lifter
+        """
+        return await self.__http_client.get_lifter_data(lifter_id)
+
+    async def rankings(self, a_date: str, z_date: str, additional_args: dict = None) -> list[dict]:
+        """
+        Returns a dict containing the rankings for the given date range
+        :param a_date:  Start date in format YYYY-MM-DD
+        :param z_date:  End date in format YYYY-MM-DD
+        :param additional_args:  Additional arguments such as weight category available from ranking_filters()
+        :return:  List of dicts containing the rankings
+        """
+        return await self.__http_client.get_rankings(a_date, z_date, additional_args)
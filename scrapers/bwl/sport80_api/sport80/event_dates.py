@@ -0,0 +1,85 @@
+""" Parses event dates once, when the event index is collated, so sorting never has to """
+import re
+from datetime import datetime, timezone
+from typing import Optional
+
+PARSED_DATE_KEY = "parsed_date"
+MIN_DATE = datetime.min.replace(tzinfo=timezone.utc)
+
+# Tried in this order until one fits, day first before month first for the ambiguous slash dates, the same
+# precedence every time so 03/04/2024 always comes out as 3 April
+SLASH_DATE = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})(?:$|[ T])")
+DATE_LAYOUTS = (
+    ("YMD", re.compile(r"(\d{4})-(\d{1,2})-(\d{1,2})(?:$|[ T])")),
+    ("DMY", SLASH_DATE),
+    ("MDY", SLASH_DATE),
+)
+FIELD_ORDER = {"YMD": (0, 1, 2), "DMY": (2, 1, 0), "MDY": (2, 0, 1)}
+
+
+def event_date_string(event_dict: dict) -> Optional[str]:
+    """ The raw date off an event, from the Start Date column if it has columns, else the date/start_date keys """
+    if "columns" in event_dict:
+        date_str = event_dict.get("columns", {}).get("Start Date", {}).get("value")
+    else:
+        date_str = event_dict.get("date")
+    return date_str or event_dict.get("start_date")
+
+
+class EventDateParser:
+    """
+    Tries the DATE_LAYOUTS in their fixed order, or only the ones it's pinned to, so the same string always parses
+    to the same date. Pin a source whose slash dates are month first with layouts=("YMD", "MDY")
+    """
+
+    def __init__(self, layouts: Optional[tuple] = None):
+        self.layouts: tuple = tuple(layout for layout in DATE_LAYOUTS if layouts is None or layout[0] in layouts)
+
+    def parse(self, date_str) -> Optional[str]:
+        """ YYYY-MM-DD for the date string, None if it isn't a date in any of the layouts """
+        if not date_str:
+            return None
+        date_str = str(date_str).strip()
+        for name, pattern in self.layouts:
+            match = pattern.match(date_str)
+            if not match:
+                continue
+            year, month, day = (int(match.group(index + 1)) for index in FIELD_ORDER[name])
+            if 1 <= month <= 12 and 1 <= day <= _days_in_month(year, month):
+                return f"{year:04d}-{month:02d}-{day:02d}"
+        return None
+
+    def stamp(self, event_dict: dict) -> dict:
+        """ Sets PARSED_DATE_KEY on a single event, None where there's no usable date """
+        event_dict[PARSED_DATE_KEY] = self.parse(event_date_string(event_dict))
+        return event_dict
+
+    def attach(self, events: dict) -> dict:
+        """ Stamps every event in a collated index """
+        for event_dict in events.values():
+            self.stamp(event_dict)
+        return events
+
+
+def _days_in_month(year: int, month: int) -> int:
+    if month == 2:
+        return 29 if year % 4 == 0 and (year % 100 != 0 or year % 400 == 0) else 28
+    return 30 if month in (4, 6, 9, 11) else 31
+
+
+_fallback_parser = EventDateParser()
+
+
+def event_sort_key(event_dict: dict) -> str:
+    """ Sort key for events, the ISO date sorts the same as the date itself and undated events go first """
+    if PARSED_DATE_KEY not in event_dict:
+        event_dict[PARSED_DATE_KEY] = _fallback_parser.parse(event_date_string(event_dict))
+    return event_dict[PARSED_DATE_KEY] or ""
+
+
+def event_datetime(event_dict: dict) -> datetime:
+    """ The event date as a UTC datetime, datetime.min (UTC) if it doesn't have one """
+    iso_date = event_sort_key(event_dict)
+    if not iso_date:
+        return MIN_DATE
+    return datetime(int(iso_date[:4]), int(iso_date[5:7]), int(iso_date[8:10]), tzinfo=timezone.utc)
@@ -0,0 +1,13 @@
+""" Errors raised by the clients rather than handing back a short result set """
+from typing import Optional
+
+
+class Sport80FetchError(Exception):
+    """ A page of a paginated call couldn't be fetched, even after retrying, so what came back so far is incomplete """
+
+    def __init__(self, url: str, status: Optional[int] = None, reason: str = ""):
+        self.url: str = url
+        self.status: Optional[int] = status
+        self.reason: str = reason
+        detail = f"HTTP {status}" if status is not None else (reason or "no response")
+        super().__init__(f"Failed to fetch {url}: {detail}")
@@ -1,5 +1,7 @@
 """ Throw all the endpoint strings in here """
 import enum
+import re
+from urllib.parse import urlsplit
 
 
 class LegacyEndPoint(enum.Enum):
@@ -37,3 +39,18 @@ class EndPoint(enum.Enum):
         """ Simple method for creating the correct API call """
         api_url = f"/api/categories/{category_id}/rankings/table"
         return api_url
+
+    @staticmethod
+    def name_for_url(url: str) -> str:
+        """ Works backwards from a full API URL to the name of the endpoint it was built from """
+        path = urlsplit(url).path
+        for end_point in EndPoint:
+            if path == end_point.value:
+                return end_point.name
+        if re.fullmatch(r"/api/events/\d+/table/data", path):
+            return "EVENT_RESULTS"
+        if re.fullmatch(r"/api/athletes/\d+/table/data", path):
+            return "LIFTER"
+        if re.fullmatch(r"/api/categories/\d+/rankings/table", path):
+            return "RANKINGS_TABLE"
+        return "OTHER"
@@ -0,0 +1,201 @@
+""" On-disk cache for API responses so reruns and backfills don't hit sport80 again """
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Optional
+
+from .pages_enum import EndPoint
+
+HOUR = 60 * 60
+DAY = 24 * HOUR
+
+
+@dataclass
+class CachedResponse:
+    """ A single stored response body and the validators sport80 sent with it """
+    body: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+    expires_at: Optional[float]
+
+    def is_fresh(self) -> bool:
+        """ True if the TTL hasn't run out yet, a None expiry never runs out """
+        return self.expires_at is None or self.expires_at > time.time()
+
+    def validators(self) -> dict:
+        """ Headers for a conditional request, empty if the server never sent any validators """
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def json(self):
+        """ Decoded body, same as Response.json() """
+        return json.loads(self.body)
+
+
+class ResponseCache:
+    """
+    SQLite backed store keyed by URL and payload.
+    Each endpoint gets its own TTL (see EndPoint.name_for_url for the names), stale entries with an ETag or
+    Last-Modified are revalidated with a conditional request, and the least recently used entries are dropped once
+    the stored bodies go over max_bytes.
+    Event results only get their long TTL once the event is settled_after_days old. Until then results can still be
+    going up, so they're kept for recent_results_ttl, and pages with no rows at all aren't stored (see worth_storing).
+    The window.env dict each domain needs before any API call is kept here too, for env_ttl seconds.
+    """
+
+    DEFAULT_TTLS = {
+        EndPoint.EVENT_INDEX.name: 30 * 60,  # new events get added through the day
+        "EVENT_RESULTS": 30 * DAY,  # results don't change once the event is done, see recent_results_ttl
+        "LIFTER": DAY,
+        EndPoint.ALL_RANKINGS.name: DAY,
+        "RANKINGS_TABLE": DAY,
+    }
+
+    def __init__(self, path: str = ".sport80_cache.sqlite", ttls: Optional[dict] = None, default_ttl: int = HOUR,
+                 max_bytes: int = 512 * 1024 * 1024, env_ttl: int = DAY, settled_after_days: int = 30,
+                 recent_results_ttl: int = 6 * HOUR):
+        """
+        :param path: SQLite file to keep the responses in, ":memory:" works for a throwaway cache
+        :param ttls: Seconds to keep each endpoint for, merged over DEFAULT_TTLS. None means keep forever
+        :param default_ttl: Seconds to keep anything not in ttls
+        :param max_bytes: Total size of stored bodies before least recently used entries get evicted
+        :param env_ttl: Seconds to keep each domain's window.env before pulling the index page again
+        :param settled_after_days: Days after the event date before its results count as final
+        :param recent_results_ttl: Seconds to keep results of events newer than that, or with no known date
+        """
+        self.path: str = path
+        self.ttls: dict = {**self.DEFAULT_TTLS, **(ttls or {})}
+        self.default_ttl: int = default_ttl
+        self.max_bytes: int = max_bytes
+        self.env_ttl: int = env_ttl
+        self.settled_after_days: int = settled_after_days
+        self.recent_results_ttl: int = recent_results_ttl
+        self.__lock = threading.Lock()
+        self.__db = sqlite3.connect(path, check_same_thread=False)
+        self.__db.execute("""CREATE TABLE IF NOT EXISTS responses (
+                                 key TEXT PRIMARY KEY,
+                                 url TEXT NOT NULL,
+                                 body BLOB NOT NULL,
+                                 size INTEGER NOT NULL,
+                                 etag TEXT,
+                                 last_modified TEXT,
+                                 expires_at REAL,
+                                 last_accessed REAL NOT NULL)""")
+        self.__db.execute("CREATE INDEX IF NOT EXISTS responses_last_accessed ON responses (last_accessed)")
+        self.__db.execute("""CREATE TABLE IF NOT EXISTS domain_env (
+                                 domain TEXT PRIMARY KEY,
+                                 env TEXT NOT NULL,
+                                 expires_at REAL NOT NULL)""")
+        self.__db.commit()
+
+    @staticmethod
+    def make_key(url: str, payload: Optional[dict] = None) -> str:
+        """ Same URL with the same JSON payload is the same request """
+        raw_key = url + "\n" + json.dumps(payload, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(raw_key.encode("utf-8")).hexdigest()
+
+    def ttl_for(self, url: str, event_date: Optional[str] = None) -> Optional[int]:
+        """
+        TTL in seconds for the endpoint the URL belongs to.
+        event_date (YYYY-MM-DD) is the date of the event whose results these are, None if it isn't known
+        """
+        end_point = EndPoint.name_for_url(url)
+        if end_point == "EVENT_RESULTS" and not self.is_settled(event_date):
+            return self.recent_results_ttl
+        return self.ttls.get(end_point, self.default_ttl)
+
+    def is_settled(self, event_date: Optional[str]) -> bool:
+        """ True if the event was long enough ago that its results won't change any more """
+        try:
+            held_on = date.fromisoformat(event_date)
+        except (TypeError, ValueError):
+            return False
+        return held_on <= date.today() - timedelta(days=self.settled_after_days)
+
+    @staticmethod
+    def worth_storing(page) -> bool:
+        """ False for a page with an empty data list, e.g. a meet whose results haven't been posted yet """
+        return not (isinstance(page, dict) and isinstance(page.get("data"), list) and not page["data"])
+
+    def __expiry(self, url: str, event_date: Optional[str] = None) -> Optional[float]:
+        ttl = self.ttl_for(url, event_date)
+        return None if ttl is None else time.time() + ttl
+
+    def lookup(self, url: str, payload: Optional[dict] = None) -> Optional[CachedResponse]:
+        """ Returns the stored response whether it's fresh or not, None if there isn't one """
+        key = self.make_key(url, payload)
+        with self.__lock:
+            row = self.__db.execute("SELECT body, etag, last_modified, expires_at FROM responses WHERE key = ?",
+                                    (key,)).fetchone()
+            if row is None:
+                return None
+            self.__db.execute("UPDATE responses SET last_accessed = ? WHERE key = ?", (time.time(), key))
+            self.__db.commit()
+        return CachedResponse(*row)
+
+    def store(self, url: str, payload: Optional[dict], body: bytes, headers=None,
+              event_date: Optional[str] = None) -> None:
+        """
+        Saves a response body along with any ETag/Last-Modified it came with, then trims the cache.
+        event_date is the event's YYYY-MM-DD for event results, see ttl_for
+        """
+        headers = headers or {}
+        now = time.time()
+        with self.__lock:
+            self.__db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                              (self.make_key(url, payload), url, body, len(body), headers.get("ETag"),
+                               headers.get("Last-Modified"), self.__expiry(url, event_date), now))
+            self.__evict()
+            self.__db.commit()
+
+    def revalidated(self, url: str, payload: Optional[dict] = None, event_date: Optional[str] = None) -> None:
+        """ Server came back with a 304, so the stored body is good for another TTL """
+        with self.__lock:
+            self.__db.execute("UPDATE responses SET expires_at = ?, last_accessed = ? WHERE key = ?",
+                              (self.__expiry(url, event_date), time.time(), self.make_key(url, payload)))
+            self.__db.commit()
+
+    def __evict(self) -> None:
+        """ Drops least recently used entries until the stored bodies fit under max_bytes """
+        total_size = self.__db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total_size <= self.max_bytes:
+            return
+        for key, size in self.__db.execute("SELECT key, size FROM responses ORDER BY last_accessed").fetchall():
+            if total_size <= self.max_bytes:
+                break
+            self.__db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total_size -= size
+
+    def lookup_domain_env(self, domain: str) -> Optional[dict]:
+        """ The stored window.env for the domain, None if there isn't one or it's past env_ttl """
+        with self.__lock:
+            row = self.__db.execute("SELECT env FROM domain_env WHERE domain = ? AND expires_at > ?",
+                                    (domain, time.time())).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def store_domain_env(self, domain: str, domain_env: dict) -> None:
+        """ Keeps the window.env for the domain for env_ttl seconds """
+        with self.__lock:
+            self.__db.execute("INSERT OR REPLACE INTO domain_env VALUES (?, ?, ?)",
+                              (domain, json.dumps(domain_env), time.time() + self.env_ttl))
+            self.__db.commit()
+
+    def clear(self) -> None:
+        """ Empties the cache """
+        with self.__lock:
+            self.__db.execute("DELETE FROM responses")
+            self.__db.execute("DELETE FROM domain_env")
+            self.__db.commit()
+
+    def close(self) -> None:
+        """ Closes the SQLite connection """
+        with self.__lock:
+            self.__db.close()
@@ -1,23 +1,53 @@
 """ Busy backend shit """
 import logging
-import json
-import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urljoin
-from typing import Union, Optional
+from typing import Union, Optional, Iterator
 import requests
+from requests.adapters import HTTPAdapter
 
 from .pages_enum import EndPoint, LegacyEndPoint
-from .helpers import pull_tables, convert_to_json, collate_index, event_dict_to_list
+from .response_cache import ResponseCache
+from .event_dates import EventDateParser, event_sort_key
+from .instrumentation import RequestMetrics
+from .exceptions import Sport80FetchError
+from .helpers import pull_tables, convert_to_json, collate_index, event_dict_to_list, remaining_page_urls, \
+    parse_domain_env, event_id_from_dict, date_windows, dedupe_rows, retry_delay
+
+AUTH_ERRORS = (401, 403, 419)
+# Worth sending again: rate limited, or sport80's gateway had a moment
+RETRY_STATUSES = (408, 429, 500, 502, 503, 504)
+# (connect, read) seconds for every request, so a connection that hangs raises Timeout and gets retried
+DEFAULT_TIMEOUT = (10, 60)
 
 
 class SportEightyHTTP:
     """ Contains all the big annoying functions so the main API file is nice and neat """
 
-    def __init__(self, domain: str, return_dict: bool = True, debug_lvl: logging = logging.WARNING):
-        self.http_session = requests.Session()
+    def __init__(self, domain: str, return_dict: bool = True, debug_lvl: logging = logging.WARNING,
+                 page_workers: int = 1, cache: Optional[ResponseCache] = None,
+                 session: Optional[requests.Session] = None, metrics: Optional[RequestMetrics] = None,
+                 max_retries: int = 4, backoff_seconds: float = 0.5,
+                 timeout: Optional[tuple[float, float]] = DEFAULT_TIMEOUT):
+        self.http_session = session or requests.Session()
+        self.metrics: RequestMetrics = metrics or RequestMetrics()
         self.domain: str = domain
         self.return_dict: bool = return_dict
+        self.cache: Optional[ResponseCache] = cache
+        self.page_workers: int = max(1, page_workers)
+        self.max_retries: int = max(0, max_retries)
+        self.backoff_seconds: float = backoff_seconds
+        self.timeout: Optional[tuple[float, float]] = timeout
+        self.date_parser = EventDateParser()
+        if session is None:
+            # Default pool only keeps 10 connections per host, anything above that gets thrown away after each page
+            pooled_adapter = HTTPAdapter(pool_maxsize=max(10, self.page_workers))
+            self.http_session.mount("https://", pooled_adapter)
+            self.http_session.mount("http://", pooled_adapter)
         logging.basicConfig(level=debug_lvl)
+        self.__env_lock = threading.Lock()
         self.domain_env = self.pull_domain_env()
         self.standard_headers = self.load_standard_headers()
 
@@ -31,52 +61,59 @@ class SportEightyHTTP:
 
     def app_data(self):
         """ Fetches OpenAPI server details """
-        get_page = self.http_session.get(self.domain_env['CORE_SERVICE_API_URL'])
+        get_page = self.http_session.get(self.domain_env['CORE_SERVICE_API_URL'], timeout=self.timeout)
         return get_page.json()
 
-    def pull_domain_env(self) -> dict:
+    def pull_domain_env(self, refresh: bool = False) -> dict:
         """ On both BWL and USAW sites, there is a JS dict needed for the API calls to work """
-        get_page = requests.get(urljoin(self.domain, EndPoint.INDEX_PAGE.value))
-        page_data = get_page.text
-        reggie = re.compile(r"window.env = ({.*?});", re.DOTALL)
-        match = reggie.search(page_data)
-        if match:
-            try:
-                py_dict = json.loads(match.group(1))
-                return py_dict
-            except json.JSONDecodeError:
-                return {}
-        return {}
+        if self.cache and not refresh:
+            cached_env = self.cache.lookup_domain_env(self.domain)
+            if cached_env:
+                return cached_env
+        index_url = urljoin(self.domain, EndPoint.INDEX_PAGE.value)
+        get_page = self.__timed("GET", EndPoint.INDEX_PAGE.name, index_url)
+        domain_env = parse_domain_env(get_page.text)
+        if self.cache and domain_env:
+            self.cache.store_domain_env(self.domain, domain_env)
+        return domain_env
+
+    def __refresh_domain_env(self, stale_headers: dict) -> None:
+        """ Pulls window.env again after an auth error, unless another thread already has """
+        with self.__env_lock:
+            if self.standard_headers is stale_headers:
+                print("Auth error from the API, pulling window.env again")
+                self.domain_env = self.pull_domain_env(refresh=True)
+                self.standard_headers = self.load_standard_headers()
 
     def test_token(self, token: str):
         api_url = urljoin(self.domain_env['RANKINGS_DOMAIN_URL'], EndPoint.RANKINGS_INDEX.value)
-        get_page = self.http_session.get(api_url, headers={"X-API-TOKEN": token})
+        get_page = self.http_session.get(api_url, headers={"X-API-TOKEN": token}, timeout=self.timeout)
         if get_page.status_code == 200:
             return True
 
     def test_core_api(self):
         api_url = "https://core.sport80.com/api/docs"
-        get_page = self.http_session.get(api_url, headers=self.standard_headers)
+        get_page = self.http_session.get(api_url, headers=self.standard_headers, timeout=self.timeout)
         if get_page.ok:
             return get_page.json()
 
     def get_weight_class(self):
         api_url = urljoin(self.domain_env['RANKINGS_DOMAIN_URL'], EndPoint.RANKINGS_DATA.value)
-        get_page = self.http_session.get(api_url, headers=self.standard_headers)
+        get_page = self.http_session.get(api_url, headers=self.standard_headers, timeout=self.timeout)
         if get_page.ok:
             return get_page.json()
 
     def get_ranking_index(self):
         """ Working """
         api_url = urljoin(self.domain_env['RANKINGS_DOMAIN_URL'], EndPoint.RANKINGS_INDEX.value)
-        get_page = self.http_session.get(api_url, headers=self.standard_headers)
+        get_page = self.http_session.get(api_url, headers=self.standard_headers, timeout=self.timeout)
         if get_page.ok:
             return get_page.json()['cards']
 
     def __get_rankings_table(self, category):
         """ Simple GET call for the ranking category specified """
         api_url = urljoin(self.domain_env['RANKINGS_DOMAIN_URL'], EndPoint.rankings_url(category))
-        get_page = self.http_session.get(api_url, headers=self.standard_headers)
+        get_page = self.http_session.get(api_url, headers=self.standard_headers, timeout=self.timeout)
         return get_page.json()
 
     def quick_ranking_search(self):
@@ -94,112 +131,232 @@ class SportEightyHTTP:
     def get_rankings_table(self, category, a_date, z_date, wt_class):
         api_url = urljoin(self.domain_env['RANKINGS_DOMAIN_URL'], EndPoint.rankings_url(category))
         payload = {"date_range_start": a_date, "date_range_end": z_date, "weight_class": wt_class}
-        get_page = self.http_session.get(api_url, headers=self.standard_headers)
+        get_page = self.http_session.get(api_url, headers=self.standard_headers, timeout=self.timeout)
         return get_page.json()
 
     def get_rankings(self, a_date: str, z_date: str, additional_args=None) -> list[dict]:
         """ Returns a dict containing the rankings for the given date range """
-        results = []
+        return self.__rankings(a_date, z_date, additional_args)
+
+    def get_rankings_windowed(self, a_date: str, z_date: str, window_days: int = 31, workers: int = 4,
+                              additional_args=None) -> list[dict]:
+        """
+        get_rankings split into date windows fetched at once, the same result turning up in two windows kept once.
+        Each row's rank is its position within its own window, not across the whole range.
+        Raises Sport80FetchError if a window can't be fetched, rather than leaving its rows out
+        """
+        windows = date_windows(a_date, z_date, window_days)
+        print(f"Fetching rankings from {a_date} to {z_date} in {len(windows)} windows with {workers} workers")
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            window_rows = list(pool.map(lambda window: self.__rankings(*window, additional_args, required=True),
+                                        windows))
+        return dedupe_rows(row for rows in window_rows for row in rows)
+
+    def __rankings(self, a_date: str, z_date: str, additional_args=None, required: bool = False) -> list[dict]:
+        """ Every ranking row for the date range, [] if the first page fails unless required, then it raises """
         api_url = urljoin(self.domain_env['RANKINGS_DOMAIN_URL'], EndPoint.ALL_RANKINGS.value + "?p=0&l=1000&sort=&d=&s=")
         payload = {"date_range_start": a_date, "date_range_end": z_date}
         if additional_args:
             payload.update(additional_args)
-        get_page = self.http_session.post(api_url, headers=self.standard_headers, json=payload)
-        if get_page.ok:
-            front_page = get_page.json()
-            collated_pages = self.__collate_results(front_page, payload)
-            results = [item for sublist in collated_pages.values() for item in sublist['data']]
-        return results
+        front_page = self.__post(api_url, payload, required=required)
+        if not front_page:
+            return []
+        collated_pages = self.__collate_results(front_page, payload)
+        return [item for sublist in collated_pages.values() for item in sublist['data']]
 
     def get_ranking_filters(self):
         api_url = urljoin(self.domain_env['RANKINGS_DOMAIN_URL'], "/api/categories/rankings/table")
-        get_page = self.http_session.get(api_url, headers=self.standard_headers)
+        get_page = self.http_session.get(api_url, headers=self.standard_headers, timeout=self.timeout)
         if get_page.ok:
             return get_page.json()
 
     def get_event_index(self, year: int) -> dict:
         """ Fetches the event index per year """
+        return self.get_event_index_range(f"{year}-01-01", f"{year}-12-31")
+
+    def get_event_index_range(self, a_date: str, z_date: str) -> dict:
+        """ Fetches the event index between two YYYY-MM-DD dates """
         api_url = urljoin(self.domain_env['RANKINGS_DOMAIN_URL'], EndPoint.EVENT_INDEX.value)
-        payload = {"date_range_start": f"{year}-01-01", "date_range_end": f"{year}-12-31"}
-        print(f"Fetching events for {year} with payload:", payload)
+        payload = {"date_range_start": a_date, "date_range_end": z_date}
+        print(f"Fetching events from {a_date} to {z_date} with payload:", payload)
         
-        get_page = self.http_session.post(api_url, headers=self.standard_headers, json=payload)
-        if not get_page.ok:
-            print(f"Error fetching events: {get_page.status_code}")
+        response = self.__post(api_url, payload)
+        if not response:
+            print("Error fetching events")
             return {}
-            
-        response = get_page.json()
+
         print(f"Total events: {response.get('total', 'unknown')}")
         print(f"Items per page: {response.get('items_per_page', 'unknown')}")
         print(f"Current page: {response.get('current_page', 'unknown')}")
-        
-        if get_page.ok:
-            page_data = self.__collate_results(response, payload)
-            print(f"Number of pages collected: {len(page_data)}")
-            for page_num, page in page_data.items():
-                print(f"Page {page_num} has {len(page.get('data', []))} events")
-            
-            collated_index = collate_index(page_data)
-            print(f"Total events after collation: {len(collated_index)}")
-            return collated_index
+
+        page_data = self.__collate_results(response, payload)
+        print(f"Number of pages collected: {len(page_data)}")
+        for page_num, page in page_data.items():
+            print(f"Page {page_num} has {len(page.get('data', []))} events")
+
+        collated_index = self.date_parser.attach(collate_index(page_data))
+        print(f"Total events after collation: {len(collated_index)}")
+        return collated_index
+
+    def iter_event_index_range(self, a_date: str, z_date: str) -> Iterator[dict]:
+        """ Yields the events between two YYYY-MM-DD dates a page at a time, each with its parsed_date """
+        api_url = urljoin(self.domain_env['RANKINGS_DOMAIN_URL'], EndPoint.EVENT_INDEX.value)
+        payload = {"date_range_start": a_date, "date_range_end": z_date}
+        front_page = self.__post(api_url, payload)
+        if not front_page:
+            print("Error fetching events")
+            return
+        for page in self.__iter_pages(front_page, payload):
+            for event_dict in page.get('data', []):
+                yield self.date_parser.stamp(event_dict)
 
     def get_event_results(self, event_dict: dict):
         """ Uses the integer that follows the event url API """
-        # todo: below line needs serious refactoring
-        event_id: str = event_dict['action'][0]['route'].split('/')[-1]
+        event_id: str = event_id_from_dict(event_dict)
+        event_date = event_sort_key(event_dict) or None  # recent events are cached for less time
         api_url = urljoin(self.domain_env['RANKINGS_DOMAIN_URL'], EndPoint.event_results_url(event_id))
-        get_page = self.http_session.post(api_url, headers=self.standard_headers)
-        collated_pages = self.__collate_results(get_page.json())
-        combined_data = collate_index(collated_pages)
-        if get_page.ok and self.return_dict:
+        front_page = self.__post(api_url, event_date=event_date)
+        if not front_page:
+            return None
+        combined_data = collate_index(self.__collate_results(front_page, event_date=event_date))
+        if self.return_dict:
             return combined_data
-        if get_page.ok and not self.return_dict:
-            return event_dict_to_list(combined_data)
+        return event_dict_to_list(combined_data)
+
+    def iter_event_results(self, event_dict: dict) -> Iterator[dict]:
+        """ Yields the result rows for an event a page at a time, without collating the pages first """
+        event_id: str = event_id_from_dict(event_dict)
+        event_date = event_sort_key(event_dict) or None
+        api_url = urljoin(self.domain_env['RANKINGS_DOMAIN_URL'], EndPoint.event_results_url(event_id))
+        front_page = self.__post(api_url, event_date=event_date)
+        if not front_page:
+            return
+        for page in self.__iter_pages(front_page, event_date=event_date):
+            yield from page.get('data', [])
 
-    def __collate_results(self, page_one: dict, payload: Optional[dict] = None) -> dict:
+    def __collate_results(self, page_one: dict, payload: Optional[dict] = None,
+                          event_date: Optional[str] = None) -> dict:
         """ Cycles through the passed dict and checks for a URL """
-        all_pages = {0: page_one}
+        return dict(enumerate(self.__iter_pages(page_one, payload, event_date)))
+
+    def __iter_pages(self, page_one: dict, payload: Optional[dict] = None,
+                     event_date: Optional[str] = None) -> Iterator[dict]:
+        """
+        Yields page_one and then every page after it in order, each one as soon as it's been fetched.
+        A page that still fails after retrying raises Sport80FetchError, the pages before it have been yielded already
+        """
+        yield page_one
+        if self.page_workers > 1 and page_one.get('next_page_url'):
+            page_urls = remaining_page_urls(page_one)
+            if page_urls:
+                yield from self.__iter_pages_concurrently(page_urls, payload, event_date)
+                return
+
         current_page = page_one
         index = 1
-        
         while current_page.get('next_page_url'):
             print(f"Fetching page {index} from {current_page['next_page_url']}")
-            next_page = self.__next_page(current_page['next_page_url'], payload)
-            if not next_page:
-                print(f"Failed to fetch page {index}")
-                break
-                
-            all_pages[index] = next_page
+            next_page = self.__next_page(current_page['next_page_url'], payload, event_date)
+            yield next_page
             current_page = next_page
             index += 1
-            
-        return all_pages
 
-    def __next_page(self, next_url: str, payload: Optional[dict] = None) -> Optional[dict]:
-        """ Designed around the events dict """
+    def __iter_pages_concurrently(self, page_urls: list[str], payload: Optional[dict] = None,
+                                  event_date: Optional[str] = None) -> Iterator[dict]:
+        """ Same as __iter_pages but the pages after the first are all requested at once, still yielded in order """
+        print(f"Fetching {len(page_urls)} pages with {self.page_workers} workers")
+        pool = ThreadPoolExecutor(max_workers=self.page_workers)
         try:
-            get_page = self.http_session.post(next_url, headers=self.standard_headers, json=payload)
-            if get_page.ok:
-                return get_page.json()
-            print(f"Error fetching next page: {get_page.status_code}")
-            return None
-        except Exception as e:
-            print(f"Exception fetching next page: {e}")
+            yield from pool.map(lambda page_url: self.__next_page(page_url, payload, event_date), page_urls)
+        finally:
+            # Stopping early (a failed page, or the caller breaking out) shouldn't wait on pages nobody will read
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def __next_page(self, next_url: str, payload: Optional[dict] = None,
+                    event_date: Optional[str] = None) -> dict:
+        """ Any page after the first, raises Sport80FetchError rather than letting the results come back short """
+        try:
+            return self.__post(next_url, payload, required=True, event_date=event_date)
+        except requests.exceptions.RequestException as e:
+            raise Sport80FetchError(next_url, reason=str(e)) from e
+
+    def __timed(self, method: str, endpoint: str, url: str, **kwargs) -> requests.Response:
+        """
+        Sends one request and records how long it took and how much came back.
+        Dropped connections, timeouts and RETRY_STATUSES are sent again up to max_retries times, waiting for the
+        Retry-After header if there is one or backing off exponentially with jitter if not
+        """
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                response = self.http_session.request(method, url, timeout=self.timeout, **kwargs)
+            except requests.exceptions.RequestException as e:
+                self.metrics.record_request(endpoint, url, None, time.perf_counter() - started, 0)
+                transient = isinstance(e, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+                if not transient or attempt >= self.max_retries:
+                    raise
+                delay = retry_delay(attempt, self.backoff_seconds)
+                reason = type(e).__name__
+            else:
+                self.metrics.record_request(endpoint, url, response.status_code, time.perf_counter() - started,
+                                            len(response.content))
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+                delay = retry_delay(attempt, self.backoff_seconds, response.headers.get("Retry-After"))
+                reason = f"HTTP {response.status_code}"
+            self.metrics.record_retry(endpoint)
+            print(f"{reason} from {url}, retrying in {delay:.1f}s ({attempt + 1}/{self.max_retries})")
+            time.sleep(delay)
+            attempt += 1
+
+    def __post(self, api_url: str, payload: Optional[dict] = None, required: bool = False,
+              event_date: Optional[str] = None) -> Optional[dict]:
+        """
+        POSTs to the API through the response cache if there is one.
+        If the call wasn't ok that's None, or a Sport80FetchError when required
+        """
+        endpoint = EndPoint.name_for_url(api_url)
+        cached = self.cache.lookup(api_url, payload) if self.cache else None
+        if cached and cached.is_fresh():
+            self.metrics.record_cache_hit(endpoint)
+            return cached.json()
+        standard_headers = self.standard_headers
+        headers = {**standard_headers, **cached.validators()} if cached else standard_headers
+        get_page = self.__timed("POST", endpoint, api_url, headers=headers, json=payload)
+        if get_page.status_code in AUTH_ERRORS:
+            # The cached window.env may hold an API key that's since been rotated
+            self.metrics.record_retry(endpoint)
+            self.__refresh_domain_env(standard_headers)
+            headers = {**self.standard_headers, **cached.validators()} if cached else self.standard_headers
+            get_page = self.__timed("POST", endpoint, api_url, headers=headers, json=payload)
+        if get_page.status_code == 304 and cached:
+            self.metrics.record_revalidated(endpoint)
+            self.cache.revalidated(api_url, payload, event_date)
+            return cached.json()
+        if not get_page.ok:
+            print(f"Error fetching {api_url}: {get_page.status_code}")
+            if required:
+                raise Sport80FetchError(api_url, status=get_page.status_code)
             return None
+        page = get_page.json()
+        if self.cache and self.cache.worth_storing(page):
+            self.cache.store(api_url, payload, get_page.content, get_page.headers, event_date=event_date)
+        return page
 
     def get_lifter_data(self, lifter_id):
         """ Historical performance of a lifter  """
         api_url = urljoin(self.domain_env['RANKINGS_DOMAIN_URL'], EndPoint.lifter_url(lifter_id))
-        get_page = self.http_session.post(api_url, headers=self.standard_headers)
-        if get_page.ok:
-            return self.__collate_results(get_page.json())
+        front_page = self.__post(api_url)
+        if front_page:
+            return self.__collate_results(front_page)
 
     # LEGACY CODE THAT STILL WORKS
     def get_upcoming_events(self) -> Union[list, dict]:
         """ Returns the upcoming events list """
         logging.info("get_upcoming_events called")
         api_url = urljoin(self.domain, LegacyEndPoint.UPCOMING_EVENTS.value)
-        get_page = self.http_session.get(api_url)
+        get_page = self.http_session.get(api_url, timeout=self.timeout)
         upcoming_events = pull_tables(get_page)
         if self.return_dict:
             return convert_to_json(upcoming_events)
@@ -209,7 +366,7 @@ class SportEightyHTTP:
         """ Returns a specific upcoming events start list """
         logging.info("get_start_list called")
         api_url = urljoin(self.domain, LegacyEndPoint.START_LIST.value + event_id)
-        get_page = self.http_session.get(api_url)
+        get_page = self.http_session.get(api_url, timeout=self.timeout)
         start_list = pull_tables(get_page)
         if self.return_dict:
             return convert_to_json(start_list)
@@ -0,0 +1,8 @@
+# conftest.py
+"""Puts the BWL scripts and scrapers/shared on the path for the tests."""
+import os
+import sys
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TESTS_DIR))
+sys.path.insert(0, os.path.join(TESTS_DIR, "..", "..", "..", "shared"))
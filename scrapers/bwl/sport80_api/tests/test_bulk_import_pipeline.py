@@ -0,0 +1,62 @@
+# test_bulk_import_pipeline.py
+"""The bulk import's fetch -> format -> write pipeline, with Sport80 and Supabase faked out."""
+import asyncio
+
+import pytest
+
+pytest.importorskip("dotenv")
+
+import bulk_import_all_events as bulk_import  # noqa: E402
+from import_journal import ImportJournal, INSERTED  # noqa: E402
+
+EVENTS = [{"id": str(event_id), "name": f"BWL Open {event_id}", "data": {"date": "2024-05-04"}}
+          for event_id in range(300, 340)]
+
+
+class FakeSportEighty:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def event_results(self, event_dict):
+        return {index: {"lifter": f"Lifter {index}", "total": "150"} for index in range(3)}
+
+
+@pytest.fixture
+def pipeline(monkeypatch, tmp_path):
+    monkeypatch.setattr(bulk_import, "AsyncSportEighty", FakeSportEighty)
+    monkeypatch.setattr(bulk_import, "PIPELINE_QUEUE_SIZE", 1)
+    monkeypatch.setattr(bulk_import, "SUPABASE_BATCH_SIZE", 1)
+    journal = ImportJournal(str(tmp_path / "journal.jsonl"))
+    journal.start(EVENTS)
+    yield journal
+    journal.close()
+
+
+def run_import(journal: ImportJournal):
+    return asyncio.run(asyncio.wait_for(bulk_import.import_events(EVENTS, journal), timeout=10))
+
+
+def test_every_event_goes_through(monkeypatch, pipeline):
+    written = []
+    monkeypatch.setattr(bulk_import, "add_meet_results_to_supabase",
+                        lambda rows: written.extend(rows) or type("Result", (), {"ok": True})())
+    added_meet_names, total_results_added, skipped_count, error_count = run_import(pipeline)
+    assert len(added_meet_names) == len(EVENTS) and total_results_added == len(written) == 3 * len(EVENTS)
+    assert (skipped_count, error_count) == (0, 0)
+    assert all(entry["state"] == INSERTED for entry in pipeline.resume()[1].values())
+
+
+@pytest.mark.parametrize("failing_stage", ["format_meet_results", "add_meet_results_to_supabase"])
+def test_a_failing_stage_stops_the_import(monkeypatch, pipeline, failing_stage):
+    def fail(*args):
+        raise RuntimeError(f"{failing_stage} broke")
+
+    monkeypatch.setattr(bulk_import, failing_stage, fail)
+    with pytest.raises(RuntimeError, match="broke"):
+        run_import(pipeline)
@@ -0,0 +1,318 @@
+# lifting_results_db.py
+"""
+Shared Supabase (PostgREST) access for the lifting_results table, used by the USAW and BWL sync scripts,
+the BWL bulk importer, the lifter history crawler and the USAMW results scraper, and the LiftingResultRow every one
+of them builds. They import it from here after putting scrapers/shared on sys.path:
+
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'shared'))
+    from lifting_results_db import LiftingResultsWriter, LiftingResultRow
+
+Rows are upserted on the natural key (event_id, name, federation) rather than given ids from a max(id) read,
+so reruns and other scrapers writing at the same time can't produce duplicates. Checking which events are already
+loaded asks for distinct event IDs only, through the lifting_results_existing_event_ids RPC when it exists (falling
+back to a plain select=event_id per chunk when it doesn't). The unique constraint, the generated id and the RPC come
+from migrations/001_lifting_results_natural_key.sql next to this file, which has to be run on the database first.
+
+Every row in an upsert batch has the same keys, adaptive included (null when the scraper doesn't know it), since
+PostgREST rejects a bulk insert whose objects don't all have the same keys (PGRST102).
+"""
+import logging
+import math
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from operator import attrgetter
+from typing import Iterable, Optional, Union
+
+import requests
+
+LIFTING_RESULTS_TABLE = "lifting_results"
+NATURAL_KEY = ("event_id", "name", "federation")
+EXISTING_EVENT_IDS_RPC = "lifting_results_existing_event_ids"
+
+# Worth retrying: rate limited, or the gateway/database had a moment
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+# Every lifting_results column a scraper writes, all of them go in every row sent
+ROW_COLUMNS = ("event_id", "meet", "date", "name", "age", "body_weight", "snatch1", "snatch2", "snatch3",
+               "snatch_best", "cj1", "cj2", "cj3", "cj_best", "total", "federation", "adaptive")
+_json_values = attrgetter(*ROW_COLUMNS)
+
+
+# Sport80 result row keys and the column each is shown under when a row comes in the nested
+# {"columns": {column: {"value": ...}}} shape
+SPORT80_COLUMN_NAMES = {
+    "lifter": "Athlete", "name": "Name", "age_category": "Age Category", "age": "Age", "body_weight_kg": "Bodyweight",
+    "snatch_lift_1": "Snatch 1", "snatch_lift_2": "Snatch 2", "snatch_lift_3": "Snatch 3", "best_snatch": "Best Snatch",
+    "cj_lift_1": "Clean & Jerk 1", "cj_lift_2": "Clean & Jerk 2", "cj_lift_3": "Clean & Jerk 3",
+    "best_cj": "Best Clean & Jerk", "total": "Total",
+}
+
+
+@lru_cache(maxsize=8192, typed=True)
+def parse_number(value) -> Optional[Union[int, float]]:
+    """
+    A lift or bodyweight cell as a number: whole kilos as int, anything else as float, a missed attempt keeps
+    its minus sign. Blank, dash and unreadable cells are None, and so are NaN and infinity, which PostgREST
+    would reject as invalid JSON along with the rest of the chunk. Cached, the same few hundred values come up
+    over and over in a backfill.
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if not isinstance(value, float):
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            pass
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return None
+    if not math.isfinite(value):
+        return None
+    return int(value) if value.is_integer() else value
+
+
+def best_lift(*attempts) -> int:
+    """The heaviest made attempt, 0 if every attempt was missed or skipped."""
+    return max((attempt for attempt in attempts if attempt and attempt > 0), default=0)
+
+
+class LiftingResultRow:
+    """
+    One lifting_results row. Numeric columns are parsed once, when the row is built, and __slots__ keeps a
+    bulk import's worth of rows small. to_json() is the dict that goes into an upsert batch.
+    """
+    __slots__ = ROW_COLUMNS
+
+    def __init__(self, event_id: str, meet: Optional[str], date: Optional[str], name: Optional[str],
+                 age: Optional[str] = None, body_weight=None, snatch1=None, snatch2=None, snatch3=None,
+                 snatch_best=None, cj1=None, cj2=None, cj3=None, cj_best=None, total=None,
+                 federation: Optional[str] = None, adaptive: Optional[bool] = None):
+        self.event_id = event_id
+        self.meet = meet
+        self.date = date
+        self.name = name
+        self.age = age
+        self.body_weight = parse_number(body_weight)
+        self.snatch1 = parse_number(snatch1)
+        self.snatch2 = parse_number(snatch2)
+        self.snatch3 = parse_number(snatch3)
+        self.snatch_best = parse_number(snatch_best)
+        self.cj1 = parse_number(cj1)
+        self.cj2 = parse_number(cj2)
+        self.cj3 = parse_number(cj3)
+        self.cj_best = parse_number(cj_best)
+        self.total = parse_number(total)
+        self.federation = federation
+        self.adaptive = adaptive
+
+    @classmethod
+    def from_sport80(cls, result_item: dict, event_id: str, meet: Optional[str], date: Optional[str],
+                     federation: str) -> "LiftingResultRow":
+        """Build a row from one Sport80 result row, flat or in the nested columns shape."""
+        if "columns" in result_item:
+            columns = result_item["columns"]
+            result_item = {**result_item, **{key: columns.get(column_name, {}).get("value")
+                                             for key, column_name in SPORT80_COLUMN_NAMES.items()}}
+        get = result_item.get
+        return cls(
+            event_id, meet, date,
+            name=get("lifter") or get("name"),
+            age=get("age_category") or get("age"),
+            body_weight=get("body_weight_kg") or get("body_weight_(kg)"),
+            snatch1=get("snatch_lift_1"), snatch2=get("snatch_lift_2"), snatch3=get("snatch_lift_3"),
+            snatch_best=get("best_snatch"),
+            cj1=get("cj_lift_1") or get("c&j_lift_1"),
+            cj2=get("cj_lift_2") or get("c&j_lift_2"),
+            cj3=get("cj_lift_3") or get("c&j_lift_3"),
+            cj_best=get("best_cj") or get("best_c&j"),
+            total=get("total"),
+            federation=federation,
+        )
+
+    @property
+    def key(self) -> tuple:
+        """The natural key the upsert resolves conflicts on."""
+        return self.event_id, self.name, self.federation
+
+    def to_json(self) -> dict:
+        return dict(zip(ROW_COLUMNS, _json_values(self)))
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, LiftingResultRow):
+            return NotImplemented
+        return all(getattr(self, column) == getattr(other, column) for column in ROW_COLUMNS)
+
+    def __repr__(self) -> str:
+        return f"LiftingResultRow({self.to_json()!r})"
+
+
+@dataclass
+class UpsertResult:
+    """Outcome of one upsert call across all of its chunks."""
+    rows_written: int = 0
+    rows_failed: int = 0
+    failed_chunks: list[str] = field(default_factory=list)
+    failed_keys: list[tuple] = field(default_factory=list)  # NATURAL_KEY of every row in a chunk that failed
+
+    @property
+    def ok(self) -> bool:
+        return self.rows_failed == 0
+
+
+class LiftingResultsWriter:
+    """Chunks rows to batch_size and upserts each chunk with on_conflict, retrying failed chunks with backoff."""
+
+    def __init__(self, supabase_url: str, supabase_key: str, table: str = LIFTING_RESULTS_TABLE,
+                 batch_size: int = 500, max_retries: int = 4, backoff_seconds: float = 1.0,
+                 session: Optional[requests.Session] = None):
+        self.url = f"{supabase_url}/rest/v1/{table}"
+        self.batch_size = max(1, batch_size)
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.session = session or requests.Session()
+        self.headers = {
+            "apikey": supabase_key,
+            "Authorization": f"Bearer {supabase_key}",
+            "Content-Type": "application/json",
+            "Prefer": "resolution=merge-duplicates,return=minimal",
+        }
+
+    def upsert(self, rows: Iterable[Union[LiftingResultRow, dict]]) -> UpsertResult:
+        """
+        Upsert rows in chunks. rows can be any iterable, so a generator is never held in memory all at once.
+        LiftingResultRows are serialized as they're added to a chunk, plain dicts are sent as they are.
+        """
+        result = UpsertResult()
+        chunk = {}
+        for row in rows:
+            # PostgREST rejects a chunk that hits the same conflict key twice, so the last row for a key wins
+            if isinstance(row, LiftingResultRow):
+                chunk[row.key] = row.to_json()
+            else:
+                chunk[tuple(row.get(column) for column in NATURAL_KEY)] = row
+            if len(chunk) >= self.batch_size:
+                self._write_chunk(chunk, result)
+                chunk = {}
+        if chunk:
+            self._write_chunk(chunk, result)
+        return result
+
+    def _write_chunk(self, chunk: dict[tuple, dict], result: UpsertResult):
+        """POST the chunk's rows (keyed on NATURAL_KEY) and add the outcome to result."""
+        error = self._post_with_retries(list(chunk.values()))
+        if error is None:
+            result.rows_written += len(chunk)
+            logging.info(f"Upserted {len(chunk)} rows into {self.url.rsplit('/', 1)[-1]}.")
+        else:
+            result.rows_failed += len(chunk)
+            result.failed_chunks.append(error)
+            result.failed_keys.extend(chunk)
+            logging.error(f"Giving up on a chunk of {len(chunk)} rows: {error}")
+
+    def _post_with_retries(self, chunk: list[dict]) -> Optional[str]:
+        """POST one chunk, returns None on success or the last error message."""
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            try:
+                resp = self.session.post(self.url, params={"on_conflict": ",".join(NATURAL_KEY)},
+                                         headers=self.headers, json=chunk, timeout=60)
+                if resp.ok:
+                    return None
+                last_error = f"HTTP {resp.status_code}: {resp.text[:500]}"
+                if resp.status_code not in RETRYABLE_STATUS_CODES:
+                    return last_error
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                last_error = str(e)
+
+            if attempt < self.max_retries:
+                delay = self.backoff_seconds * (2 ** attempt) + random.uniform(0, self.backoff_seconds)
+                logging.warning(f"Upsert chunk failed ({last_error}), retrying in {delay:.1f}s "
+                                f"({attempt + 1}/{self.max_retries}).")
+                time.sleep(delay)
+        return last_error
+
+    def delete_event(self, event_id: str, federation: str) -> bool:
+        """Remove every row for one meet, so a meet that was only partly written doesn't look loaded."""
+        try:
+            resp = self.session.delete(self.url,
+                                       params={"event_id": f"eq.{event_id}", "federation": f"eq.{federation}"},
+                                       headers={**self.headers, "Prefer": "return=minimal"}, timeout=60)
+        except requests.exceptions.RequestException as e:
+            logging.error(f"Error deleting rows for event {event_id} ({federation}): {e}")
+            return False
+        if not resp.ok:
+            logging.error(f"Error deleting rows for event {event_id} ({federation}): HTTP {resp.status_code}: "
+                          f"{resp.text[:500]}")
+        return resp.ok
+
+
+def find_existing_event_ids(supabase_url: str, supabase_key: str, candidate_event_ids: Iterable[str],
+                            federation: Optional[str] = None, table: str = LIFTING_RESULTS_TABLE,
+                            chunk_size: int = 150, max_workers: int = 4,
+                            session: Optional[requests.Session] = None) -> set[str]:
+    """
+    Which of the candidate event IDs already have rows in the table.
+    Candidates are split into chunks of chunk_size so no URL gets too long, and the chunks are checked
+    concurrently. Each chunk asks the EXISTING_EVENT_IDS_RPC function for distinct IDs; if the function isn't
+    deployed, the chunk falls back to a paged select=event_id (one row per lifter, but still bounded by the chunk).
+    A chunk that errors counts as nothing existing, so those events are retried; the upsert keeps that safe.
+    """
+    candidates = sorted({str(event_id).strip() for event_id in candidate_event_ids if event_id})
+    if not candidates:
+        return set()
+    chunks = [candidates[start:start + chunk_size] for start in range(0, len(candidates), chunk_size)]
+    session = session or requests.Session()
+    headers = {
+        "apikey": supabase_key,
+        "Authorization": f"Bearer {supabase_key}",
+        "Accept": "application/json",
+    }
+    rpc_available = [True]  # Flipped by the first chunk that finds the function missing
+
+    def check_chunk(chunk: list[str]) -> set[str]:
+        try:
+            if rpc_available[0]:
+                resp = session.post(f"{supabase_url}/rest/v1/rpc/{EXISTING_EVENT_IDS_RPC}", headers=headers,
+                                    json={"event_ids": chunk, "target_federation": federation}, timeout=45)
+                if resp.status_code != 404:
+                    resp.raise_for_status()
+                    return {str(row["event_id"]).strip() for row in resp.json() if row.get("event_id")}
+                logging.info(f"RPC {EXISTING_EVENT_IDS_RPC} not found, falling back to select=event_id.")
+                rpc_available[0] = False
+            return _select_event_ids(session, f"{supabase_url}/rest/v1/{table}", headers, chunk, federation)
+        except requests.exceptions.RequestException as e:
+            logging.error(f"Error checking {len(chunk)} event IDs against Supabase: {e}")
+            return set()
+        except ValueError:
+            logging.error("Error decoding JSON from Supabase event_id check.")
+            return set()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        existing_ids = set().union(*pool.map(check_chunk, chunks))
+    logging.info(f"Checked {len(candidates)} event IDs in {len(chunks)} chunk(s), {len(existing_ids)} already exist.")
+    return existing_ids
+
+
+def _select_event_ids(session: requests.Session, table_url: str, headers: dict, chunk: list[str],
+                      federation: Optional[str], page_size: int = 5000) -> set[str]:
+    """Fallback for one chunk: page through select=event_id rows and keep the distinct IDs."""
+    params = {"select": "event_id", "event_id": f"in.({','.join(chunk)})", "order": "event_id"}
+    if federation:
+        params["federation"] = f"eq.{federation}"
+    existing_ids = set()
+    offset = 0
+    while True:
+        resp = session.get(table_url, headers=headers, params={**params, "limit": page_size, "offset": offset},
+                           timeout=45)
+        resp.raise_for_status()
+        rows = resp.json()
+        existing_ids.update(str(row["event_id"]).strip() for row in rows if row.get("event_id"))
+        if len(rows) < page_size or len(existing_ids) == len(chunk):
+            return existing_ids
+        offset += page_size
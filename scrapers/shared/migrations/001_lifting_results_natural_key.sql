@@ -0,0 +1,36 @@
+-- 001_lifting_results_natural_key.sql
+-- What lifting_results_db.py needs from the lifting_results table: ids generated by the database, the natural key
+-- the upserts resolve conflicts on (on_conflict=event_id,name,federation) and the RPC the existence check calls.
+-- Without the constraint every upsert fails with 42P10. Run it once, e.g. in the Supabase SQL editor:
+--
+--     psql "$DATABASE_URL" -v ON_ERROR_STOP=1 -f scrapers/shared/migrations/001_lifting_results_natural_key.sql
+
+BEGIN;
+
+-- Rows written before the upserts can repeat a natural key, keep the first one written
+DELETE FROM lifting_results newer
+USING lifting_results older
+WHERE newer.event_id = older.event_id
+  AND newer.name = older.name
+  AND newer.federation = older.federation
+  AND newer.id > older.id;
+
+-- Ids used to come from a max(id) read, start the sequence after them
+ALTER TABLE lifting_results ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY;
+SELECT setval(pg_get_serial_sequence('lifting_results', 'id'), COALESCE(MAX(id), 0) + 1, false)
+FROM lifting_results;
+
+ALTER TABLE lifting_results
+    ADD CONSTRAINT lifting_results_natural_key UNIQUE (event_id, name, federation);
+
+-- Distinct event IDs out of the candidates, instead of one row per result
+CREATE OR REPLACE FUNCTION lifting_results_existing_event_ids(event_ids text[], target_federation text DEFAULT NULL)
+RETURNS TABLE (event_id text) LANGUAGE sql STABLE AS $$
+    SELECT DISTINCT r.event_id::text FROM lifting_results r
+    WHERE r.event_id::text = ANY(event_ids) AND (target_federation IS NULL OR r.federation = target_federation)
+$$;
+
+COMMIT;
+
+-- So PostgREST sees the new function without a restart
+NOTIFY pgrst, 'reload schema';
@@ -0,0 +1,168 @@
+# parsed_pdf_cache.py
+"""
+Memoizes what a scraper extracted from a PDF, keyed by the PDF's SHA-256 and the scraper's parser version, so an
+unchanged records, standards or QT PDF isn't run through pdfplumber's table extraction again.
+
+Each entry also remembers which database the records were last synced to. When the PDF hasn't changed since then
+the scraper can stop with "no change" before parsing or diffing against Supabase. Records that were parsed but not
+synced yet (a dry run) are reused by the next run without parsing again.
+
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'shared'))
+    from parsed_pdf_cache import default_parsed_cache
+
+    def parse():
+        with pdf.buffer() as buffer:
+            return extract(buffer)
+
+    records, already_synced = default_parsed_cache().load_or_parse("standards", PARSER_VERSION, pdf.sha256,
+                                                                   parse, force)
+    if already_synced:
+        return  # no change
+    ...
+    default_parsed_cache().mark_synced("standards", PARSER_VERSION, pdf.sha256)
+
+Bump a scraper's PARSER_VERSION whenever a change to its parsing would change the records, so PDFs parsed by the
+old code are parsed again. Entries live next to the PDF cache in PDF_CACHE_DIR ("" turns both off). The database a
+full run syncs to is SUPABASE_URL, see sync_target.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, BinaryIO, Callable, List, Optional, Tuple, Union
+
+from pdf_cache import PDF_CACHE_DIR
+
+
+def sync_target() -> str:
+    """The database full runs write to, what synced entries are marked with."""
+    return os.getenv("SUPABASE_URL", "")
+
+
+def content_sha256(pdf_source: Union[str, BinaryIO]) -> str:
+    """SHA-256 of a PDF given as a file path or a seekable file object (left at the position it was at)."""
+    digest = hashlib.sha256()
+    if isinstance(pdf_source, str):
+        with open(pdf_source, "rb") as pdf_file:
+            for chunk in iter(lambda: pdf_file.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+    position = pdf_source.tell()
+    pdf_source.seek(0)
+    for chunk in iter(lambda: pdf_source.read(1024 * 1024), b""):
+        digest.update(chunk)
+    pdf_source.seek(position)
+    return digest.hexdigest()
+
+
+@dataclass
+class ParsedPDF:
+    """Records a scraper extracted from one PDF, and where they were last synced to."""
+    records: List[Any]
+    parsed_at: float
+    synced_to: Optional[str] = None
+    synced_at: Optional[float] = None
+
+    def synced(self, target: str) -> bool:
+        """True if these records were written to target (e.g. the SUPABASE_URL) by a full run."""
+        return self.synced_at is not None and self.synced_to == target
+
+
+class ParsedPDFCache:
+    """SQLite store of extracted records per (scraper, parser version, PDF content)."""
+
+    def __init__(self, cache_dir: str = PDF_CACHE_DIR):
+        """
+        :param cache_dir: Directory for parsed.sqlite, "" stores nothing and every lookup misses
+        """
+        self.cache_dir = cache_dir
+        self.__lock = threading.Lock()
+        self.__db = None
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self.__db = sqlite3.connect(os.path.join(cache_dir, "parsed.sqlite"), timeout=30,
+                                        check_same_thread=False)
+            self.__db.execute("""CREATE TABLE IF NOT EXISTS parsed (
+                                     scraper TEXT NOT NULL,
+                                     parser_version TEXT NOT NULL,
+                                     sha256 TEXT NOT NULL,
+                                     records TEXT NOT NULL,
+                                     parsed_at REAL NOT NULL,
+                                     synced_to TEXT,
+                                     synced_at REAL,
+                                     PRIMARY KEY (scraper, parser_version, sha256))""")
+            self.__db.commit()
+
+    def lookup(self, scraper: str, parser_version: str, sha256: str) -> Optional[ParsedPDF]:
+        """The records stored for this PDF and parser, None if it hasn't been parsed by this version."""
+        if self.__db is None:
+            return None
+        with self.__lock:
+            row = self.__db.execute("SELECT records, parsed_at, synced_to, synced_at FROM parsed "
+                                    "WHERE scraper = ? AND parser_version = ? AND sha256 = ?",
+                                    (scraper, parser_version, sha256)).fetchone()
+        if row is None:
+            return None
+        records, parsed_at, synced_to, synced_at = row
+        return ParsedPDF(json.loads(records), parsed_at, synced_to, synced_at)
+
+    def store(self, scraper: str, parser_version: str, sha256: str, records: List[Any]):
+        """Remember the records extracted from this PDF. They count as not synced until mark_synced."""
+        if self.__db is None:
+            return
+        with self.__lock:
+            self.__db.execute("INSERT OR REPLACE INTO parsed VALUES (?, ?, ?, ?, ?, NULL, NULL)",
+                              (scraper, parser_version, sha256, json.dumps(records), time.time()))
+            self.__db.commit()
+
+    def load_or_parse(self, scraper: str, parser_version: str, sha256: str, parse: Callable[[], List[Any]],
+                      force: bool = False) -> Tuple[List[Any], bool]:
+        """
+        The records for this PDF, from the cache if this parser version has seen it before or from parse() if not,
+        and whether they were already synced to sync_target(). When they were, there's nothing for the scraper to
+        do. force ignores the cache and parses again. Freshly parsed records are stored unless there are none.
+        """
+        parsed = None if force else self.lookup(scraper, parser_version, sha256)
+        if parsed is not None and parsed.synced(sync_target()):
+            print(f"✓ No change: this PDF was synced {datetime.fromtimestamp(parsed.synced_at):%Y-%m-%d %H:%M}. "
+                  f"Exiting.")
+            return parsed.records, True
+        if parsed is not None:
+            print(f"✓ Using the {len(parsed.records)} records parsed from this PDF before")
+            return parsed.records, False
+        records = parse()
+        if records:
+            self.store(scraper, parser_version, sha256, records)
+        return records, False
+
+    def mark_synced(self, scraper: str, parser_version: str, sha256: str, target: Optional[str] = None):
+        """Record that a full run wrote this PDF's records to target, sync_target() if not given."""
+        if self.__db is None:
+            return
+        target = sync_target() if target is None else target
+        with self.__lock:
+            self.__db.execute("UPDATE parsed SET synced_to = ?, synced_at = ? "
+                              "WHERE scraper = ? AND parser_version = ? AND sha256 = ?",
+                              (target, time.time(), scraper, parser_version, sha256))
+            self.__db.commit()
+
+    def close(self):
+        if self.__db is not None:
+            self.__db.close()
+
+
+_default_parsed_cache: Optional[ParsedPDFCache] = None
+_default_parsed_cache_lock = threading.Lock()
+
+
+def default_parsed_cache() -> ParsedPDFCache:
+    """The ParsedPDFCache in PDF_CACHE_DIR, made on first use."""
+    global _default_parsed_cache
+    with _default_parsed_cache_lock:
+        if _default_parsed_cache is None:
+            _default_parsed_cache = ParsedPDFCache()
+        return _default_parsed_cache
@@ -0,0 +1,264 @@
+# pdf_cache.py
+"""
+Shared PDF download layer for the scrapers that read results, records, standards, QT and schedule PDFs, with an
+on-disk cache so reruns don't download an unchanged PDF again.
+
+Each PDF is stored once, named by the SHA-256 of its content, and an index maps every URL to the file it last
+returned along with the ETag/Last-Modified the server sent. A URL fetched less than max_age seconds ago is served
+straight from disk, so a dry run followed by the real run makes no requests at all. After that it's revalidated
+with a conditional GET, and a 304 reuses the stored file. Once the stored files go over max_bytes the least
+recently used ones are deleted.
+
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'shared'))
+    from pdf_cache import fetch_pdf
+
+    pdf = fetch_pdf(url)
+    with pdf.buffer() as buffer, pdfplumber.open(buffer) as doc:   # read-only mmap of the stored file
+        ...
+
+PDF_CACHE_DIR ("" turns the cache off), PDF_CACHE_MAX_MB and PDF_CACHE_MAX_AGE configure the shared cache
+fetch_pdf uses. pdf.sha256 identifies the content whichever URL it came from.
+"""
+import hashlib
+import io
+import mmap
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional, Union
+
+import requests
+
+PDF_CACHE_DIR = os.environ.get("PDF_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "scraper_pdfs"))
+PDF_CACHE_MAX_BYTES = int(os.environ.get("PDF_CACHE_MAX_MB", "1024")) * 1024 * 1024
+PDF_CACHE_MAX_AGE = int(os.environ.get("PDF_CACHE_MAX_AGE", str(60 * 60)))  # seconds before revalidating
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+}
+
+# How a fetch was answered
+DOWNLOADED = "downloaded"
+NOT_MODIFIED = "not_modified"  # conditional GET came back 304
+FRESH = "fresh"  # fetched less than max_age ago, no request made
+STALE = "stale"  # the request failed, the last copy was used
+
+
+def looks_like_pdf(body: bytes) -> bool:
+    """PDF files start with %PDF- (within the first 1024 bytes, some generators put junk first)."""
+    return b"%PDF-" in body[:1024]
+
+
+@dataclass
+class CachedPDF:
+    """One fetched PDF, either a file in the cache or, when it wasn't cached, the bytes themselves."""
+    url: str
+    sha256: str
+    size: int
+    source: str
+    path: Optional[str] = None
+    data: Optional[bytes] = None
+
+    @property
+    def from_cache(self) -> bool:
+        return self.source != DOWNLOADED
+
+    def buffer(self) -> Union[mmap.mmap, io.BytesIO]:
+        """
+        The PDF as a seekable, read-only file object: an mmap of the cached file (nothing is copied into memory),
+        or a BytesIO when the PDF wasn't cached. pdfplumber.open and anything else that took a BytesIO take it.
+        Close it when done, both work as context managers: with pdf.buffer() as buffer: ...
+        """
+        if self.path is None:
+            return io.BytesIO(self.data)
+        with open(self.path, "rb") as pdf_file:
+            return mmap.mmap(pdf_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def read_bytes(self) -> bytes:
+        if self.path is None:
+            return self.data
+        with open(self.path, "rb") as pdf_file:
+            return pdf_file.read()
+
+
+class PDFCache:
+    """Content-addressed PDF store with a SQLite index of URL to content and validators."""
+
+    def __init__(self, cache_dir: str = PDF_CACHE_DIR, max_bytes: int = PDF_CACHE_MAX_BYTES,
+                 max_age: float = PDF_CACHE_MAX_AGE, session: Optional[requests.Session] = None):
+        """
+        :param cache_dir: Directory for the index and the files, "" downloads every time and stores nothing
+        :param max_bytes: Total size of stored files before the least recently used are evicted
+        :param max_age: Seconds a fetched URL is served without asking the server again, 0 always revalidates
+        :param session: requests session to download with, one is made if not given
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.session = session or requests.Session()
+        self.__lock = threading.Lock()
+        self.__db = None
+        if cache_dir:
+            os.makedirs(os.path.join(cache_dir, "blobs"), exist_ok=True)
+            self.__db = sqlite3.connect(os.path.join(cache_dir, "index.sqlite"), timeout=30,
+                                        check_same_thread=False)
+            self.__db.execute("""CREATE TABLE IF NOT EXISTS urls (
+                                     url TEXT PRIMARY KEY,
+                                     sha256 TEXT NOT NULL,
+                                     etag TEXT,
+                                     last_modified TEXT,
+                                     checked_at REAL NOT NULL)""")
+            self.__db.execute("""CREATE TABLE IF NOT EXISTS blobs (
+                                     sha256 TEXT PRIMARY KEY,
+                                     size INTEGER NOT NULL,
+                                     last_accessed REAL NOT NULL)""")
+            self.__db.execute("CREATE INDEX IF NOT EXISTS blobs_last_accessed ON blobs (last_accessed)")
+            self.__db.commit()
+
+    def blob_path(self, sha256: str) -> str:
+        return os.path.join(self.cache_dir, "blobs", sha256[:2], f"{sha256}.pdf")
+
+    def fetch(self, url: str, headers: Optional[dict] = None, timeout: float = 30,
+              key: Optional[str] = None) -> CachedPDF:
+        """
+        The PDF at url, from the cache when it's fresh or the server says it hasn't changed.
+        Raises requests exceptions like requests.get(...).raise_for_status() would. When the server can't be
+        reached, times out or answers 5xx, a stored copy is used instead if there is one. A 4xx (the PDF was
+        removed or moved) is always raised. Anything that isn't a PDF (an HTML error or confirmation page) is returned but not stored.
+        key indexes the PDF under another URL, for download links that carry a one-off token.
+        """
+        key = key or url
+        headers = {**DEFAULT_HEADERS, **(headers or {})}
+        entry = self.__lookup(key)
+        if entry is not None and time.time() - entry["checked_at"] < self.max_age:
+            return self.__hit(key, entry, FRESH)
+
+        if entry is not None:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+        try:
+            response = self.session.get(url, headers=headers, timeout=timeout)
+            if response.status_code == 304 and entry is not None:
+                self.__touch_url(key)
+                return self.__hit(key, entry, NOT_MODIFIED)
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            if entry is None or not self.server_unavailable(e):
+                raise
+            print(f"⚠ Couldn't fetch {url} ({e}), using the copy cached {time.ctime(entry['checked_at'])}")
+            return self.__hit(key, entry, STALE)
+
+        body = response.content
+        print(f"✓ Downloaded {len(body)} bytes")
+        sha256 = hashlib.sha256(body).hexdigest()
+        if self.__db is None or not looks_like_pdf(body):
+            return CachedPDF(url, sha256, len(body), DOWNLOADED, data=body)
+        path = self.__store(key, sha256, body, response.headers)
+        return CachedPDF(url, sha256, len(body), DOWNLOADED, path=path)
+
+    @staticmethod
+    def server_unavailable(error: requests.exceptions.RequestException) -> bool:
+        """True for failures a stored copy can stand in for: no connection, a timeout or a 5xx."""
+        if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+            return True
+        if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+            return error.response.status_code >= 500
+        return False
+
+    def __lookup(self, url: str) -> Optional[dict]:
+        """The index entry for url, None if there isn't one or its file has gone."""
+        if self.__db is None:
+            return None
+        with self.__lock:
+            row = self.__db.execute("SELECT u.sha256, u.etag, u.last_modified, u.checked_at, b.size FROM urls u "
+                                    "JOIN blobs b ON b.sha256 = u.sha256 WHERE u.url = ?", (url,)).fetchone()
+        if row is None:
+            return None
+        entry = dict(zip(("sha256", "etag", "last_modified", "checked_at", "size"), row))
+        return entry if os.path.exists(self.blob_path(entry["sha256"])) else None
+
+    def __hit(self, url: str, entry: dict, source: str) -> CachedPDF:
+        with self.__lock:
+            self.__db.execute("UPDATE blobs SET last_accessed = ? WHERE sha256 = ?", (time.time(), entry["sha256"]))
+            self.__db.commit()
+        if source != STALE:
+            print(f"✓ Using the cached copy ({'fetched recently' if source == FRESH else 'unchanged on the server'})")
+        return CachedPDF(url, entry["sha256"], entry["size"], source, path=self.blob_path(entry["sha256"]))
+
+    def __touch_url(self, url: str):
+        with self.__lock:
+            self.__db.execute("UPDATE urls SET checked_at = ? WHERE url = ?", (time.time(), url))
+            self.__db.commit()
+
+    def __store(self, url: str, sha256: str, body: bytes, response_headers) -> str:
+        """Write the file if this content isn't stored yet, point url at it, then trim the cache."""
+        path = self.blob_path(sha256)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Written under a temporary name and renamed, so a half written file is never picked up
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as tmp_file:
+                tmp_file.write(body)
+            os.replace(tmp_path, path)
+        now = time.time()
+        with self.__lock:
+            self.__db.execute("INSERT OR REPLACE INTO blobs VALUES (?, ?, ?)", (sha256, len(body), now))
+            self.__db.execute("INSERT OR REPLACE INTO urls VALUES (?, ?, ?, ?, ?)",
+                              (url, sha256, response_headers.get("ETag"), response_headers.get("Last-Modified"),
+                               now))
+            self.__evict(keep=sha256)
+            self.__db.commit()
+        return path
+
+    def __evict(self, keep: str):
+        """Delete least recently used files until the total is under max_bytes. Call with the lock held."""
+        total = self.__db.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for sha256, size in self.__db.execute("SELECT sha256, size FROM blobs WHERE sha256 != ? "
+                                              "ORDER BY last_accessed", (keep,)).fetchall():
+            self.__db.execute("DELETE FROM urls WHERE sha256 = ?", (sha256,))
+            self.__db.execute("DELETE FROM blobs WHERE sha256 = ?", (sha256,))
+            try:
+                os.remove(self.blob_path(sha256))
+            except FileNotFoundError:
+                pass
+            total -= size
+            if total <= self.max_bytes:
+                return
+
+    def stats(self) -> dict:
+        """Number of URLs and files in the cache and the files' total size."""
+        if self.__db is None:
+            return {"urls": 0, "files": 0, "bytes": 0}
+        with self.__lock:
+            urls = self.__db.execute("SELECT COUNT(*) FROM urls").fetchone()[0]
+            files, size = self.__db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs").fetchone()
+        return {"urls": urls, "files": files, "bytes": size}
+
+    def close(self):
+        if self.__db is not None:
+            self.__db.close()
+
+
+_default_cache: Optional[PDFCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def default_cache() -> PDFCache:
+    """The PDFCache configured from the PDF_CACHE_* environment variables, made on first use."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = PDFCache()
+        return _default_cache
+
+
+def fetch_pdf(url: str, headers: Optional[dict] = None, timeout: float = 30, key: Optional[str] = None) -> CachedPDF:
+    """Fetch url through the shared cache, see PDFCache.fetch."""
+    return default_cache().fetch(url, headers=headers, timeout=timeout, key=key)
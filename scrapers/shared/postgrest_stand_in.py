@@ -0,0 +1,488 @@
+# postgrest_stand_in.py
+"""
+Local stand-in for the part of Supabase's PostgREST API the scrapers write through, so write paths can be timed
+on a laptop without touching the real database. supabase-py clients and raw requests callers both work against
+it, point SUPABASE_URL at it and use STAND_IN_KEY as SUPABASE_KEY (supabase-py wants a JWT shaped key).
+
+Covered:
+    select (columns, no embedding), HEAD, count=exact
+    eq, neq, gt, gte, lt, lte, like, ilike, is, in, and not.<op>; match() is just several eq filters
+    order (asc/desc, nullsfirst/nullslast, several columns), limit/offset and the Range header
+    insert of one row or a batch, upsert with on_conflict (merge or ignore duplicates), update, delete
+    a batch whose rows don't all have the same keys is rejected (PGRST102) unless ?columns= is given, and an
+    on_conflict on a table in UNIQUE_KEYS that isn't id or its key fails like a missing constraint does (42P10)
+    return=representation/minimal, single() (vnd.pgrst.object+json)
+    rpc/lifting_results_existing_event_ids, more through PostgRESTStandIn(rpcs=...)
+
+Tables are created on first use and held in memory. Rows get an id from a per-table sequence when they don't
+bring one, and UNIQUE_KEYS makes a plain insert that repeats one of those keys fail with a 409, like the real
+constraints do. Every request is counted (GET /_stand_in/stats) and can be slowed down by latency seconds,
+plus per_row_latency for each row written, to stand in for the round trip and the database's own work.
+
+In process, for tests and benchmarks:
+
+    with PostgRESTStandIn(latency=0.02) as stand_in:
+        os.environ["SUPABASE_URL"], os.environ["SUPABASE_KEY"] = stand_in.url, STAND_IN_KEY
+        ...
+        print(stand_in.stats())
+
+Or as its own process, for running a scraper against it:
+
+    python scrapers/shared/postgrest_stand_in.py --port 54321 --latency 0.02
+"""
+import argparse
+import json
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+from urllib.parse import urlsplit, parse_qsl
+
+STAND_IN_KEY = "stand.in.key"
+REST_PREFIX = "/rest/v1/"
+STATS_PATH = "/_stand_in/stats"
+RESET_PATH = "/_stand_in/reset"
+
+# The unique constraints the scrapers' tables have, beyond the id primary key
+UNIQUE_KEYS = {
+    "lifting_results": ("event_id", "name", "federation"),
+}
+
+
+def _split_list(value: str) -> list[str]:
+    """The items of an in.(...) list, which may be double quoted to hold commas."""
+    return [item[1:-1] if item.startswith('"') and item.endswith('"') else item
+            for item in re.findall(r'"[^"]*"|[^,]+', value.strip("()"))]
+
+
+def _coerce(row_value, filter_value: str):
+    """The filter value as the same type as the row's value, so 5 matches eq.5 and True matches eq.true."""
+    if isinstance(row_value, bool):
+        return filter_value.lower() == "true"
+    if isinstance(row_value, (int, float)):
+        try:
+            return float(filter_value)
+        except ValueError:
+            return filter_value
+    return filter_value
+
+
+def _like(row_value, pattern: str, ignore_case: bool) -> bool:
+    regex = "^" + ".*".join(re.escape(part) for part in re.split(r"[*%]", pattern)) + "$"
+    return re.match(regex, str(row_value), re.IGNORECASE if ignore_case else 0) is not None
+
+
+def _compare(row_value, operator: str, value: str) -> bool:
+    if operator == "is":
+        return {"null": row_value is None, "true": row_value is True, "false": row_value is False}.get(value.lower(),
+                                                                                                      False)
+    if operator == "in":
+        return any(row_value is not None and (row_value == _coerce(row_value, item) or str(row_value) == item)
+                   for item in _split_list(value))
+    if operator in ("like", "ilike"):
+        return row_value is not None and _like(row_value, value, operator == "ilike")
+    if row_value is None:
+        return False
+    wanted = _coerce(row_value, value)
+    row_value = float(row_value) if isinstance(wanted, float) and not isinstance(row_value, bool) else row_value
+    if type(wanted) is not type(row_value):
+        row_value, wanted = str(row_value), str(wanted)
+    if operator == "eq":
+        return row_value == wanted
+    if operator == "neq":
+        return row_value != wanted
+    if operator == "gt":
+        return row_value > wanted
+    if operator == "gte":
+        return row_value >= wanted
+    if operator == "lt":
+        return row_value < wanted
+    if operator == "lte":
+        return row_value <= wanted
+    raise ValueError(f"Unsupported filter operator {operator}")
+
+
+def _matches(row: dict, filters: list[tuple[str, str]]) -> bool:
+    for column, condition in filters:
+        negate = condition.startswith("not.")
+        operator, _, value = condition[4 if negate else 0:].partition(".")
+        if _compare(row.get(column), operator, value) == negate:
+            return False
+    return True
+
+
+def _order_rows(rows: list[dict], order: str) -> list[dict]:
+    """order=col.desc.nullslast,other.asc, applied last column first so the first column wins."""
+    for term in reversed(order.split(",")):
+        column, *modifiers = term.split(".")
+        descending = "desc" in modifiers
+        nulls_first = "nullsfirst" in modifiers or ("nullslast" not in modifiers and descending)
+        present = [row for row in rows if row.get(column) is not None]
+        present.sort(key=lambda row: row[column], reverse=descending)
+        missing = [row for row in rows if row.get(column) is None]
+        rows = missing + present if nulls_first else present + missing
+    return rows
+
+
+def existing_event_ids_rpc(store: "StandInStore", args: dict) -> list[dict]:
+    """lifting_results_existing_event_ids from lifting_results_db."""
+    wanted = set(args.get("event_ids") or [])
+    federation = args.get("target_federation")
+    found = {row.get("event_id") for row in store.table("lifting_results")
+             if row.get("event_id") in wanted and (federation is None or row.get("federation") == federation)}
+    return [{"event_id": event_id} for event_id in sorted(found)]
+
+
+class StandInError(Exception):
+    """Becomes a PostgREST style error response."""
+
+    def __init__(self, status: int, code: str, message: str):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.message = message
+
+
+def _key(row: dict, columns: tuple) -> tuple:
+    return tuple(row.get(column) for column in columns)
+
+
+class StandInStore:
+    """The tables and counters behind the server, guarded by one lock."""
+
+    def __init__(self, unique_keys: Optional[dict] = None):
+        self.unique_keys = UNIQUE_KEYS if unique_keys is None else unique_keys
+        self.lock = threading.Lock()
+        self.tables: dict[str, list[dict]] = {}
+        self.indexes: dict[tuple, dict] = {}  # (table, columns) -> key -> row, built the first time it's needed
+        self.last_ids: dict[str, int] = {}
+        self.requests: Counter = Counter()
+        self.rows_written: Counter = Counter()
+
+    def table(self, name: str) -> list[dict]:
+        return self.tables.setdefault(name, [])
+
+    def reset(self):
+        with self.lock:
+            self.tables.clear()
+            self.indexes.clear()
+            self.last_ids.clear()
+            self.requests.clear()
+            self.rows_written.clear()
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {"requests": {f"{method} {path}": count for (method, path), count in sorted(self.requests.items())},
+                    "total_requests": sum(self.requests.values()),
+                    "rows_written": dict(self.rows_written),
+                    "rows": {name: len(rows) for name, rows in self.tables.items()}}
+
+    def __index(self, name: str, columns: tuple) -> dict:
+        index = self.indexes.get((name, columns))
+        if index is None:
+            index = {}
+            for row in self.table(name):
+                key = _key(row, columns)
+                if None not in key:
+                    index[key] = row
+            self.indexes[(name, columns)] = index
+        return index
+
+    def __reindex(self, name: str, row: dict, add: bool):
+        for (table, columns), index in self.indexes.items():
+            if table != name:
+                continue
+            key = _key(row, columns)
+            if add and None not in key:
+                index[key] = row
+            elif not add and index.get(key) is row:
+                del index[key]
+
+    def __drop_indexes(self, name: str):
+        for cached in [cached for cached in self.indexes if cached[0] == name]:
+            del self.indexes[cached]
+
+    def __next_id(self, name: str) -> int:
+        if name not in self.last_ids:
+            self.last_ids[name] = max((row["id"] for row in self.table(name) if isinstance(row.get("id"), int)),
+                                      default=0)
+        self.last_ids[name] += 1
+        return self.last_ids[name]
+
+    def select(self, name: str, filters: list, params: dict) -> list[dict]:
+        rows = [row for row in self.table(name) if _matches(row, filters)]
+        if params.get("order"):
+            rows = _order_rows(rows, params["order"])
+        return rows
+
+    def write(self, name: str, rows: list[dict], on_conflict: Optional[str], resolution: Optional[str],
+              columns: Optional[list[str]]) -> list[dict]:
+        """Insert or upsert a batch, all or nothing like PostgREST, returning the rows as stored."""
+        table = self.table(name)
+        key_columns = tuple(on_conflict.split(",")) if on_conflict else None
+        constraints = [("id",)] + ([tuple(self.unique_keys[name])] if name in self.unique_keys else [])
+        if key_columns and name in self.unique_keys and sorted(key_columns) not in [sorted(constraint) for constraint in constraints]:
+            raise StandInError(400, "42P10", "there is no unique or exclusion constraint matching the ON CONFLICT "
+                                             "specification")
+        written, appended, merged = [], [], []
+        try:
+            for row in rows:
+                row = {column: row.get(column) for column in columns} if columns else dict(row)
+                existing = self.__index(name, key_columns).get(_key(row, key_columns)) if key_columns else None
+                if existing is not None and resolution == "ignore-duplicates":
+                    continue
+                if existing is not None and resolution == "merge-duplicates":
+                    merged.append((existing, dict(existing)))
+                    self.__reindex(name, existing, add=False)
+                    existing.update(row)
+                    self.__reindex(name, existing, add=True)
+                    written.append(existing)
+                    continue
+                if existing is not None or any(None not in _key(row, constraint) and
+                                               _key(row, constraint) in self.__index(name, constraint)
+                                               for constraint in constraints):
+                    raise StandInError(409, "23505", f"duplicate key value violates unique constraint on {name}")
+                if row.get("id") is None:
+                    row["id"] = self.__next_id(name)
+                table.append(row)
+                appended.append(row)
+                self.__reindex(name, row, add=True)
+                written.append(row)
+        except StandInError:
+            for row in appended:
+                self.__reindex(name, row, add=False)
+            appended_ids = {id(row) for row in appended}
+            self.tables[name] = [row for row in table if id(row) not in appended_ids]
+            for row, before in merged:
+                self.__reindex(name, row, add=False)
+                row.clear()
+                row.update(before)
+                self.__reindex(name, row, add=True)
+            raise
+        self.rows_written[name] += len(written)
+        return written
+
+    def update(self, name: str, filters: list, changes: dict) -> list[dict]:
+        updated = [row for row in self.table(name) if _matches(row, filters)]
+        for row in updated:
+            row.update(changes)
+        self.__drop_indexes(name)
+        self.rows_written[name] += len(updated)
+        return updated
+
+    def delete(self, name: str, filters: list) -> list[dict]:
+        table = self.table(name)
+        deleted = [row for row in table if _matches(row, filters)]
+        self.tables[name] = [row for row in table if not _matches(row, filters)]
+        self.__drop_indexes(name)
+        return deleted
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so clients pool connections like they would with Supabase
+    server: "_StandInServer"
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+    def do_GET(self):
+        self._dispatch()
+
+    def do_HEAD(self):
+        self._dispatch()
+
+    def do_POST(self):
+        self._dispatch()
+
+    def do_PATCH(self):
+        self._dispatch()
+
+    def do_DELETE(self):
+        self._dispatch()
+
+    def _dispatch(self):
+        url = urlsplit(self.path)
+        stand_in = self.server.stand_in
+        length = int(self.headers.get("Content-Length") or 0)
+        raw_body = self.rfile.read(length) if length else b""
+        if url.path == STATS_PATH:
+            return self._send(200, stand_in.store.stats())
+        if url.path == RESET_PATH:
+            stand_in.store.reset()
+            return self._send(204, None)
+        try:
+            body = json.loads(raw_body) if raw_body else None
+            status, payload, headers = stand_in.handle(self.command, url.path, url.query, dict(self.headers), body)
+        except StandInError as e:
+            status, payload, headers = e.status, {"code": e.code, "message": e.message, "details": None,
+                                                  "hint": None}, {}
+        except (ValueError, KeyError, TypeError) as e:
+            status, payload, headers = 400, {"code": "PGRST100", "message": str(e), "details": None,
+                                             "hint": None}, {}
+        self._send(status, payload, headers)
+
+    def _send(self, status: int, payload, headers: Optional[dict] = None):
+        content = b"" if payload is None else json.dumps(payload, default=str).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", "0" if self.command == "HEAD" else str(len(content)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD" and content:
+            self.wfile.write(content)
+
+
+class _StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, stand_in: "PostgRESTStandIn"):
+        super().__init__(address, _Handler)
+        self.stand_in = stand_in
+
+
+class PostgRESTStandIn:
+    """
+    The stand-in server, on a background thread once started. port=0 picks a free one, see .url.
+    latency is slept on every request and per_row_latency for every row a request writes.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0, per_row_latency: float = 0.0,
+                 unique_keys: Optional[dict] = None, rpcs: Optional[dict[str, Callable]] = None):
+        self.latency = latency
+        self.per_row_latency = per_row_latency
+        self.store = StandInStore(unique_keys)
+        self.rpcs = {"lifting_results_existing_event_ids": existing_event_ids_rpc, **(rpcs or {})}
+        self.server = _StandInServer((host, port), self)
+        self.url = f"http://{host}:{self.server.server_address[1]}"
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def start(self) -> "PostgRESTStandIn":
+        self._thread = threading.Thread(target=self.server.serve_forever, name="postgrest-stand-in", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def stats(self) -> dict:
+        """Requests by method and table, rows written by table and rows now in each table."""
+        return self.store.stats()
+
+    def reset(self):
+        self.store.reset()
+
+    def rows(self, table: str) -> list[dict]:
+        with self.store.lock:
+            return [dict(row) for row in self.store.table(table)]
+
+    def handle(self, method: str, path: str, query: str, headers: dict, body) -> tuple[int, object, dict]:
+        """One request, returns (status, JSON payload or None, extra headers)."""
+        if not path.startswith(REST_PREFIX):
+            raise StandInError(404, "PGRST000", f"Not a PostgREST path: {path}")
+        name = path[len(REST_PREFIX):]
+        pairs = parse_qsl(query, keep_blank_values=True)
+        params = {key: value for key, value in pairs if key in ("select", "order", "limit", "offset", "on_conflict",
+                                                               "columns")}
+        filters = [(key, value) for key, value in pairs if key not in params]
+        prefer = {item.split("=", 1)[0].strip(): item.split("=", 1)[-1].strip()
+                  for item in headers.get("Prefer", headers.get("prefer", "")).split(",") if item.strip()}
+        lowered = {key.lower(): value for key, value in headers.items()}
+
+        with self.store.lock:
+            self.store.requests[(method, name)] += 1
+            if name.startswith("rpc/"):
+                rpc = self.rpcs.get(name[4:])
+                if rpc is None:
+                    raise StandInError(404, "PGRST202", f"Could not find the function {name[4:]}")
+                status, payload, extra = 200, rpc(self.store, body or {}), {}
+                rows_touched = 0
+            else:
+                status, payload, extra, rows_touched = self._table_request(method, name, params, filters, prefer,
+                                                                           lowered, body)
+        delay = self.latency + self.per_row_latency * rows_touched
+        if delay:
+            time.sleep(delay)
+        return status, payload, extra
+
+    def _table_request(self, method, name, params, filters, prefer, headers, body):
+        returning = prefer.get("return", "minimal")
+        if method in ("GET", "HEAD"):
+            rows = self.store.select(name, filters, params)
+            total = len(rows)
+            offset, limit = int(params.get("offset", 0)), params.get("limit")
+            range_header = headers.get("range")
+            if range_header and re.fullmatch(r"\d+-\d*", range_header):
+                start, _, end = range_header.partition("-")
+                offset, limit = int(start), (int(end) - int(start) + 1) if end else None
+            rows = rows[offset:offset + int(limit)] if limit is not None else rows[offset:]
+            columns = params.get("select", "*")
+            if columns.replace(" ", "") != "*":
+                rows = [{column.strip().strip('"'): row.get(column.strip().strip('"'))
+                         for column in columns.split(",")} for row in rows]
+            else:
+                rows = [dict(row) for row in rows]
+            end = offset + len(rows) - 1
+            content_range = f"{offset}-{end}" if rows else "*"
+            extra = {"Content-Range": f"{content_range}/{total if prefer.get('count') else '*'}"}
+            if "vnd.pgrst.object" in headers.get("accept", ""):
+                if len(rows) != 1:
+                    raise StandInError(406, "PGRST116", f"JSON object requested, {len(rows)} rows returned")
+                return 200, rows[0], extra, 0
+            return (206 if limit is not None and len(rows) < total else 200), rows, extra, 0
+
+        if method == "POST":
+            rows = body if isinstance(body, list) else [body]
+            columns = [column.strip('"') for column in params["columns"].split(",")] if params.get("columns") \
+                else None
+            if columns is None and any(row.keys() != rows[0].keys() for row in rows):
+                raise StandInError(400, "PGRST102", "All object keys must match")
+            written = self.store.write(name, rows, params.get("on_conflict"), prefer.get("resolution"), columns)
+            payload = [dict(row) for row in written] if returning == "representation" else None
+            return 201, payload, {}, len(rows)
+
+        if method == "PATCH":
+            updated = self.store.update(name, filters, body or {})
+            payload = [dict(row) for row in updated] if returning == "representation" else None
+            return (200 if payload is not None else 204), payload, {}, len(updated)
+
+        if method == "DELETE":
+            deleted = self.store.delete(name, filters)
+            payload = [dict(row) for row in deleted] if returning == "representation" else None
+            return (200 if payload is not None else 204), payload, {}, len(deleted)
+
+        raise StandInError(405, "PGRST000", f"{method} not supported")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for Supabase's PostgREST API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=54321)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every request")
+    parser.add_argument("--per-row-latency", type=float, default=0.0, help="Seconds added per row written")
+    args = parser.parse_args()
+
+    stand_in = PostgRESTStandIn(args.host, args.port, args.latency, args.per_row_latency)
+    print(f"PostgREST stand-in on {stand_in.url}")
+    print(f"    export SUPABASE_URL={stand_in.url} SUPABASE_KEY={STAND_IN_KEY}")
+    print(f"Request counts: curl {stand_in.url}{STATS_PATH}")
+    try:
+        stand_in.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(json.dumps(stand_in.stats(), indent=2))
+        stand_in.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
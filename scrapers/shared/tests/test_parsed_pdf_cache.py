@@ -0,0 +1,74 @@
+# test_parsed_pdf_cache.py
+"""The shared cache of records extracted from PDFs, keyed by content hash and parser version."""
+import hashlib
+import io
+
+from parsed_pdf_cache import ParsedPDFCache, content_sha256
+
+RECORDS = [{"age_category": "Senior", "gender": "women", "weight_class": "58kg", "standard_a": 215, "standard_b": None}]
+SHA = hashlib.sha256(b"%PDF-1.4 standards").hexdigest()
+
+
+def test_parsed_then_synced(tmp_path):
+    cache = ParsedPDFCache(str(tmp_path))
+    assert cache.lookup("standards", "1", SHA) is None
+
+    cache.store("standards", "1", SHA, RECORDS)
+    parsed = cache.lookup("standards", "1", SHA)
+    assert parsed.records == RECORDS and not parsed.synced("https://db.example")
+
+    cache.mark_synced("standards", "1", SHA, "https://db.example")
+    parsed = ParsedPDFCache(str(tmp_path)).lookup("standards", "1", SHA)
+    assert parsed.synced("https://db.example") and not parsed.synced("https://staging.example")
+
+
+def test_scraper_and_parser_version_are_part_of_the_key(tmp_path):
+    cache = ParsedPDFCache(str(tmp_path))
+    cache.store("standards", "1", SHA, RECORDS)
+    cache.mark_synced("standards", "1", SHA, "https://db.example")
+    assert cache.lookup("standards", "2", SHA) is None
+    assert cache.lookup("records", "1", SHA) is None
+
+    # Parsing again replaces the entry, which then needs syncing again
+    cache.store("standards", "1", SHA, RECORDS[:0])
+    assert not cache.lookup("standards", "1", SHA).synced("https://db.example")
+
+
+def test_load_or_parse(tmp_path, monkeypatch):
+    monkeypatch.setenv("SUPABASE_URL", "https://db.example")
+    cache = ParsedPDFCache(str(tmp_path))
+    parses = []
+
+    def parse():
+        parses.append(1)
+        return RECORDS
+
+    assert cache.load_or_parse("standards", "1", SHA, parse) == (RECORDS, False)
+    assert cache.load_or_parse("standards", "1", SHA, parse) == (RECORDS, False)
+    assert len(parses) == 1
+
+    cache.mark_synced("standards", "1", SHA)
+    assert cache.load_or_parse("standards", "1", SHA, parse) == (RECORDS, True)
+    assert cache.load_or_parse("standards", "1", SHA, parse, force=True) == (RECORDS, False)
+    assert len(parses) == 2
+
+    # Nothing extracted isn't stored, the next run parses again
+    assert cache.load_or_parse("records", "1", SHA, list) == ([], False)
+    assert cache.lookup("records", "1", SHA) is None
+
+
+def test_cache_off_stores_nothing():
+    cache = ParsedPDFCache("")
+    cache.store("standards", "1", SHA, RECORDS)
+    cache.mark_synced("standards", "1", SHA, "https://db.example")
+    assert cache.lookup("standards", "1", SHA) is None
+
+
+def test_content_sha256_of_paths_and_buffers(tmp_path):
+    pdf_path = tmp_path / "qt.pdf"
+    pdf_path.write_bytes(b"%PDF-1.4 standards")
+    assert content_sha256(str(pdf_path)) == SHA
+
+    buffer = io.BytesIO(b"%PDF-1.4 standards")
+    buffer.seek(4)
+    assert content_sha256(buffer) == SHA and buffer.tell() == 4
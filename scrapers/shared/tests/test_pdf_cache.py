@@ -0,0 +1,157 @@
+# test_pdf_cache.py
+"""The shared PDF download cache, against a local server that honours If-None-Match."""
+import hashlib
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from pdf_cache import PDFCache, DOWNLOADED, FRESH, NOT_MODIFIED, STALE
+
+PDF_BODY = b"%PDF-1.4\n" + b"0" * 4096 + b"\n%%EOF\n"
+
+
+class PDFServer:
+    """
+    Serves /<name>.pdf from .files with an ETag per body, /missing as a 404 and /page as HTML.
+    Everything is a 503 while .unavailable is set.
+    """
+
+    def __init__(self):
+        self.files = {"/records.pdf": PDF_BODY, "/copy.pdf": PDF_BODY, "/other.pdf": b"%PDF-1.7\n" + b"1" * 4096}
+        self.requests = Counter()
+        self.unavailable = False
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests[self.path] += 1
+                if server.unavailable:
+                    return self.__send(503, b"")
+                if self.path == "/page":
+                    return self.__send(200, b"<html>virus scan warning</html>")
+                body = server.files.get(self.path)
+                if body is None:
+                    return self.__send(404, b"")
+                etag = f'"{hashlib.md5(body).hexdigest()}"'
+                if self.headers.get("If-None-Match") == etag:
+                    return self.__send(304, b"", etag)
+                self.__send(200, body, etag)
+
+            def __send(self, status, body, etag=None):
+                self.send_response(status)
+                if etag:
+                    self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    pdf_server = PDFServer()
+    yield pdf_server
+    pdf_server.close()
+
+
+def test_fresh_then_revalidated_then_changed(server, tmp_path):
+    cache = PDFCache(str(tmp_path), max_age=60)
+    url = f"{server.url}/records.pdf"
+    first = cache.fetch(url)
+    assert first.source == DOWNLOADED and first.read_bytes() == PDF_BODY
+    assert cache.fetch(url).source == FRESH
+    assert server.requests["/records.pdf"] == 1
+
+    cache.max_age = 0
+    revalidated = cache.fetch(url)
+    assert revalidated.source == NOT_MODIFIED and revalidated.sha256 == first.sha256
+    assert server.requests["/records.pdf"] == 2
+
+    server.files["/records.pdf"] = b"%PDF-1.5\nchanged"
+    changed = cache.fetch(url)
+    assert changed.source == DOWNLOADED and changed.read_bytes() == b"%PDF-1.5\nchanged"
+
+
+def test_same_content_is_stored_once(server, tmp_path):
+    cache = PDFCache(str(tmp_path))
+    assert cache.fetch(f"{server.url}/records.pdf").path == cache.fetch(f"{server.url}/copy.pdf").path
+    assert cache.stats() == {"urls": 2, "files": 1, "bytes": len(PDF_BODY)}
+
+
+def test_buffer_is_a_read_only_mmap(server, tmp_path):
+    pdf = PDFCache(str(tmp_path)).fetch(f"{server.url}/records.pdf")
+    with pdf.buffer() as buffer:
+        assert buffer.read(5) == b"%PDF-"
+        buffer.seek(-6, 2)
+        assert buffer.read() == b"%%EOF\n"
+        assert buffer.tell() == len(PDF_BODY)
+        with pytest.raises(TypeError):
+            buffer[0] = 0
+    assert buffer.closed
+
+
+def test_least_recently_used_file_is_evicted(server, tmp_path):
+    cache = PDFCache(str(tmp_path), max_bytes=len(PDF_BODY) + 10)
+    records = cache.fetch(f"{server.url}/records.pdf")
+    cache.fetch(f"{server.url}/other.pdf")
+    assert cache.stats()["files"] == 1
+    assert cache.fetch(f"{server.url}/records.pdf").source == DOWNLOADED
+    assert records.sha256 == hashlib.sha256(PDF_BODY).hexdigest()
+
+
+def test_errors_and_pages_that_arent_pdfs(server, tmp_path):
+    cache = PDFCache(str(tmp_path), max_age=0)
+    with pytest.raises(requests.exceptions.HTTPError):
+        cache.fetch(f"{server.url}/missing")
+
+    page = cache.fetch(f"{server.url}/page")
+    with page.buffer() as buffer:
+        assert page.path is None and buffer.read().startswith(b"<html>")
+    assert cache.stats()["urls"] == 0
+
+
+def test_stored_copy_stands_in_only_while_the_server_is_unavailable(server, tmp_path):
+    cache = PDFCache(str(tmp_path), max_age=0)
+    url = f"{server.url}/records.pdf"
+    cache.fetch(url)
+
+    server.unavailable = True
+    assert cache.fetch(url).source == STALE
+    server.unavailable = False
+
+    # Gone from the server is an answer, not an outage
+    del server.files["/records.pdf"]
+    with pytest.raises(requests.exceptions.HTTPError):
+        cache.fetch(url)
+
+    server.close()
+    assert cache.fetch(url).source == STALE
+
+
+def test_cache_off_downloads_every_time(server):
+    cache = PDFCache("")
+    with cache.fetch(f"{server.url}/records.pdf").buffer() as buffer:
+        assert buffer.read() == PDF_BODY
+    cache.fetch(f"{server.url}/records.pdf")
+    assert server.requests["/records.pdf"] == 2
+
+
+def test_key_indexes_a_tokened_url_under_a_stable_one(server, tmp_path):
+    cache = PDFCache(str(tmp_path))
+    stable = f"{server.url}/download?id=records"
+    cache.fetch(f"{server.url}/records.pdf", key=stable)
+    assert cache.fetch(stable).source == FRESH
+    assert server.requests["/records.pdf"] == 1
@@ -10,17 +10,20 @@ USAGE:
 """
 
 import os
+import sys
 import re
-import requests
 from io import BytesIO
 from datetime import datetime, time as datetime_time
-from typing import List, Dict, Optional
+from typing import BinaryIO, List, Dict, Optional
 import pdfplumber
 from dotenv import load_dotenv
 from supabase import create_client, Client
 import pandas as pd
 from tabulate import tabulate
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'shared'))
+from pdf_cache import fetch_pdf
+
 # Load environment variables
 load_dotenv()
 
@@ -39,12 +42,10 @@ class FinalScheduleScraper:
         self.supabase: Client = create_client(self.supabase_url, self.supabase_key)
         self.current_date = None
     
-    def download_pdf(self, url: str) -> BytesIO:
-        """Download PDF from URL"""
+    def download_pdf(self, url: str) -> BinaryIO:
+        """Download PDF from URL, or reuse the cached copy if it hasn't changed. Close the returned file when done"""
         print(f"Downloading PDF from {url}...")
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
-        return BytesIO(response.content)
+        return fetch_pdf(url).buffer()
     
     def extract_schedule_data(self, pdf_file: BytesIO, meet_name: str) -> List[Dict]:
         """Extract schedule data from PDF"""
@@ -369,8 +370,8 @@ class FinalScheduleScraper:
     def scrape_and_upsert(self, pdf_url: str, meet_name: str, dry_run: bool = False) -> Dict:
         """Main method to scrape PDF and upsert to database"""
         try:
-            pdf_file = self.download_pdf(pdf_url)
-            raw_entries = self.extract_schedule_data(pdf_file, meet_name)
+            with self.download_pdf(pdf_url) as pdf_file:
+                raw_entries = self.extract_schedule_data(pdf_file, meet_name)
             
             if not raw_entries:
                 print("WARNING: No schedule entries were extracted from the PDF")
@@ -412,8 +413,8 @@ def main():
     
     if args.csv:
         # CSV export mode
-        pdf_file = scraper.download_pdf(args.url)
-        raw_entries = scraper.extract_schedule_data(pdf_file, args.meet_name)
+        with scraper.download_pdf(args.url) as pdf_file:
+            raw_entries = scraper.extract_schedule_data(pdf_file, args.meet_name)
         formatted_entries = scraper.format_for_database(raw_entries)
         
         if formatted_entries:
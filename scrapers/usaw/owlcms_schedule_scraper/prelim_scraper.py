@@ -16,17 +16,20 @@ USAGE:
 """
 
 import os
+import sys
 import re
-import requests
 from io import BytesIO
 from datetime import datetime, time as datetime_time
-from typing import List, Dict, Optional
+from typing import BinaryIO, List, Dict, Optional
 import pdfplumber
 from dotenv import load_dotenv
 from supabase import create_client, Client
 import pandas as pd
 from tabulate import tabulate
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'shared'))
+from pdf_cache import fetch_pdf
+
 # Load environment variables
 load_dotenv()
 
@@ -61,20 +64,18 @@ class ScheduleScraper:
         
         self.supabase: Client = create_client(self.supabase_url, self.supabase_key)
     
-    def download_pdf(self, url: str) -> BytesIO:
+    def download_pdf(self, url: str) -> BinaryIO:
         """
-        Download PDF from URL
+        Download PDF from URL, or reuse the cached copy if it hasn't changed
         
         Args:
             url: URL to the PDF file
             
         Returns:
-            BytesIO object containing the PDF data
+            Read-only file object (memory-mapped) containing the PDF data, close it when done
         """
         print(f"Downloading PDF from {url}...")
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
-        return BytesIO(response.content)
+        return fetch_pdf(url).buffer()
     
     def extract_schedule_data(self, pdf_file: BytesIO, meet_name: str) -> List[Dict]:
         """
@@ -841,10 +842,9 @@ class ScheduleScraper:
         """
         try:
             # Download PDF
-            pdf_file = self.download_pdf(pdf_url)
-            
-            # Extract data
-            raw_entries = self.extract_schedule_data(pdf_file, meet_name)
+            with self.download_pdf(pdf_url) as pdf_file:
+                # Extract data
+                raw_entries = self.extract_schedule_data(pdf_file, meet_name)
             
             if not raw_entries:
                 print("WARNING: No schedule entries were extracted from the PDF")
@@ -921,8 +921,8 @@ Examples:
     
     if args.csv:
         # CSV export mode
-        pdf_file = scraper.download_pdf(args.url)
-        raw_entries = scraper.extract_schedule_data(pdf_file, args.meet_name)
+        with scraper.download_pdf(args.url) as pdf_file:
+            raw_entries = scraper.extract_schedule_data(pdf_file, args.meet_name)
         formatted_entries = scraper.format_for_database(raw_entries)
         
         if formatted_entries:
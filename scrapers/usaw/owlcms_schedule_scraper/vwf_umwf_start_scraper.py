@@ -12,13 +12,17 @@ USAGE:
   source venv/bin/activate && python vwf_umwf_start_scraper.py --url "https://..." --csv output.csv
 """
 
+import os
 import re
-import requests
+import sys
 from io import BytesIO
-from typing import List, Dict, Optional
+from typing import BinaryIO, List, Dict, Optional
 import pdfplumber
 import csv
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'shared'))
+from pdf_cache import fetch_pdf
+
 # Default configuration
 DEFAULT_PDF_URL = "https://assets.contentstack.io/v3/assets/blteb7d012fc7ebef7f/bltaf13d0f8e4d7f2ff/690f8f3a424c334535bc914e/2025_-_VWF_UMWF_-_Start_List.pdf"
 DEFAULT_MEET_NAME = "2025 Virus Weightlifting Finals, Powered by Rogue Fitness"
@@ -32,20 +36,18 @@ class VWFStartListScraper:
         """Initialize the scraper"""
         pass
     
-    def download_pdf(self, url: str) -> BytesIO:
+    def download_pdf(self, url: str) -> BinaryIO:
         """
-        Download PDF from URL
+        Download PDF from URL, or reuse the cached copy if it hasn't changed
         
         Args:
             url: URL to the PDF file
             
         Returns:
-            BytesIO object containing the PDF data
+            Read-only file object (memory-mapped) containing the PDF data, close it when done
         """
         print(f"Downloading PDF from {url}...")
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
-        return BytesIO(response.content)
+        return fetch_pdf(url).buffer()
     
     def extract_athlete_data(self, pdf_file: BytesIO, meet_name: str) -> List[Dict]:
         """
@@ -385,10 +387,9 @@ class VWFStartListScraper:
         """
         try:
             # Download PDF
-            pdf_file = self.download_pdf(pdf_url)
-            
-            # Extract data
-            athletes = self.extract_athlete_data(pdf_file, meet_name)
+            with self.download_pdf(pdf_url) as pdf_file:
+                # Extract data
+                athletes = self.extract_athlete_data(pdf_file, meet_name)
             
             if not athletes:
                 print("WARNING: No athlete data was extracted from the PDF")
@@ -10,12 +10,14 @@ USAGE:
   
   # Full run (update database)
   source venv/bin/activate && python scraper.py
+  
+  # Parse and sync even if the PDF hasn't changed since the last sync
+  source venv/bin/activate && python scraper.py --force
 """
 
 import os
 import sys
 import argparse
-import requests
 import pdfplumber
 import pandas as pd
 from io import BytesIO
@@ -23,6 +25,10 @@ from datetime import datetime
 from typing import List, Dict, Any, Optional, Union
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'shared'))
+from pdf_cache import CachedPDF, fetch_pdf
+from parsed_pdf_cache import content_sha256, default_parsed_cache
+
 try:
     from supabase import create_client, Client
 except ImportError:
@@ -32,6 +38,8 @@ except ImportError:
 # Load environment variables
 load_dotenv()
 
+PARSER_VERSION = "1"  # of scrape_qt_pdf(), see parsed_pdf_cache
+
 
 def scrape_qt_pdf(pdf_source: Union[str, BytesIO]):
     """
@@ -202,19 +210,10 @@ class QualifyingTotalsScraper:
         """Initialize the scraper."""
         self.supabase: Optional[Client] = None
     
-    def download_pdf(self, url: str) -> BytesIO:
-        """Download PDF from URL."""
+    def download_pdf(self, url: str) -> CachedPDF:
+        """Download PDF from URL, or reuse the cached copy if it hasn't changed."""
         print(f"Downloading PDF from {url}...")
-        
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-        }
-        
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()
-        
-        print("✓ PDF downloaded")
-        return BytesIO(response.content)
+        return fetch_pdf(url)
     
     def setup_supabase_client(self):
         """Initialize Supabase client."""
@@ -380,7 +379,8 @@ class QualifyingTotalsScraper:
         
         return {'inserted': inserted, 'updated': updated}
     
-    def run(self, dry_run: bool = False, pdf_source: Optional[Union[str, BytesIO]] = None, output_path: str = 'output.csv'):
+    def run(self, dry_run: bool = False, pdf_source: Optional[Union[str, BytesIO]] = None, output_path: str = 'output.csv',
+            force: bool = False):
         """
         Main execution method.
         
@@ -388,29 +388,42 @@ class QualifyingTotalsScraper:
             dry_run: If True, preview changes without updating database
             pdf_source: PDF file path, URL, or BytesIO object. If None, uses default URL.
             output_path: Path to save CSV output
+            force: If True, parse and sync the PDF even if it hasn't changed since the last sync
         """
         print("="*60)
         print("Qualifying Totals Scraper")
         print("="*60 + "\n")
         
-        # Determine PDF source
+        # Determine PDF source, a downloaded one is a buffer that gets closed once the run is done
+        pdf = None
         if pdf_source is None:
             # Use default URL
             pdf_display = self.DEFAULT_PDF_URL
-            pdf_source = self.download_pdf(self.DEFAULT_PDF_URL)
+            pdf = self.download_pdf(self.DEFAULT_PDF_URL)
+            pdf_source, pdf_sha256 = pdf.buffer(), pdf.sha256
         elif isinstance(pdf_source, str) and pdf_source.startswith('http'):
             # It's a URL, download it
             pdf_display = pdf_source
-            pdf_source = self.download_pdf(pdf_source)
+            pdf = self.download_pdf(pdf_source)
+            pdf_source, pdf_sha256 = pdf.buffer(), pdf.sha256
         else:
             # It's a file path or BytesIO
             pdf_display = pdf_source if isinstance(pdf_source, str) else "provided PDF"
+            pdf_sha256 = None
         
         print(f"Scraping data from {pdf_display}...")
         
         try:
             # Scrape the PDF
-            df = scrape_qt_pdf(pdf_source)
+            if pdf_sha256 is None:
+                pdf_sha256 = content_sha256(pdf_source)
+            parsed_cache = default_parsed_cache()
+            cache_key = "qt"
+            rows, already_synced = parsed_cache.load_or_parse(
+                cache_key, PARSER_VERSION, pdf_sha256, lambda: scrape_qt_pdf(pdf_source).to_dict('records'), force)
+            if already_synced:
+                return
+            df = pd.DataFrame(rows)
             
             # Save to CSV
             df.to_csv(output_path, index=False)
@@ -433,6 +446,7 @@ class QualifyingTotalsScraper:
                 result = self.upsert_to_supabase(records)
                 print(f"\n✓ Complete: {len(result['inserted'])} inserted, "
                       f"{len(result['updated'])} updated")
+                parsed_cache.mark_synced(cache_key, PARSER_VERSION, pdf_sha256)
             
             # Display first few rows
             print("\nFirst 5 rows:")
@@ -446,6 +460,9 @@ class QualifyingTotalsScraper:
             import traceback
             traceback.print_exc()
             sys.exit(1)
+        finally:
+            if pdf is not None:
+                pdf_source.close()
 
 
 def main():
@@ -470,11 +487,16 @@ def main():
         default='output.csv',
         help='Path to output CSV file (default: output.csv)'
     )
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Parse and sync the PDF even if it has not changed since the last sync'
+    )
     
     args = parser.parse_args()
     
     scraper = QualifyingTotalsScraper()
-    scraper.run(dry_run=args.dry_run, pdf_source=args.pdf, output_path=args.output)
+    scraper.run(dry_run=args.dry_run, pdf_source=args.pdf, output_path=args.output, force=args.force)
 
 
 if __name__ == '__main__':
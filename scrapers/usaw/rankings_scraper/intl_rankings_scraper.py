@@ -7,12 +7,15 @@ import sys
 import argparse
 import logging
 import requests
-from typing import List, Dict, Optional
+from typing import BinaryIO, List, Dict, Optional
 from io import BytesIO
 from decimal import Decimal
 from dotenv import load_dotenv
 import pdfplumber
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'shared'))
+from pdf_cache import fetch_pdf
+
 # ============================================================================
 # CONFIGURATION - Enter your PDF URL here
 # ============================================================================
@@ -34,22 +37,19 @@ logging.basicConfig(
 )
 
 
-def download_pdf(url: str) -> Optional[BytesIO]:
+def download_pdf(url: str) -> Optional[BinaryIO]:
     """
-    Download PDF from URL and return as BytesIO object.
+    Download PDF from URL, or reuse the cached copy if it hasn't changed.
 
     Args:
         url: The URL of the PDF to download
 
     Returns:
-        BytesIO object containing the PDF data, or None if download fails
+        Read-only file object (memory-mapped) containing the PDF data, or None if download fails. Close it when done
     """
     try:
         print(f"Downloading PDF from: {url}")
-        response = requests.get(url, timeout=60)
-        response.raise_for_status()
-        print("PDF downloaded successfully")
-        return BytesIO(response.content)
+        return fetch_pdf(url, timeout=60).buffer()
     except requests.exceptions.RequestException as e:
         logging.error(f"Error downloading PDF: {e}")
         return None
@@ -515,7 +515,8 @@ def scrape_rankings_pdf(url: str, dry_run: bool = False) -> int:
         return 0
 
     # Extract text
-    text = extract_text_from_pdf(pdf_file)
+    with pdf_file:
+        text = extract_text_from_pdf(pdf_file)
     if not text:
         logging.error("Failed to extract text from PDF")
         return 0
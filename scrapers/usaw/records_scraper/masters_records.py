@@ -8,20 +8,26 @@ USAGE:
   
   # Full run (update database)
   source venv/bin/activate && python masters_records.py
+  
+  # Parse and sync even if the PDF hasn't changed since the last sync
+  source venv/bin/activate && python masters_records.py --force
 """
 
 import os
 import sys
 import argparse
 import csv
-import io
 import re
 import requests
-from typing import List, Dict, Any, Optional
+from typing import BinaryIO, List, Dict, Any, Optional
 from datetime import datetime
 from dotenv import load_dotenv
 import pdfplumber
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'shared'))
+from pdf_cache import fetch_pdf
+from parsed_pdf_cache import default_parsed_cache
+
 try:
     from supabase import create_client, Client
 except ImportError:
@@ -31,6 +37,8 @@ except ImportError:
 # Load environment variables
 load_dotenv()
 
+PARSER_VERSION = "1"  # of extract_records_from_pdf(), see parsed_pdf_cache
+
 
 class USAMWMastersRecordsScraper:
     """Scraper for USAMW Masters Records."""
@@ -129,10 +137,13 @@ class USAMWMastersRecordsScraper:
             return "women"
         return None
     
-    def extract_records_from_pdf(self) -> List[Dict[str, Any]]:
+    def extract_records_from_pdf(self, pdf_content: BinaryIO) -> List[Dict[str, Any]]:
         """
         Extract USAMW masters records from PDF table format.
         
+        Args:
+            pdf_content: The records PDF as a seekable file object
+        
         Returns:
             List of record dictionaries with keys: record_type, age_category, gender, 
             weight_class, snatch_record, cj_record, total_record
@@ -140,14 +151,6 @@ class USAMWMastersRecordsScraper:
         print("Extracting USAMW masters records from PDF...")
         records_dict = {}  # Key: (age_category, gender, weight_class)
         
-        try:
-            response = requests.get(self.pdf_url, timeout=30)
-            response.raise_for_status()
-            pdf_content = io.BytesIO(response.content)
-        except requests.exceptions.RequestException as e:
-            print(f"Error downloading PDF: {e}")
-            return []
-        
         current_gender = None
         current_age_group = None
 
@@ -598,14 +601,34 @@ class USAMWMastersRecordsScraper:
         except requests.exceptions.RequestException as e:
             print(f"⚠ Failed to send Slack notification: {e}")
     
-    def run(self, dry_run: bool = False):
-        """Main execution method."""
+    def run(self, dry_run: bool = False, force: bool = False):
+        """
+        Main execution method.
+        
+        Args:
+            dry_run: If True, preview changes without updating database
+            force: If True, parse and sync the PDF even if it hasn't changed since the last sync
+        """
         print("="*60)
         print("USAMW Masters Records Scraper")
         print("="*60 + "\n")
         
+        # Download PDF
+        try:
+            pdf = fetch_pdf(self.pdf_url)
+        except requests.exceptions.RequestException as e:
+            print(f"Error downloading PDF: {e}")
+            return
+        
         # Extract records
-        records = self.extract_records_from_pdf()
+        def parse():
+            with pdf.buffer() as pdf_buffer:
+                return self.extract_records_from_pdf(pdf_buffer)
+        
+        parsed_cache = default_parsed_cache()
+        records, already_synced = parsed_cache.load_or_parse("masters_records", PARSER_VERSION, pdf.sha256, parse, force)
+        if already_synced:
+            return
         
         if not records:
             print("✗ No records extracted from PDF. Exiting.")
@@ -635,6 +658,7 @@ class USAMWMastersRecordsScraper:
             print("="*60 + "\n")
             result = self.upsert_to_supabase(records)
             print(f"\n✓ Complete: {len(result['inserted'])} inserted, {len(result['updated'])} updated")
+            parsed_cache.mark_synced("masters_records", PARSER_VERSION, pdf.sha256)
             
             # Send Slack notification
             self.send_slack_notification(result['inserted'], result['updated'])
@@ -656,11 +680,16 @@ def main():
         default="https://storage.googleapis.com/production-ipower-v1-0-4/354/1018354/vixoE8Rk/f65c21bd9e714f2489f72387176e8f79?fileName=NM20251214-WOMEN.pdf",
         help='URL of the USAMW Masters Records PDF'
     )
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Parse and sync the PDF even if it has not changed since the last sync'
+    )
     
     args = parser.parse_args()
     
     scraper = USAMWMastersRecordsScraper(args.pdf_url)
-    scraper.run(dry_run=args.dry_run)
+    scraper.run(dry_run=args.dry_run, force=args.force)
 
 
 if __name__ == "__main__":
@@ -15,21 +15,27 @@ USAGE:
   
   # Full run (update database)
   source venv/bin/activate && python records_scraper.py
+  
+  # Parse and sync even if the PDF hasn't changed since the last sync
+  source venv/bin/activate && python records_scraper.py --force
 """
 
 import os
 import sys
 import argparse
 import csv
-import io
 import re
 import requests
-from typing import List, Dict, Any, Optional
+from typing import BinaryIO, List, Dict, Any, Optional
 from datetime import datetime
 from dotenv import load_dotenv
 import pdfplumber
 from bs4 import BeautifulSoup
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'shared'))
+from pdf_cache import fetch_pdf
+from parsed_pdf_cache import default_parsed_cache
+
 try:
     from supabase import create_client, Client
 except ImportError:
@@ -39,6 +45,8 @@ except ImportError:
 # Load environment variables
 load_dotenv()
 
+PARSER_VERSION = "1"  # of extract_records_from_pdf(), see parsed_pdf_cache
+
 
 class RecordsScraper:
     """Scraper for USA Weightlifting American Records."""
@@ -285,10 +293,13 @@ class RecordsScraper:
             return "women"
         return None
     
-    def extract_records_from_pdf(self) -> List[Dict[str, Any]]:
+    def extract_records_from_pdf(self, pdf_content: BinaryIO) -> List[Dict[str, Any]]:
         """
         Extract weightlifting records from PDF table format.
         
+        Args:
+            pdf_content: The records PDF as a seekable file object
+        
         Returns:
             List of record dictionaries with keys: record_type, age_category, gender, 
             weight_class, snatch_record, cj_record, total_record
@@ -298,14 +309,6 @@ class RecordsScraper:
         age_groups_found = set()  # Track all age groups encountered
         age_groups_skipped = set()  # Track skipped age groups
         
-        try:
-            response = requests.get(self.pdf_url, timeout=30)
-            response.raise_for_status()
-            pdf_content = io.BytesIO(response.content)
-        except requests.exceptions.RequestException as e:
-            print(f"Error downloading PDF: {e}")
-            return []
-        
         with pdfplumber.open(pdf_content) as pdf:
             for page_num, page in enumerate(pdf.pages, 1):
                 print(f"  Processing page {page_num}/{len(pdf.pages)}...")
@@ -662,8 +665,14 @@ class RecordsScraper:
         except requests.exceptions.RequestException as e:
             print(f"⚠ Failed to send Slack notification: {e}")
     
-    def run(self, dry_run: bool = False):
-        """Main execution method."""
+    def run(self, dry_run: bool = False, force: bool = False):
+        """
+        Main execution method.
+        
+        Args:
+            dry_run: If True, preview changes without updating database
+            force: If True, parse and sync the PDF even if it hasn't changed since the last sync
+        """
         print("="*60)
         print("USA Weightlifting Records Scraper")
         print("="*60 + "\n")
@@ -676,8 +685,22 @@ class RecordsScraper:
         
         self.pdf_url = pdf_url
         
+        # Download PDF
+        try:
+            pdf = fetch_pdf(self.pdf_url)
+        except requests.exceptions.RequestException as e:
+            print(f"Error downloading PDF: {e}")
+            return
+        
         # Extract records
-        records = self.extract_records_from_pdf()
+        def parse():
+            with pdf.buffer() as pdf_buffer:
+                return self.extract_records_from_pdf(pdf_buffer)
+        
+        parsed_cache = default_parsed_cache()
+        records, already_synced = parsed_cache.load_or_parse("records", PARSER_VERSION, pdf.sha256, parse, force)
+        if already_synced:
+            return
         
         if not records:
             print("✗ No records extracted from PDF. Exiting.")
@@ -707,6 +730,7 @@ class RecordsScraper:
             print("="*60 + "\n")
             result = self.upsert_to_supabase(records)
             print(f"\n✓ Complete: {len(result['inserted'])} inserted, {len(result['updated'])} updated")
+            parsed_cache.mark_synced("records", PARSER_VERSION, pdf.sha256)
             
             # Send Slack notification
             self.send_slack_notification(result['inserted'], result['updated'])
@@ -722,11 +746,16 @@ def main():
         action='store_true',
         help='Preview changes without updating database'
     )
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Parse and sync the PDF even if it has not changed since the last sync'
+    )
     
     args = parser.parse_args()
     
     scraper = RecordsScraper()
-    scraper.run(dry_run=args.dry_run)
+    scraper.run(dry_run=args.dry_run, force=args.force)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,115 @@
+# bench_pull_tables.py
+"""
+Times helpers.pull_tables against the old extract_table -> flatten_list -> recursive_anti_nester route on the
+saved legacy HTML in fixtures/, and checks both give the same rows.
+
+    python benchmarks/bench_pull_tables.py --scale 20 --repeat 5
+
+--scale repeats every table in a fixture that many times, to get to the size of a national championship
+start list.
+"""
+import argparse
+import os
+import re
+import sys
+import timeit
+from types import SimpleNamespace
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sport80.helpers import pull_tables, strip_report_id, HTML_PARSER  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+TABLE_PATTERN = re.compile(r"<table.*?</table>", re.DOTALL)
+
+
+def legacy_pull_tables(page_content) -> list:
+    """The pull_tables route from before the single pass rewrite, kept here as the baseline."""
+    soup_parse = BeautifulSoup(page_content.text, "html.parser")
+    table_list = list(soup_parse.find_all("table"))
+    if len(table_list) > 1:
+        parsed_table = [_legacy_headers(table_list[0])] + [_legacy_body(table) for table in table_list]
+    elif len(table_list) == 1:
+        parsed_table = [_legacy_headers(table_list[0]), _legacy_body(table_list[0])]
+    else:
+        return []
+    return _legacy_flatten([x for x in parsed_table if x != []])
+
+
+def _legacy_flatten(nested_list: list) -> list:
+    flat_list = []
+
+    def flatten(big_list):
+        for line_count, lines in enumerate(big_list):
+            if not any(isinstance(index, list) for index in lines):
+                flat_list.append(lines)
+            else:
+                flatten(big_list[line_count])
+
+    flatten(nested_list)
+    return flat_list
+
+
+def _legacy_headers(table) -> list:
+    return [tbl_hdr.text.strip() for tbl_hdr in table.find("tr").find_all("th")]
+
+
+def _legacy_body(table) -> list:
+    rows = []
+    for tbl_row in table.find_all("tr")[1:]:
+        cells = []
+        tds = tbl_row.find_all("td")
+        if len(tds) == 0:
+            for tbl_hdr in tbl_row.find_all("th"):
+                cells.append(tbl_hdr.text.strip())
+        else:
+            for tbl_dat in tds:
+                links = tbl_dat.find_all(href=True)
+                if len(links) == 1:
+                    cells.append(strip_report_id(links[0]['href']))
+                elif len(tbl_dat.find_all('i')) == 1:
+                    strip_it = str(tbl_dat.find_all('i'))
+                    if "data-id-resource" in strip_it:
+                        cells.append(re.search(r'\d+', strip_it).group())
+                    else:
+                        cells.append(strip_it)
+                else:
+                    cells.append(tbl_dat.text.strip())
+        rows.append(cells)
+    return rows
+
+
+def load_fixture(filename: str, scale: int) -> SimpleNamespace:
+    """The fixture wrapped up like a requests.Response, with every table repeated scale times."""
+    with open(os.path.join(FIXTURES_DIR, filename), encoding="utf-8") as fixture_file:
+        html = fixture_file.read()
+    if scale > 1:
+        html = TABLE_PATTERN.sub(lambda match: match.group(0) * scale, html)
+    return SimpleNamespace(text=html)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark legacy HTML table extraction.")
+    parser.add_argument("--scale", type=int, default=10, help="Times to repeat each table in a fixture")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per fixture, the best one is reported")
+    args = parser.parse_args()
+
+    print(f"Parser backend: {HTML_PARSER}, scale: {args.scale}")
+    for filename in sorted(os.listdir(FIXTURES_DIR)):
+        if not filename.endswith(".html"):
+            continue
+        page = load_fixture(filename, args.scale)
+        new_rows = pull_tables(page)
+        legacy_rows = legacy_pull_tables(page)
+        if new_rows != legacy_rows:
+            raise SystemExit(f"{filename}: pull_tables rows differ from the legacy extraction")
+
+        legacy_best = min(timeit.repeat(lambda: legacy_pull_tables(page), number=1, repeat=args.repeat))
+        new_best = min(timeit.repeat(lambda: pull_tables(page), number=1, repeat=args.repeat))
+        print(f"{filename}: {len(new_rows)} rows, legacy {legacy_best * 1000:.1f} ms, "
+              f"pull_tables {new_best * 1000:.1f} ms ({legacy_best / new_best:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
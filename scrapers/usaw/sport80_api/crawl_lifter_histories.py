@@ -0,0 +1,286 @@
+# crawl_lifter_histories.py
+"""
+Bulk crawler for Sport80 lifter histories.
+
+Walks the results of every event that's already been ingested into lifting_results, collects the athlete IDs
+the result rows link to (each athlete once, however many events they lifted at) and pulls their histories
+concurrently. Every request to Sport80, the event scans and each page of a history alike, takes a token from one
+token bucket first, so LIFTER_CRAWL_RATE holds however many pages and workers are in flight. Everything goes into
+a local SQLite file as it arrives, so an interrupted crawl picks up where it stopped and analytics
+(e.g. scrapers/usaw/PG) can read histories from there instead of scanning Supabase.
+
+    python crawl_lifter_histories.py --federations USAW,BWL --start-year 2024
+"""
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone, timedelta
+from typing import Iterator, Optional
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+
+from sport80 import SportEighty, ResponseCache, Sport80FetchError
+from sport80.helpers import event_id_from_dict, lifter_id_from_dict
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'shared'))
+from lifting_results_db import find_existing_event_ids
+from update_supabase_from_sport80 import FEDERATIONS, SYNC_FEDERATIONS, SUPABASE_URL, SUPABASE_KEY, \
+    SUPABASE_TABLE_NAME, SPORT80_PAGE_WORKERS, SPORT80_CACHE_PATH, FederationConfig, get_nested_value
+
+# --- Configuration ---
+LIFTER_HISTORY_DB_PATH = os.environ.get("LIFTER_HISTORY_DB_PATH", "lifter_histories.sqlite")
+LIFTER_CRAWL_WORKERS = int(os.environ.get("LIFTER_CRAWL_WORKERS", "8"))  # histories being fetched at once
+LIFTER_CRAWL_RATE = float(os.environ.get("LIFTER_CRAWL_RATE", "4"))  # Sport80 requests per second, sustained
+LIFTER_CRAWL_BURST = int(os.environ.get("LIFTER_CRAWL_BURST", "8"))  # requests allowed back to back after a pause
+# Histories older than this get fetched again, lifters keep competing
+LIFTER_REFRESH_DAYS = int(os.environ.get("LIFTER_REFRESH_DAYS", "30"))
+
+
+class TokenBucket:
+    """Thread-safe token bucket: rate tokens a second, holding at most capacity. acquire() blocks until one is free."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_seconds = (1 - self._tokens) / self.rate
+            time.sleep(wait_seconds)
+
+
+class RateLimitedAdapter(BaseAdapter):
+    """Transport adapter that takes a token from the bucket before every request, then sends it through adapter."""
+
+    def __init__(self, bucket: TokenBucket, adapter: Optional[BaseAdapter] = None):
+        super().__init__()
+        self.bucket = bucket
+        self.adapter = adapter or HTTPAdapter()
+
+    def send(self, request, **kwargs):
+        self.bucket.acquire()
+        return self.adapter.send(request, **kwargs)
+
+    def close(self):
+        self.adapter.close()
+
+
+class LifterHistoryStore:
+    """
+    SQLite file holding the athletes found in event results, which events have been scanned for them, and each
+    athlete's history rows. Safe to share between threads.
+    """
+
+    def __init__(self, path: str = LIFTER_HISTORY_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS scanned_events (
+                federation TEXT NOT NULL,
+                event_id TEXT NOT NULL,
+                scanned_at TEXT NOT NULL,
+                PRIMARY KEY (federation, event_id));
+            CREATE TABLE IF NOT EXISTS athletes (
+                federation TEXT NOT NULL,
+                lifter_id TEXT NOT NULL,
+                name TEXT,
+                first_seen_event_id TEXT,
+                history_fetched_at TEXT,
+                PRIMARY KEY (federation, lifter_id));
+            CREATE TABLE IF NOT EXISTS lifter_history (
+                federation TEXT NOT NULL,
+                lifter_id TEXT NOT NULL,
+                row_index INTEGER NOT NULL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (federation, lifter_id, row_index));
+        """)
+        self._db.commit()
+
+    def scanned_event_ids(self, federation: str) -> set[str]:
+        with self._lock:
+            rows = self._db.execute("SELECT event_id FROM scanned_events WHERE federation = ?", (federation,))
+            return {row[0] for row in rows}
+
+    def add_event_athletes(self, federation: str, event_id: str, athletes: dict[str, Optional[str]]):
+        """Record the athletes (lifter ID -> name) found in one event and mark the event scanned, all at once."""
+        with self._lock:
+            self._db.executemany("INSERT OR IGNORE INTO athletes (federation, lifter_id, name, first_seen_event_id) "
+                                 "VALUES (?, ?, ?, ?)",
+                                 [(federation, lifter_id, name, event_id) for lifter_id, name in athletes.items()])
+            self._db.execute("INSERT OR REPLACE INTO scanned_events VALUES (?, ?, ?)",
+                             (federation, event_id, datetime.now(timezone.utc).isoformat()))
+            self._db.commit()
+
+    def athletes_to_fetch(self, federation: str, refresh_days: int = LIFTER_REFRESH_DAYS) -> list[str]:
+        """Lifter IDs never fetched, or last fetched more than refresh_days ago."""
+        refresh_before = (datetime.now(timezone.utc) - timedelta(days=refresh_days)).isoformat()
+        with self._lock:
+            rows = self._db.execute("SELECT lifter_id FROM athletes WHERE federation = ? AND "
+                                    "(history_fetched_at IS NULL OR history_fetched_at < ?)",
+                                    (federation, refresh_before))
+            return [row[0] for row in rows]
+
+    def store_history(self, federation: str, lifter_id: str, history_rows: list[dict]):
+        """Replace one athlete's history rows and stamp the fetch time."""
+        with self._lock:
+            self._db.execute("DELETE FROM lifter_history WHERE federation = ? AND lifter_id = ?",
+                             (federation, lifter_id))
+            self._db.executemany("INSERT INTO lifter_history VALUES (?, ?, ?, ?)",
+                                 [(federation, lifter_id, index, json.dumps(row))
+                                  for index, row in enumerate(history_rows)])
+            self._db.execute("UPDATE athletes SET history_fetched_at = ? WHERE federation = ? AND lifter_id = ?",
+                             (datetime.now(timezone.utc).isoformat(), federation, lifter_id))
+            self._db.commit()
+
+    def iter_history(self, federation: Optional[str] = None) -> Iterator[dict]:
+        """Every stored history row, with the athlete's federation, lifter_id and name added to it."""
+        query = ("SELECT h.federation, h.lifter_id, a.name, h.data FROM lifter_history h "
+                 "JOIN athletes a ON a.federation = h.federation AND a.lifter_id = h.lifter_id")
+        params = ()
+        if federation:
+            query += " WHERE h.federation = ?"
+            params = (federation,)
+        with self._lock:
+            rows = self._db.execute(query + " ORDER BY h.federation, h.lifter_id, h.row_index", params).fetchall()
+        for row_federation, lifter_id, name, data in rows:
+            yield {**json.loads(data), "federation": row_federation, "lifter_id": lifter_id, "lifter_name": name}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def ingested_events(api_client: SportEighty, federation: FederationConfig, session: requests.Session,
+                    start_year: int) -> list[dict]:
+    """Event index entries from start_year onwards whose results are already in lifting_results."""
+    range_end = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    events = list(api_client.iter_event_index_range(f"{start_year}-01-01", range_end))
+    events_by_id = {}
+    for event_dict in events:
+        try:
+            events_by_id[event_id_from_dict(event_dict)] = event_dict
+        except (KeyError, IndexError, TypeError):
+            continue
+    existing_ids = find_existing_event_ids(SUPABASE_URL, SUPABASE_KEY, list(events_by_id), federation=federation.code,
+                                           table=SUPABASE_TABLE_NAME, session=session)
+    logging.info(f"{len(existing_ids)} of {len(events_by_id)} {federation.code} events since {start_year} are ingested.")
+    return [event_dict for event_id, event_dict in events_by_id.items() if event_id in existing_ids]
+
+
+def collect_athletes(api_client: SportEighty, federation: FederationConfig, store: LifterHistoryStore,
+                     events: list[dict]):
+    """Scan the results of every event not scanned before for the athlete IDs they link to."""
+    scanned = store.scanned_event_ids(federation.code)
+    to_scan = [event_dict for event_dict in events if event_id_from_dict(event_dict) not in scanned]
+    logging.info(f"Scanning {len(to_scan)} {federation.code} event(s) for athletes, {len(events) - len(to_scan)} done before.")
+    for event_dict in to_scan:
+        event_id = event_id_from_dict(event_dict)
+        athletes = {}
+        try:
+            for result_row in api_client.iter_event_results(event_dict):
+                lifter_id = lifter_id_from_dict(result_row)
+                if lifter_id:
+                    athletes[lifter_id] = get_nested_value(result_row, "lifter", "Athlete") or \
+                                          get_nested_value(result_row, "name", "Name")
+        except Sport80FetchError as e:
+            # Not marked as scanned, so the next run tries the event again
+            logging.error(f"Event {event_id}: incomplete results, skipping it for now: {e}")
+            continue
+        store.add_event_athletes(federation.code, event_id, athletes)
+        logging.info(f"Event {event_id}: {len(athletes)} athlete(s).")
+
+
+def fetch_histories(api_client: SportEighty, federation: FederationConfig, store: LifterHistoryStore) -> tuple[int, int]:
+    """Fetch every pending history concurrently, storing each as soon as it arrives."""
+    lifter_ids = store.athletes_to_fetch(federation.code)
+    logging.info(f"Fetching {len(lifter_ids)} {federation.code} lifter histories with {LIFTER_CRAWL_WORKERS} workers "
+                 f"at {LIFTER_CRAWL_RATE}/s.")
+
+    def fetch_one(lifter_id: str) -> Optional[list[dict]]:
+        history_pages = api_client.lifter_history(lifter_id)
+        if not history_pages:
+            return None
+        return [row for page in history_pages.values() for row in page.get('data', [])]
+
+    fetched, failed = 0, 0
+    with ThreadPoolExecutor(max_workers=LIFTER_CRAWL_WORKERS) as pool:
+        futures = {pool.submit(fetch_one, lifter_id): lifter_id for lifter_id in lifter_ids}
+        for future in as_completed(futures):
+            lifter_id = futures[future]
+            try:
+                history_rows = future.result()
+            except Exception as e:
+                logging.error(f"Error fetching history for lifter {lifter_id}: {e}")
+                history_rows = None
+            if history_rows is None:
+                failed += 1
+                continue
+            store.store_history(federation.code, lifter_id, history_rows)
+            fetched += 1
+            if fetched % 100 == 0:
+                logging.info(f"{federation.code}: {fetched}/{len(lifter_ids)} histories stored.")
+    return fetched, failed
+
+
+def main(federation_codes: list[str], start_year: int):
+    if not SUPABASE_URL or not SUPABASE_KEY:
+        logging.critical("SUPABASE_URL and SUPABASE_KEY must be set. Exiting.")
+        return
+
+    session = requests.Session()
+    pooled_adapter = HTTPAdapter(pool_maxsize=max(10, LIFTER_CRAWL_WORKERS, SPORT80_PAGE_WORKERS))
+    session.mount("https://", pooled_adapter)
+    session.mount("http://", pooled_adapter)
+    # Sport80 requests go through the bucket, Supabase lookups and cache hits don't
+    rate_limited_adapter = RateLimitedAdapter(TokenBucket(LIFTER_CRAWL_RATE, LIFTER_CRAWL_BURST), pooled_adapter)
+    for code in federation_codes:
+        session.mount(FEDERATIONS[code].domain, rate_limited_adapter)
+    sport80_cache = ResponseCache(SPORT80_CACHE_PATH) if SPORT80_CACHE_PATH else None
+    store = LifterHistoryStore(LIFTER_HISTORY_DB_PATH)
+    try:
+        for code in federation_codes:
+            federation = FEDERATIONS[code]
+            api_client = SportEighty(subdomain=federation.domain, return_dict=True, debug=logging.WARNING,
+                                     page_workers=SPORT80_PAGE_WORKERS, cache=sport80_cache, session=session)
+            events = ingested_events(api_client, federation, session, start_year)
+            collect_athletes(api_client, federation, store, events)
+            fetched, failed = fetch_histories(api_client, federation, store)
+            logging.info(f"{federation.code}: stored {fetched} lifter histories, {failed} failed "
+                         f"(rerun to retry them) in {LIFTER_HISTORY_DB_PATH}.")
+    finally:
+        store.close()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Crawl Sport80 lifter histories into a local SQLite file.")
+    parser.add_argument("--federations", default=SYNC_FEDERATIONS,
+                        help=f"Comma separated federations to crawl, any of {', '.join(FEDERATIONS)}")
+    parser.add_argument("--start-year", type=int, default=datetime.now(timezone.utc).year - 1,
+                        help="Only athletes from events in this year or later (default: last year)")
+    args = parser.parse_args()
+    federation_codes = [code.strip().upper() for code in args.federations.split(",") if code.strip()]
+    unknown_codes = [code for code in federation_codes if code not in FEDERATIONS]
+    if unknown_codes:
+        parser.error(f"Unknown federation(s) {unknown_codes}, expected some of {list(FEDERATIONS)}")
+    return federation_codes, args.start_year
+
+
+if __name__ == "__main__":
+    main(*parse_args())
@@ -0,0 +1,97 @@
+# export_rankings.py
+"""
+Snapshot Sport80 rankings for a date range into a Parquet or Arrow IPC file.
+
+The range is split into windows (SportEighty.rankings_windowed) that are fetched in parallel, so a full season
+doesn't go out as one huge request. A result that comes back in more than one window is kept once. Sport80 ranks
+each window on its own, so the rank column is a row's place within its window, not across the whole range; sort
+on total within a weight class for a ranking of the range.
+
+    python export_rankings.py --federation USAW --start 2025-01-01 --end 2025-12-31 --output rankings_2025.parquet
+    python export_rankings.py --start 2025-01-01 --end 2025-12-31 --filters '{"weight_class": 12}' --output w12.arrow
+
+Needs pyarrow (pip install pyarrow).
+"""
+import json
+import logging
+import argparse
+from datetime import datetime, timezone
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pa_parquet
+except ImportError:
+    pa = None
+
+from sport80 import SportEighty, ResponseCache
+from update_supabase_from_sport80 import FEDERATIONS, SPORT80_PAGE_WORKERS, SPORT80_CACHE_PATH
+
+RANKINGS_WINDOW_DAYS = 31
+RANKINGS_WINDOW_WORKERS = 4
+
+
+def rows_to_table(rows: list[dict]):
+    """
+    Columnar table from the ranking rows, one column per field seen in any row.
+    Nested values (lists/dicts such as the action routes) are stored as JSON strings, and a column whose values
+    won't fit one Arrow type is stored as strings.
+    """
+    column_names = list(dict.fromkeys(key for row in rows for key in row))
+    columns = {}
+    for column_name in column_names:
+        values = [row.get(column_name) for row in rows]
+        values = [json.dumps(value) if isinstance(value, (list, dict)) else value for value in values]
+        try:
+            columns[column_name] = pa.array(values)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError):
+            columns[column_name] = pa.array([None if value is None else str(value) for value in values],
+                                            type=pa.string())
+    return pa.table(columns)
+
+
+def write_table(table, output_path: str, file_format: str):
+    if file_format == "parquet":
+        pa_parquet.write_table(table, output_path, compression="zstd")
+    else:
+        with pa.OSFile(output_path, "wb") as sink, pa_ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export Sport80 rankings to Parquet or Arrow IPC.")
+    parser.add_argument("--federation", default="USAW", choices=list(FEDERATIONS))
+    parser.add_argument("--start", required=True, help="Start date, YYYY-MM-DD")
+    parser.add_argument("--end", default=datetime.now(timezone.utc).strftime("%Y-%m-%d"),
+                        help="End date, YYYY-MM-DD (default: today)")
+    parser.add_argument("--filters", default=None,
+                        help="JSON of extra ranking filters from SportEighty.ranking_filters(), e.g. a weight class")
+    parser.add_argument("--window-days", type=int, default=RANKINGS_WINDOW_DAYS)
+    parser.add_argument("--workers", type=int, default=RANKINGS_WINDOW_WORKERS, help="Windows fetched at once")
+    parser.add_argument("--output", required=True, help="Output file, .parquet or .arrow/.feather")
+    parser.add_argument("--format", choices=["parquet", "arrow"], default=None,
+                        help="Output format (default: from the output file's extension)")
+    args = parser.parse_args()
+
+    if pa is None:
+        raise SystemExit("export_rankings.py needs pyarrow, install it with: pip install pyarrow")
+    file_format = args.format or ("parquet" if args.output.endswith(".parquet") else "arrow")
+
+    federation = FEDERATIONS[args.federation]
+    sport80_cache = ResponseCache(SPORT80_CACHE_PATH) if SPORT80_CACHE_PATH else None
+    api_client = SportEighty(subdomain=federation.domain, return_dict=True, debug=logging.WARNING,
+                             page_workers=SPORT80_PAGE_WORKERS, cache=sport80_cache)
+    rows = api_client.rankings_windowed(args.start, args.end, window_days=args.window_days, workers=args.workers,
+                                        additional_args=json.loads(args.filters) if args.filters else None)
+    if not rows:
+        logging.warning(f"No {federation.code} rankings between {args.start} and {args.end}, nothing written.")
+        return
+
+    table = rows_to_table(rows)
+    write_table(table, args.output, file_format)
+    logging.info(f"Wrote {table.num_rows} {federation.code} ranking rows ({table.num_columns} columns) "
+                 f"to {args.output} as {file_format}.")
+
+
+if __name__ == "__main__":
+    main()
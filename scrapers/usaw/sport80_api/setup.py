@@ -12,6 +12,7 @@ setup(
     license="BSD",
     install_requires=["requests",
                       "beautifulsoup4"],
+    extras_require={"async": ["httpx"], "lxml": ["lxml"]},
     classifiers=["Programming Language :: Python :: 3.11"],
     python_requires='>=3.8'
 )
@@ -4,8 +4,13 @@ Totally unofficial Sport80 API package. Meh.
 
 from .sport80 import SportEighty
 from .sport80_http_client import SportEightyHTTP
+from .async_sport80 import AsyncSportEighty, AsyncSportEightyHTTP
 from .helpers import pull_tables
 from .pages_enum import EndPoint
+from .response_cache import ResponseCache
+from .event_dates import EventDateParser, event_datetime, event_sort_key
+from .instrumentation import RequestMetrics
+from .exceptions import Sport80FetchError
 
 __version__ = "2.2.6"
 __author__ = "Euan Meston"
@@ -2,15 +2,28 @@
 Helpers library of static functions
 """
 import csv
+import json
+import math
+import random
 import re
 import socket
+from datetime import date, datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 from logging import info, debug
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from requests import Response
 # from js2py import eval_js
 
 from .pages_enum import LegacyEndPoint
 
+try:
+    import lxml  # noqa: F401  pylint: disable=unused-import
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
 
 def __single_dict_to_list(single_dict: dict) -> list:
     """Used for switching the dict shit to csv/list shit"""
@@ -49,6 +62,108 @@ def collate_index(page_data: dict) -> dict:
     return switch_to_dict
 
 
+def parse_domain_env(page_text: str) -> dict:
+    """ Pulls the window.env JS dict out of a sport80 page, empty dict if it isn't there """
+    match = re.search(r"window.env = ({.*?});", page_text, re.DOTALL)
+    if match:
+        try:
+            return json.loads(match.group(1))
+        except json.JSONDecodeError:
+            return {}
+    return {}
+
+
+def event_id_from_dict(event_dict: dict) -> str:
+    """ The event id is the last part of the route on the event dict from the event index """
+    return event_dict['action'][0]['route'].split('/')[-1]
+
+
+def lifter_id_from_dict(result_dict: dict):
+    """ The athlete id a result row links to through its action routes, None if it doesn't link to one """
+    for action in result_dict.get('action') or []:
+        match = re.search(r"/(?:athletes?|lifters?)/(\d+)", str(action.get('route', '')))
+        if match:
+            return match.group(1)
+    return None
+
+
+def remaining_page_urls(page_one: dict) -> list[str]:
+    """ Works out the URL of every page after the first one from the pagination fields it came back with """
+    try:
+        total = int(page_one['total'])
+        per_page = int(page_one['items_per_page'])
+        next_url = urlsplit(page_one['next_page_url'])
+    except (KeyError, TypeError, ValueError, AttributeError):
+        return []
+    if per_page <= 0:
+        return []
+    query = parse_qsl(next_url.query, keep_blank_values=True)
+    for position, (key, value) in enumerate(query):
+        if key in ("p", "page") and value.isdigit():
+            first_page = int(value)
+            break
+    else:
+        return []
+    page_urls: list = []
+    for page_number in range(first_page, first_page + math.ceil(total / per_page) - 1):
+        query[position] = (key, str(page_number))
+        page_urls.append(urlunsplit(next_url._replace(query=urlencode(query))))
+    return page_urls
+
+
+def date_windows(a_date: str, z_date: str, window_days: int) -> list[tuple[str, str]]:
+    """ Splits an inclusive YYYY-MM-DD range into back to back windows of at most window_days days """
+    window_start = date.fromisoformat(a_date)
+    range_end = date.fromisoformat(z_date)
+    windows: list = []
+    while window_start <= range_end:
+        window_end = min(window_start + timedelta(days=max(1, window_days) - 1), range_end)
+        windows.append((window_start.isoformat(), window_end.isoformat()))
+        window_start = window_end + timedelta(days=1)
+    return windows
+
+
+def ranking_row_key(row: dict) -> tuple:
+    """
+    What makes a ranking row the same result wherever it turns up: the athlete (their id, or the name when the row
+    doesn't link to one), the date, weight class and total. rank isn't part of it, that's only the row's position
+    within whatever date range it was fetched for
+    """
+    return (lifter_id_from_dict(row) or row.get('lifter') or row.get('name'), row.get('date'),
+            row.get('weight_class'), row.get('total'))
+
+
+def dedupe_rows(rows, key=ranking_row_key) -> list[dict]:
+    """ Drops rows for a result already seen, keyed on key(row), first one seen wins """
+    seen: set = set()
+    unique_rows: list = []
+    for row in rows:
+        row_key = key(row)
+        if row_key not in seen:
+            seen.add(row_key)
+            unique_rows.append(row)
+    return unique_rows
+
+
+def retry_delay(attempt: int, backoff_seconds: float, retry_after: Optional[str] = None,
+                max_delay: float = 60.0) -> float:
+    """ Seconds to wait before resending: the server's Retry-After if it sent one, else backoff with jitter """
+    if retry_after:
+        try:
+            return min(max_delay, max(0.0, float(retry_after)))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(retry_after)
+        except (TypeError, ValueError):
+            retry_at = None
+        if retry_at:
+            if retry_at.tzinfo is None:
+                retry_at = retry_at.replace(tzinfo=timezone.utc)
+            return min(max_delay, max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds()))
+    return min(max_delay, backoff_seconds * (2 ** attempt) + random.uniform(0, backoff_seconds))
+
+
 def resolve_to_ip(url: str) -> str:
     """ Returns IP address of the subdomain """
     return socket.gethostbyname(url)
@@ -57,33 +172,38 @@ def resolve_to_ip(url: str) -> str:
 def pull_tables(page_content: Response) -> list:
     """ Returns a dict with details of all the tables within it """
     debug("pull_tables called")
-    soup_parse = BeautifulSoup(page_content.text, "html.parser")
-    table_list: list = []
-    formatted_table: list = []
-    for tables in soup_parse.find_all("table"):
-        table_list.append(tables)
+    # Only the tables get parsed, the rest of the page is skipped by the strainer
+    soup_parse = BeautifulSoup(page_content.text, HTML_PARSER, parse_only=SoupStrainer("table"))
+    table_list: list = soup_parse.find_all("table")
     if len(table_list) > 1:
         info(f"multiple tables: {len(table_list)}")
-        formatted_table = extract_table(table_list, multiple_tables=True)
     elif len(table_list) == 1:
         info("single table")
-        formatted_table = extract_table(table_list[0])
-    return formatted_table
+    return extract_rows(table_list)
+
+
+def extract_rows(table_list: list) -> list:
+    """
+    One pass over the tables: the header row of the first table, then every body row of every table,
+    in the same order the old extract_table/flatten_list route gave them
+    """
+    debug("extract_rows called")
+    if not table_list:
+        return []
+    rows: list = []
+    headers = strip_table_headers(table_list[0])
+    if headers:
+        rows.append(headers)
+    for table in table_list:
+        for tbl_row in table.find_all("tr")[1:]:
+            rows.append(_row_cells(tbl_row))
+    return rows
 
 
 def extract_table(table, multiple_tables=False) -> list:
     """ Extracts the HTML table """
     debug("extract_table called")
-    parsed_table: list = []
-    if not multiple_tables:
-        parsed_table.append(strip_table_headers(table))
-        parsed_table.append(strip_table_body(table))
-    elif multiple_tables:
-        # Strip the headers from the first table only
-        parsed_table.append(strip_table_headers(table[0]))
-        for rows in table:
-            parsed_table.append(strip_table_body(rows))
-    return flatten_list(parsed_table)
+    return extract_rows(table if multiple_tables else [table])
 
 
 def flatten_list(nested_list: list) -> list:
@@ -94,28 +214,19 @@ def flatten_list(nested_list: list) -> list:
 
 
 def recursive_anti_nester(nested_list: list) -> list:
-    """ IT'S YA BOI, RECURSION! """
+    """ Same flattening as ever, but with a stack instead of recursion """
     debug("recursive_anti_nester called")
-
-    class AntiNester(list):
-        """ Being simultaneously lazy and extra """
-
-        def __init__(self):
-            super().__init__()
-            self.flat_list: list = []
-
-        def flatten_that_shit(self, big_list: list) -> None:
-            """ RUN IT """
-            for line_count, lines in enumerate(big_list):
-                if not any(isinstance(index, list) for index in lines):
-                    self.flat_list.append(lines)
-                    # big_list.pop(line_count)
-                else:
-                    self.flatten_that_shit(big_list[line_count])
-
-    magic_thing = AntiNester()
-    magic_thing.flatten_that_shit(nested_list)
-    return magic_thing.flat_list
+    flat_list: list = []
+    stack: list = [iter(nested_list)]
+    while stack:
+        for lines in stack[-1]:
+            if any(isinstance(index, list) for index in lines):
+                stack.append(iter(lines))
+                break
+            flat_list.append(lines)
+        else:
+            stack.pop()
+    return flat_list
 
 
 def strip_table_headers(table) -> list:
@@ -130,30 +241,31 @@ def strip_table_headers(table) -> list:
 def strip_table_body(table):
     """Given a table, returns all its rows"""
     debug("strip_table_body called")
-    rows = []
-    for tbl_row in table.find_all("tr")[1:]:
-        cells = []
-        tds = tbl_row.find_all("td")
-        if len(tds) == 0:
-            ths = tbl_row.find_all("th")
-            for tbl_hdr in ths:
-                cells.append(tbl_hdr.text.strip())
+    return [_row_cells(tbl_row) for tbl_row in table.find_all("tr")[1:]]
+
+
+def _row_cells(tbl_row) -> list:
+    """ The cell values for one table row """
+    tds = tbl_row.find_all("td")
+    if len(tds) == 0:
+        return [tbl_hdr.text.strip() for tbl_hdr in tbl_row.find_all("th")]
+    cells = []
+    for tbl_dat in tds:
+        links = tbl_dat.find_all(href=True)
+        if len(links) == 1:
+            cells.append(strip_report_id(links[0]['href']))
+            continue
+        icons = tbl_dat.find_all('i')
+        if len(icons) == 1:
+            strip_it = str(icons)
+            if "data-id-resource" in strip_it:
+                re_search = re.search(r'\d+', strip_it)
+                cells.append(re_search.group())
+            else:
+                cells.append(strip_it)
         else:
-            for tbl_dat in tds:
-                links = tbl_dat.find_all(href=True)
-                if len(links) == 1:
-                    cells.append(strip_report_id(links[0]['href']))
-                elif len(tbl_dat.find_all('i')) == 1:
-                    strip_it = str(tbl_dat.find_all('i'))
-                    if "data-id-resource" in strip_it:
-                        re_search = re.search(r'\d+', strip_it)
-                        cells.append(re_search.group())
-                    else:
-                        cells.append(strip_it)
-                else:
-                    cells.append(tbl_dat.text.strip())
-        rows.append(cells)
-    return rows
+            cells.append(tbl_dat.text.strip())
+    return cells
 
 
 def strip_report_id(url: str) -> str:
@@ -0,0 +1,112 @@
+""" Per endpoint request counters so a run can show where its time went """
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Optional
+
+JSON_LOGGER = logging.getLogger("sport80.requests")
+
+
+@dataclass
+class EndPointStats:
+    """ Running totals for one endpoint """
+    requests: int = 0
+    errors: int = 0
+    retries: int = 0
+    cache_hits: int = 0
+    revalidated: int = 0
+    pages: int = 0
+    bytes_received: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    @property
+    def avg_ms(self) -> float:
+        return self.total_seconds * 1000 / self.requests if self.requests else 0.0
+
+
+class RequestMetrics:
+    """
+    Thread safe counters keyed by endpoint name (see EndPoint.name_for_url), shared by as many clients as you like.
+    With json_logs on, every HTTP call is also logged as one JSON line on the sport80.requests logger.
+    """
+
+    def __init__(self, json_logs: bool = False):
+        self.json_logs: bool = json_logs
+        self.started_at: float = time.perf_counter()
+        self.__stats: dict = {}
+        self.__lock = threading.Lock()
+
+    def __endpoint(self, endpoint: str) -> EndPointStats:
+        return self.__stats.setdefault(endpoint, EndPointStats())
+
+    def record_request(self, endpoint: str, url: str, status: Optional[int], seconds: float, size: int) -> None:
+        """ One HTTP round trip, status is None if it never got a response """
+        with self.__lock:
+            stats = self.__endpoint(endpoint)
+            stats.requests += 1
+            stats.bytes_received += size
+            stats.total_seconds += seconds
+            stats.max_seconds = max(stats.max_seconds, seconds)
+            if status is None or status >= 400:
+                stats.errors += 1
+            elif status < 300:
+                stats.pages += 1
+        if self.json_logs:
+            JSON_LOGGER.info(json.dumps({"event": "sport80_request", "endpoint": endpoint, "url": url,
+                                         "status": status, "ms": round(seconds * 1000, 1), "bytes": size}))
+
+    def record_cache_hit(self, endpoint: str) -> None:
+        """ A page served from the response cache without going to sport80 """
+        with self.__lock:
+            stats = self.__endpoint(endpoint)
+            stats.cache_hits += 1
+            stats.pages += 1
+
+    def record_revalidated(self, endpoint: str) -> None:
+        """ A 304, the cached page was used """
+        with self.__lock:
+            stats = self.__endpoint(endpoint)
+            stats.revalidated += 1
+            stats.pages += 1
+
+    def record_retry(self, endpoint: str) -> None:
+        """ A request that's about to be sent again """
+        with self.__lock:
+            self.__endpoint(endpoint).retries += 1
+
+    def snapshot(self) -> dict:
+        """ Copy of the counters, endpoint name to a plain dict """
+        with self.__lock:
+            return {endpoint: asdict(stats) for endpoint, stats in self.__stats.items()}
+
+    def summary(self, title: str = "Sport80 requests") -> str:
+        """ Markdown table of the counters, busiest endpoint first """
+        with self.__lock:
+            rows = sorted(self.__stats.items(), key=lambda item: item[1].total_seconds, reverse=True)
+            lines = [f"### {title}", "",
+                     f"Wall time: {time.perf_counter() - self.started_at:.1f} s", "",
+                     "| Endpoint | Requests | Pages | Errors | Retries | Cache hits | 304s | MB | Total s | Avg ms | Max ms |",
+                     "|---|---:|---:|---:|---:|---:|---:|---:|---:|---:|---:|"]
+            for endpoint, stats in rows:
+                lines.append(f"| {endpoint} | {stats.requests} | {stats.pages} | {stats.errors} | {stats.retries} "
+                             f"| {stats.cache_hits} | {stats.revalidated} | {stats.bytes_received / 1e6:.2f} "
+                             f"| {stats.total_seconds:.1f} | {stats.avg_ms:.0f} | {stats.max_seconds * 1000:.0f} |")
+            served = sum(stats.pages for stats in self.__stats.values())
+            from_cache = sum(stats.cache_hits + stats.revalidated for stats in self.__stats.values())
+        if served:
+            lines += ["", f"Cache hit rate: {from_cache / served:.0%} of {served} pages"]
+        return "\n".join(lines) + "\n"
+
+    def write_summary(self, title: str = "Sport80 requests") -> str:
+        """ Logs the summary, and appends it to the GitHub Actions job summary when running there """
+        summary = self.summary(title)
+        logging.info("\n" + summary)
+        summary_path = os.environ.get("GITHUB_STEP_SUMMARY")
+        if summary_path:
+            with open(summary_path, "a", encoding="utf-8") as summary_file:
+                summary_file.write(summary + "\n")
+        return summary
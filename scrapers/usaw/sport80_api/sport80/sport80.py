@@ -1,7 +1,10 @@
 """ Main file """
 import logging
-from typing import Union
-from .sport80_http_client import SportEightyHTTP
+from typing import Union, Iterator, Optional
+import requests
+from .sport80_http_client import SportEightyHTTP, DEFAULT_TIMEOUT
+from .response_cache import ResponseCache
+from .instrumentation import RequestMetrics
 
 
 class SportEighty:
@@ -9,17 +12,48 @@ class SportEighty:
     This class enables a variety of functions that can be carried out with a sport80 subdomain.
     """
 
-    def __init__(self, subdomain: str, return_dict=True, debug: logging = logging.WARNING):
-        self.__http_client = SportEightyHTTP(subdomain, return_dict=return_dict, debug_lvl=debug)
+    def __init__(self, subdomain: str, return_dict=True, debug: logging = logging.WARNING, page_workers: int = 1,
+                 cache: ResponseCache = None, session: Optional[requests.Session] = None,
+                 metrics: Optional[RequestMetrics] = None, max_retries: int = 4, backoff_seconds: float = 0.5,
+                 timeout: Optional[tuple[float, float]] = DEFAULT_TIMEOUT):
+        """
+        :param subdomain: Full URL of the sport80 site, e.g. https://bwl.sport80.com
+        :param return_dict: Return results as dicts rather than lists
+        :param debug: Logging level
+        :param page_workers: Number of pages fetched at once for paginated calls, 1 keeps the old one page at a time
+        :param cache: Optional ResponseCache so repeat calls are served from disk
+        :param session: Optional requests.Session to share one connection pool between several SportEighty objects,
+        size its adapter for all of their page_workers as it's used as is
+        :param metrics: Optional RequestMetrics to count requests into, pass the same one to several clients to get
+        one report for all of them. Each client makes its own otherwise, available as .metrics
+        :param max_retries: Times a dropped connection, timeout, 429 or 5xx is sent again before giving up
+        :param backoff_seconds: Base of the exponential backoff between retries, a Retry-After header wins over it.
+        A page after the first that still fails raises Sport80FetchError instead of returning a short result set
+        :param timeout: (connect, read) seconds allowed for every request, None waits forever
+        """
+        self.__http_client = SportEightyHTTP(subdomain, return_dict=return_dict, debug_lvl=debug,
+                                             page_workers=page_workers, cache=cache, session=session,
+                                             metrics=metrics, max_retries=max_retries,
+                                             backoff_seconds=backoff_seconds, timeout=timeout)
+        self.metrics: RequestMetrics = self.__http_client.metrics
 
     def event_index(self, year: int) -> dict[dict]:
         """
         Returns a dict containing all events for the given year
         :param year: Integer for the year you want to search
-        :return: dict containing all events for the given year
+        :return: dict containing all events for the given year, each with a parsed_date of YYYY-MM-DD or None
         """
         return self.__http_client.get_event_index(year)
 
+    def event_index_range(self, a_date: str, z_date: str) -> dict[dict]:
+        """
+        Returns a dict containing all events between two dates
+        :param a_date:  Start date in format YYYY-MM-DD
+        :param z_date:  End date in format YYYY-MM-DD
+        :return: dict containing all events in the date range, each with a parsed_date of YYYY-MM-DD or None
+        """
+        return self.__http_client.get_event_index_range(a_date, z_date)
+
     def event_results(self, event_dict: dict) -> Union[list, dict]:
         """
         Returns a dict or list containing the results for the given event
@@ -29,6 +63,32 @@ class SportEighty:
         """
         return self.__http_client.get_event_results(event_dict)
 
+    def iter_event_index(self, year: int) -> Iterator[dict]:
+        """
+        Same events as event_index, yielded a page at a time instead of collated into one dict
+        :param year: Integer for the year you want to search
+        :return: Iterator of event dicts, each with a parsed_date of YYYY-MM-DD or None
+        """
+        return self.__http_client.iter_event_index_range(f"{year}-01-01", f"{year}-12-31")
+
+    def iter_event_index_range(self, a_date: str, z_date: str) -> Iterator[dict]:
+        """
+        Same events as event_index_range, yielded a page at a time instead of collated into one dict
+        :param a_date:  Start date in format YYYY-MM-DD
+        :param z_date:  End date in format YYYY-MM-DD
+        :return: Iterator of event dicts, each with a parsed_date of YYYY-MM-DD or None
+        """
+        return self.__http_client.iter_event_index_range(a_date, z_date)
+
+    def iter_event_results(self, event_dict: dict) -> Iterator[dict]:
+        """
+        Yields the results for the given event row by row as each page comes back, so a big meet never has to be
+        held in memory all at once. Rows are always dicts, whatever return_dict is set to
+        :param event_dict: The event dict from event_index()
+        :return: Iterator of result row dicts, empty if the event couldn't be fetched
+        """
+        return self.__http_client.iter_event_results(event_dict)
+
     def upcoming_events(self) -> Union[list, dict]:
         """
         Returns a dict or list containing the upcoming events
@@ -71,6 +131,22 @@ class SportEighty:
         """
         return self.__http_client.get_rankings(a_date, z_date, additional_args)
 
+    def rankings_windowed(self, a_date: str, z_date: str, window_days: int = 31, workers: int = 4,
+                          additional_args: dict = None) -> list[dict]:
+        """
+        Same rankings as rankings(), but the date range is split into windows that are fetched in parallel, which
+        keeps each request small enough not to time out on a full season
+        :param a_date:  Start date in format YYYY-MM-DD
+        :param z_date:  End date in format YYYY-MM-DD
+        :param window_days:  Days covered by each window
+        :param workers:  Windows fetched at once, each one still uses page_workers for its own pages
+        :param additional_args:  Additional arguments such as weight category available from ranking_filters()
+        :return:  List of dicts containing the rankings, a result that came back in more than one window only once.
+                  The windows are ranked separately, so each row's rank is its place within its own window and the
+                  joined list isn't a ranking of the whole range. Raises Sport80FetchError if a window can't be fetched
+        """
+        return self.__http_client.get_rankings_windowed(a_date, z_date, window_days, workers, additional_args)
+
     def ranking_filters(self) -> list[dict]:
         """
         Returns a list of dicts containing the available filters for the rankings() method
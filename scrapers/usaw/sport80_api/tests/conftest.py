@@ -0,0 +1,64 @@
+# conftest.py
+"""Fixtures that run the sport80 client and the Supabase sync offline, against tests/fixtures."""
+import dataclasses
+import os
+import sys
+
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TESTS_DIR))
+sys.path.insert(0, os.path.join(TESTS_DIR, "..", "..", "..", "shared"))
+
+from replay import ReplayAdapter  # noqa: E402
+from postgrest_stand_in import PostgRESTStandIn, STAND_IN_KEY  # noqa: E402
+
+FIXTURES_DIR = os.path.join(TESTS_DIR, "fixtures")
+USAW_FIXTURES = os.path.join(FIXTURES_DIR, "usaw")
+USAW_DOMAIN = "https://usaweightlifting.sport80.com"
+
+
+@pytest.fixture
+def replay():
+    return ReplayAdapter(USAW_FIXTURES)
+
+
+@pytest.fixture
+def replay_session(replay):
+    session = requests.Session()
+    session.mount("https://", replay)
+    return session
+
+
+@pytest.fixture
+def api(replay_session):
+    from sport80 import SportEighty
+    return SportEighty(USAW_DOMAIN, session=replay_session, backoff_seconds=0)
+
+
+@pytest.fixture
+def stand_in():
+    with PostgRESTStandIn() as server:
+        yield server
+
+
+@pytest.fixture
+def offline_sync(monkeypatch, tmp_path, replay, stand_in):
+    """
+    update_supabase_from_sport80 with Sport80 answered by the replay fixtures and Supabase by the PostgREST
+    stand-in, no response cache, the watermark in tmp_path and no Slack.
+    """
+    import update_supabase_from_sport80 as sync
+
+    replay.delegates[stand_in.url] = HTTPAdapter()
+    monkeypatch.setattr(sync, "HTTPAdapter", lambda **kwargs: replay)
+    monkeypatch.setattr(sync, "SUPABASE_URL", stand_in.url)
+    monkeypatch.setattr(sync, "SUPABASE_KEY", STAND_IN_KEY)
+    monkeypatch.setattr(sync, "SPORT80_CACHE_PATH", "")
+    monkeypatch.setattr(sync, "SYNC_WATERMARK_PATH", str(tmp_path / "watermark_{federation}.json"))
+    monkeypatch.setitem(sync.FEDERATIONS, "USAW",
+                        dataclasses.replace(sync.FEDERATIONS["USAW"], slack_webhook_url=None))
+    monkeypatch.delenv("GITHUB_STEP_SUMMARY", raising=False)
+    return sync
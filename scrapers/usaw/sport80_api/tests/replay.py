@@ -0,0 +1,158 @@
+# replay.py
+"""
+Offline transport for the sport80 client: a requests adapter that answers from responses saved to disk, so
+SportEightyHTTP (and anything built on it) runs without network access.
+
+A fixture directory holds manifest.json, listing every saved response (method, URL, status, headers and the
+file its body is in), next to the body files. Requests are matched on method and URL only, the POST body is
+ignored, so one saved event index answers every date range asked for.
+
+tests/fixtures/usaw is synthetic: hand-written responses in the shape the site sends, with made up meets, lifters
+and keys (its manifest says "synthetic": true). Record a real set from the live site with RecordingAdapter, its
+manifest says where it was "recorded_from" instead:
+
+    python tests/replay.py https://usaweightlifting.sport80.com tests/fixtures/usaw --start 2025-01-01 --events 5
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from http import HTTPStatus
+from typing import Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+MANIFEST_FILE = "manifest.json"
+
+
+def request_key(method: str, url: str) -> tuple[str, str]:
+    """Method and URL with the query string sorted, so parameter order doesn't stop a match."""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return method.upper(), urlunsplit(parts._replace(query=query, fragment=""))
+
+
+def build_response(request: requests.PreparedRequest, status: int, headers: dict, body: bytes) -> requests.Response:
+    """A requests.Response that looks like it came off the wire."""
+    response = requests.Response()
+    response.status_code = status
+    response.reason = HTTPStatus(status).phrase
+    response.headers = CaseInsensitiveDict(headers)
+    response.encoding = get_encoding_from_headers(response.headers)
+    response._content = body
+    response.url = request.url
+    response.request = request
+    return response
+
+
+class ReplayAdapter(HTTPAdapter):
+    """
+    Serves the responses in a fixture directory. Anything not in it gets a 404 and is listed in .misses.
+    latency (seconds) is slept before each answer, to stand in for the round trip when comparing page_workers.
+    delegates maps URL prefixes to other adapters, e.g. a stand-in Supabase, for sessions that are mounted once.
+    """
+
+    def __init__(self, fixture_dir: str, latency: float = 0.0, delegates: Optional[dict[str, BaseAdapter]] = None):
+        super().__init__()
+        self.fixture_dir = fixture_dir
+        self.latency = latency
+        self.delegates = delegates or {}
+        self.calls = Counter()
+        self.misses = []
+        self._lock = threading.Lock()
+        with open(os.path.join(fixture_dir, MANIFEST_FILE), encoding="utf-8") as manifest_file:
+            manifest = json.load(manifest_file)
+        self.responses = {}
+        for entry in manifest["responses"]:
+            with open(os.path.join(fixture_dir, entry["file"]), "rb") as body_file:
+                body = body_file.read()
+            self.responses[request_key(entry["method"], entry["url"])] = (entry["status"], entry["headers"], body)
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        for prefix, adapter in self.delegates.items():
+            if request.url.startswith(prefix):
+                return adapter.send(request, stream=stream, timeout=timeout, verify=verify, cert=cert,
+                                    proxies=proxies)
+        key = request_key(request.method, request.url)
+        with self._lock:
+            self.calls[key] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        recorded = self.responses.get(key)
+        if recorded is None:
+            with self._lock:
+                self.misses.append(key)
+            return build_response(request, 404, {"Content-Type": "application/json"},
+                                  b'{"message": "Not recorded"}')
+        status, headers, body = recorded
+        return build_response(request, status, headers, body)
+
+    @property
+    def request_count(self) -> int:
+        return sum(self.calls.values())
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Passes requests through to the network and saves every response into a fixture directory."""
+
+    def __init__(self, fixture_dir: str):
+        super().__init__()
+        self.fixture_dir = fixture_dir
+        self.entries = {}
+        self._lock = threading.Lock()
+        os.makedirs(fixture_dir, exist_ok=True)
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        key = request_key(request.method, request.url)
+        content_type = response.headers.get("Content-Type", "application/json")
+        with self._lock:
+            if key not in self.entries:
+                extension = "json" if "json" in content_type else "html"
+                file_name = f"response_{len(self.entries):03d}.{extension}"
+                with open(os.path.join(self.fixture_dir, file_name), "wb") as body_file:
+                    body_file.write(response.content)
+                self.entries[key] = {"method": key[0], "url": key[1], "status": response.status_code,
+                                     "file": file_name, "headers": {"Content-Type": content_type}}
+        return response
+
+    def save(self, recorded_from: str):
+        with open(os.path.join(self.fixture_dir, MANIFEST_FILE), "w", encoding="utf-8") as manifest_file:
+            json.dump({"recorded_from": recorded_from, "responses": list(self.entries.values())}, manifest_file,
+                      indent=1)
+            manifest_file.write("\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record Sport80 responses as replay fixtures.")
+    parser.add_argument("domain", help="Sport80 site, e.g. https://usaweightlifting.sport80.com")
+    parser.add_argument("fixture_dir")
+    parser.add_argument("--start", required=True, help="Event index and rankings start date, YYYY-MM-DD")
+    parser.add_argument("--end", default=time.strftime("%Y-%m-%d"), help="End date, YYYY-MM-DD (default: today)")
+    parser.add_argument("--events", type=int, default=5, help="Events to record the results of")
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from sport80 import SportEighty  # pylint: disable=import-outside-toplevel
+
+    recorder = RecordingAdapter(args.fixture_dir)
+    session = requests.Session()
+    session.mount("https://", recorder)
+    api = SportEighty(args.domain, session=session)
+    events = list(api.event_index_range(args.start, args.end).values())
+    for event_dict in events[:args.events]:
+        api.event_results(event_dict)
+    api.rankings(args.start, args.end)
+    recorder.save(args.domain)
+    print(f"Recorded {len(recorder.entries)} responses into {args.fixture_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# test_async_client.py
+"""AsyncSportEightyHTTP against an httpx MockTransport: failure values and the legacy start list."""
+import asyncio
+import json
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from sport80.async_sport80 import AsyncSportEightyHTTP  # noqa: E402
+from conftest import USAW_DOMAIN  # noqa: E402
+
+RANKINGS_DOMAIN = "https://rankings.example"
+DOMAIN_ENV = {"SERVICES_API_PUBLIC_KEY": "test-key", "RANKINGS_DOMAIN_URL": RANKINGS_DOMAIN}
+START_LIST_PAGE = ("<table><tr><th>Lot</th><th>Name</th></tr><tr><td>1</td><td>Sam Hale</td></tr>"
+                   "<tr><td>2</td><td>Jo Reyes</td></tr></table>")
+
+
+def handler(calls: list):
+    def respond(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        if request.url.path == "/public/rankings/":
+            return httpx.Response(200, text=f"<script>window.env = {json.dumps(DOMAIN_ENV)};</script>")
+        if request.url.path.startswith("/public_reports/index/"):
+            # Gateway hiccup on the first try, the retry gets the page
+            if calls.count(request.url.path) == 1:
+                return httpx.Response(503)
+            return httpx.Response(200, text=START_LIST_PAGE)
+        return httpx.Response(404)
+    return respond
+
+
+def client(calls: list) -> AsyncSportEightyHTTP:
+    http_client = AsyncSportEightyHTTP(USAW_DOMAIN + "/", backoff_seconds=0)
+    http_client.http_session = httpx.AsyncClient(transport=httpx.MockTransport(handler(calls)))
+    return http_client
+
+
+def test_failed_event_results_is_none_like_the_sync_client():
+    async def fetch():
+        http_client = client([])
+        try:
+            return await http_client.get_event_results({"action": [{"route": "/results/1101"}]})
+        finally:
+            await http_client.close()
+
+    assert asyncio.run(fetch()) is None
+
+
+def test_start_list_is_retried_and_counted():
+    calls = []
+
+    async def fetch():
+        http_client = client(calls)
+        try:
+            return await http_client.get_start_list("77"), http_client.metrics.snapshot()
+        finally:
+            await http_client.close()
+
+    start_list, metrics = asyncio.run(fetch())
+    assert start_list == {0: {"Lot": "1", "Name": "Sam Hale"}, 1: {"Lot": "2", "Name": "Jo Reyes"}}
+    assert calls.count("/public_reports/index/77") == 2
+    assert metrics["START_LIST"]["retries"] == 1
@@ -0,0 +1,101 @@
+# test_benchmarks.py
+"""
+pytest-benchmark suite for the sport80 client, run offline on the replay fixtures:
+
+    pip install pytest pytest-benchmark
+    python -m pytest tests/test_benchmarks.py --benchmark-json=benchmark.json
+    python -m pytest tests/test_benchmarks.py --benchmark-compare   # against the last saved run
+
+Collation and flattening are timed on the fixture pages scaled up to national championship size. The end to end
+timings go through SportEightyHTTP and update_supabase_from_sport80.main, with the replay adapter's latency
+standing in for the network round trip where noted. Writes go to the PostgREST stand-in, which adds its own
+latency per request and per row.
+"""
+import copy
+import json
+import os
+
+import pytest
+
+from sport80 import SportEighty
+from sport80.helpers import collate_index, event_dict_to_list
+from lifting_results_db import LiftingResultRow, LiftingResultsWriter
+from conftest import USAW_DOMAIN, USAW_FIXTURES, STAND_IN_KEY
+from test_replay import EVENT_ROWS, event_stub
+
+pytest.importorskip("pytest_benchmark")
+
+SCALED_PAGES = 40
+ROUND_TRIP_SECONDS = 0.005
+WRITE_ROWS = 1000
+
+
+@pytest.fixture(scope="module")
+def scaled_pages() -> dict:
+    """SCALED_PAGES result pages built from the fixture rows, keyed by page number like __collate_results."""
+    rows = []
+    for page_file in ("event_1101_p0.json", "event_1101_p1.json", "event_1101_p2.json"):
+        with open(os.path.join(USAW_FIXTURES, page_file), encoding="utf-8") as fixture_file:
+            rows += json.load(fixture_file)["data"]
+    per_page = 25
+    return {page: {"data": copy.deepcopy([rows[(page * per_page + index) % len(rows)] for index in range(per_page)])}
+            for page in range(SCALED_PAGES)}
+
+
+def test_collate_index(benchmark, scaled_pages):
+    collated = benchmark(collate_index, scaled_pages)
+    assert len(collated) == SCALED_PAGES * 25
+
+
+def test_event_dict_to_list(benchmark, scaled_pages):
+    collated = collate_index(scaled_pages)
+    flattened = benchmark(event_dict_to_list, collated)
+    assert len(flattened) == len(collated) + 1  # header row first
+
+
+def test_format_rows(benchmark, scaled_pages):
+    result_items = [result_item for page in scaled_pages.values() for result_item in page["data"]]
+
+    def format_and_serialize():
+        return [LiftingResultRow.from_sport80(result_item, "1101", "Test Open", "2025-07-19", "USAW").to_json()
+                for result_item in result_items]
+
+    assert len(benchmark(format_and_serialize)) == len(result_items)
+
+
+@pytest.mark.parametrize("page_workers,latency", [(1, 0.0), (8, 0.0), (1, ROUND_TRIP_SECONDS),
+                                                  (8, ROUND_TRIP_SECONDS)])
+def test_event_results_end_to_end(benchmark, replay, replay_session, page_workers, latency):
+    replay.latency = latency
+    api = SportEighty(USAW_DOMAIN, session=replay_session, page_workers=page_workers)
+    results = benchmark(api.event_results, event_stub("1101"))
+    assert len(results) == EVENT_ROWS["1101"]
+
+
+def test_rankings_end_to_end(benchmark, api):
+    rankings = benchmark(api.rankings, "2025-01-01", "2025-12-31")
+    assert len(rankings) == 32
+
+
+def test_sync_main_throughput(benchmark, offline_sync, stand_in, tmp_path):
+    def fresh_database():
+        stand_in.reset()
+        for watermark in tmp_path.glob("watermark_*.json"):
+            watermark.unlink()
+
+    benchmark.pedantic(offline_sync.main, args=(["USAW"],), setup=fresh_database, rounds=5, iterations=1)
+    rows_written = len(stand_in.rows("lifting_results"))
+    assert rows_written == sum(EVENT_ROWS.values())
+    benchmark.extra_info["rows_per_run"] = rows_written
+
+
+@pytest.mark.parametrize("batch_size", [50, 500])
+def test_writer_upsert_throughput(benchmark, stand_in, batch_size):
+    stand_in.latency = ROUND_TRIP_SECONDS
+    stand_in.per_row_latency = 0.00001
+    writer = LiftingResultsWriter(stand_in.url, STAND_IN_KEY, batch_size=batch_size)
+    rows = [{"event_id": str(9000 + index // 100), "name": f"Lifter {index}", "federation": "USAW",
+             "total": index % 300} for index in range(WRITE_ROWS)]
+    result = benchmark.pedantic(writer.upsert, args=(rows,), setup=stand_in.reset, rounds=5, iterations=1)
+    assert result.rows_written == WRITE_ROWS
+    benchmark.extra_info["requests_per_run"] = stand_in.stats()["total_requests"]
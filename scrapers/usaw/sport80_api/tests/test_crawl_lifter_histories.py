@@ -0,0 +1,62 @@
+# test_crawl_lifter_histories.py
+"""The lifter history crawler's rate limit and athlete scan, against the replay fixtures."""
+import threading
+import time
+
+import requests
+
+from sport80 import SportEighty
+from conftest import USAW_DOMAIN
+from crawl_lifter_histories import LifterHistoryStore, RateLimitedAdapter, TokenBucket, collect_athletes
+from test_replay import EVENT_ROWS, event_stub
+from update_supabase_from_sport80 import FEDERATIONS
+
+
+class CountingBucket(TokenBucket):
+    def __init__(self):
+        super().__init__(rate=1000, capacity=1000)
+        self.acquired = 0
+        self._count_lock = threading.Lock()
+
+    def acquire(self):
+        with self._count_lock:
+            self.acquired += 1
+        super().acquire()
+
+
+def rate_limited_api(replay, bucket: TokenBucket, page_workers: int = 4) -> SportEighty:
+    session = requests.Session()
+    session.mount(USAW_DOMAIN, RateLimitedAdapter(bucket, replay))
+    return SportEighty(USAW_DOMAIN, session=session, page_workers=page_workers, backoff_seconds=0)
+
+
+def test_bucket_holds_the_rate():
+    bucket = TokenBucket(rate=50, capacity=1)
+    started = time.perf_counter()
+    for _ in range(6):
+        bucket.acquire()
+    assert time.perf_counter() - started >= 0.09
+
+
+def test_every_request_takes_a_token(replay):
+    bucket = CountingBucket()
+    api = rate_limited_api(replay, bucket)
+    assert len(api.event_results(event_stub("1101"))) == EVENT_ROWS["1101"]
+    api.event_index_range("2025-01-01", "2025-12-31")
+    assert bucket.acquired == replay.request_count > 3
+
+
+def test_event_scans_are_rate_limited_and_stored(replay, tmp_path):
+    bucket = CountingBucket()
+    api = rate_limited_api(replay, bucket)
+    store = LifterHistoryStore(str(tmp_path / "histories.sqlite"))
+    events = [event_stub(event_id) for event_id in ("1101", "1102")]
+    collect_athletes(api, FEDERATIONS["USAW"], store, events)
+    assert store.scanned_event_ids("USAW") == {"1101", "1102"}
+    assert store.athletes_to_fetch("USAW")
+    assert bucket.acquired == replay.request_count
+    requests_made = replay.request_count
+
+    collect_athletes(api, FEDERATIONS["USAW"], store, events)
+    assert replay.request_count == requests_made  # nothing scanned twice
+    store.close()
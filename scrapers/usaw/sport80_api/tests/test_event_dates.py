@@ -0,0 +1,18 @@
+# test_event_dates.py
+"""Event date parsing, which has to give the same date for the same string whatever was parsed before it."""
+from sport80.event_dates import EventDateParser
+
+
+def test_ambiguous_slash_dates_are_always_day_first():
+    parser = EventDateParser()
+    assert parser.parse("03/04/2024") == "2024-04-03"
+    assert parser.parse("12/31/2024") == "2024-12-31"  # only fits month first
+    assert parser.parse("03/04/2024") == "2024-04-03"
+    assert parser.parse("2024-03-04 09:00:00") == "2024-03-04"
+    assert parser.parse("31/02/2024") is None
+
+
+def test_layouts_can_be_pinned_per_source():
+    parser = EventDateParser(layouts=("YMD", "MDY"))
+    assert parser.parse("03/04/2024") == "2024-03-04"
+    assert parser.parse("25/12/2024") is None
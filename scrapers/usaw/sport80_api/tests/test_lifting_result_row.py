@@ -0,0 +1,78 @@
+# test_lifting_result_row.py
+"""LiftingResultRow: parsing Sport80 rows once and serializing them for the upsert."""
+import json
+import os
+
+import pytest
+
+from lifting_results_db import LiftingResultRow, LiftingResultsWriter, best_lift, parse_number
+from conftest import USAW_FIXTURES, STAND_IN_KEY
+
+
+@pytest.mark.parametrize("value,expected", [
+    ("110", 110), (" -94 ", -94), ("78.40", 78.4), ("102.0", 102), (2.5, 2.5), (7, 7),
+    ("", None), ("-", None), ("---", None), (None, None), (True, None),
+    ("nan", None), ("inf", None), ("-Infinity", None), (float("nan"), None), (float("-inf"), None),
+])
+def test_parse_number(value, expected):
+    assert parse_number(value) == expected
+    assert type(parse_number(value)) is type(expected)
+
+
+def test_best_lift_ignores_missed_attempts():
+    assert best_lift(100, -105, 0) == 100
+    assert best_lift(-100, None, 0) == 0
+
+
+def test_from_sport80_flat_row():
+    with open(os.path.join(USAW_FIXTURES, "event_1101_p0.json"), encoding="utf-8") as fixture_file:
+        result_item = json.load(fixture_file)["data"][0]
+    row = LiftingResultRow.from_sport80(result_item, "1101", "Test Open", "2025-07-19", "USAW")
+    assert row.name == result_item["lifter"]
+    assert row.snatch2 == int(result_item["snatch_lift_2"]) < 0
+    assert row.body_weight == float(result_item["body_weight_kg"])
+    assert row.key == ("1101", result_item["lifter"], "USAW")
+
+
+def test_from_sport80_nested_columns_and_fallback_keys():
+    result_item = {"columns": {"Athlete": {"value": "Sam Hale"}, "Snatch 1": {"value": "-81"},
+                               "Total": {"value": "190"}},
+                   "c&j_lift_1": "105", "body_weight_(kg)": "70.15"}
+    row = LiftingResultRow.from_sport80(result_item, "77", "BWL Open", None, "BWL")
+    assert (row.name, row.snatch1, row.cj1, row.body_weight, row.total) == ("Sam Hale", -81, 105, 70.15, 190)
+
+
+def test_to_json_always_sends_every_column():
+    sport80_row = LiftingResultRow("1", "Meet", "2025-01-01", "A Lifter", total="200", federation="USAW")
+    usamw_row = LiftingResultRow("12", "Masters", "2025-12-11", "B Lifter", total=150, federation="USAMW",
+                                 adaptive=False)
+    assert sport80_row.to_json().keys() == usamw_row.to_json().keys()
+    assert len(sport80_row.to_json()) == 17 and sport80_row.to_json()["adaptive"] is None
+    assert usamw_row.to_json()["adaptive"] is False
+    assert json.loads(json.dumps(usamw_row.to_json()))["total"] == 150
+
+
+def test_rows_are_slotted():
+    row = LiftingResultRow("1", "Meet", None, "A Lifter")
+    assert not hasattr(row, "__dict__")
+    with pytest.raises(AttributeError):
+        row.club = "Anywhere WLC"
+
+
+def test_writer_upserts_rows_and_keeps_last_per_key(stand_in):
+    rows = [LiftingResultRow("5001", "Meet", "2025-03-01", f"Lifter {index % 4}", total=str(index),
+                             federation="USAW") for index in range(6)]
+    writer = LiftingResultsWriter(stand_in.url, STAND_IN_KEY)
+    assert writer.upsert(rows).rows_written == 4
+    totals = {row["name"]: row["total"] for row in stand_in.rows("lifting_results")}
+    assert totals == {"Lifter 0": 4, "Lifter 1": 5, "Lifter 2": 2, "Lifter 3": 3}
+
+
+def test_writer_reports_the_keys_of_failed_chunks(stand_in):
+    rows = [LiftingResultRow("5002", "Meet", "2025-03-01", "Lifter A", federation="USAW").to_json(),
+            LiftingResultRow("5002", "Meet", "2025-03-01", "Lifter B", federation="USAW").to_json(),
+            {"event_id": "5002", "name": "Lifter C", "federation": "USAW"},  # keys don't match the next row's
+            LiftingResultRow("5002", "Meet", "2025-03-01", "Lifter D", federation="USAW").to_json()]
+    result = LiftingResultsWriter(stand_in.url, STAND_IN_KEY, batch_size=2, backoff_seconds=0).upsert(rows)
+    assert (result.rows_written, result.rows_failed, len(result.failed_chunks)) == (2, 2, 1)
+    assert result.failed_keys == [("5002", "Lifter C", "USAW"), ("5002", "Lifter D", "USAW")]
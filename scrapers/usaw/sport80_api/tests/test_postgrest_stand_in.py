@@ -0,0 +1,101 @@
+# test_postgrest_stand_in.py
+"""The PostgREST stand-in, through raw requests the way lifting_results_db calls it and through supabase-py."""
+import time
+
+import pytest
+import requests
+
+from lifting_results_db import LiftingResultsWriter, find_existing_event_ids
+from postgrest_stand_in import STAND_IN_KEY
+
+MEETS = [{"event_id": str(event_id), "name": f"Lifter {index}", "federation": "USAW", "total": index * 10,
+          "date": f"2025-0{1 + index % 6}-01"}
+         for event_id in (7001, 7002, 7003) for index in range(5)]
+
+
+@pytest.fixture
+def supabase_client(stand_in):
+    supabase = pytest.importorskip("supabase")
+    return supabase.create_client(stand_in.url, STAND_IN_KEY)
+
+
+def test_writer_upserts_and_existing_ids(stand_in):
+    writer = LiftingResultsWriter(stand_in.url, STAND_IN_KEY, batch_size=4)
+    assert writer.upsert(MEETS).rows_written == len(MEETS)
+    assert writer.upsert(MEETS[:3]).ok
+    assert len(stand_in.rows("lifting_results")) == len(MEETS)
+    assert stand_in.stats()["requests"]["POST lifting_results"] == 5
+
+    assert find_existing_event_ids(stand_in.url, STAND_IN_KEY, ["7001", "7003", "9999"], "USAW") == {"7001", "7003"}
+    assert writer.delete_event("7001", "USAW")
+    assert {row["event_id"] for row in stand_in.rows("lifting_results")} == {"7002", "7003"}
+
+
+def test_select_event_ids_fallback_pages(stand_in):
+    stand_in.rpcs.clear()
+    writer = LiftingResultsWriter(stand_in.url, STAND_IN_KEY)
+    writer.upsert(MEETS)
+    found = find_existing_event_ids(stand_in.url, STAND_IN_KEY, ["7002", "7003", "8000"], "USAW")
+    assert found == {"7002", "7003"}
+    assert stand_in.stats()["requests"]["GET lifting_results"] == 1
+
+
+def test_duplicate_insert_is_rejected_whole(stand_in):
+    url = f"{stand_in.url}/rest/v1/lifting_results"
+    headers = {"apikey": STAND_IN_KEY, "Prefer": "return=minimal"}
+    assert requests.post(url, json=MEETS[:2], headers=headers).status_code == 201
+    response = requests.post(url, json=[MEETS[2], MEETS[0]], headers=headers)
+    assert response.status_code == 409
+    assert response.json()["code"] == "23505"
+    assert len(stand_in.rows("lifting_results")) == 2
+
+
+def test_supabase_client_filters_order_and_range(stand_in, supabase_client):
+    table = supabase_client.table("lifting_results")
+    inserted = table.insert(MEETS).execute().data
+    assert [row["id"] for row in inserted] == list(range(1, len(MEETS) + 1))
+
+    rows = table.select("name, total", count="exact").eq("event_id", "7002").gte("total", 20) \
+        .order("total", desc=True).range(0, 1).execute()
+    assert rows.data == [{"name": "Lifter 4", "total": 40}, {"name": "Lifter 3", "total": 30}]
+    assert rows.count == 3
+
+    assert len(table.select("id").in_("event_id", ["7001", "7003"]).execute().data) == 10
+    assert len(table.select("id").match({"event_id": "7003", "name": "Lifter 1"}).execute().data) == 1
+    assert table.select("id").order("id", desc=True).limit(1).execute().data == [{"id": len(MEETS)}]
+
+    table.update({"total": 0}).eq("event_id", "7003").execute()
+    assert {row["total"] for row in table.select("total").eq("event_id", "7003").execute().data} == {0}
+    table.delete().eq("event_id", "7003").execute()
+    assert len(stand_in.rows("lifting_results")) == 10
+
+
+def test_supabase_client_upsert_on_conflict(stand_in, supabase_client):
+    table = supabase_client.table("records")
+    record = {"federation": "USAW", "weight_class": "89", "lift": "snatch", "record": 170}
+    table.upsert(record, on_conflict="federation,weight_class,lift").execute()
+    table.upsert({**record, "record": 172}, on_conflict="federation,weight_class,lift").execute()
+    assert [row["record"] for row in stand_in.rows("records")] == [172]
+
+
+def test_latency_is_added_per_request(stand_in):
+    stand_in.latency = 0.05
+    started = time.perf_counter()
+    requests.get(f"{stand_in.url}/rest/v1/meets", headers={"apikey": STAND_IN_KEY})
+    assert time.perf_counter() - started >= 0.05
+    assert stand_in.stats()["total_requests"] == 1
+
+
+def test_batches_need_matching_keys_and_a_real_conflict_target(stand_in):
+    url = f"{stand_in.url}/rest/v1/lifting_results"
+    headers = {"apikey": STAND_IN_KEY, "Prefer": "return=minimal"}
+    ragged = [MEETS[0], {**MEETS[1], "adaptive": True}]
+    response = requests.post(url, json=ragged, headers=headers)
+    assert (response.status_code, response.json()["code"]) == (400, "PGRST102")
+    assert requests.post(url, params={"columns": "event_id,name,federation,adaptive"}, json=ragged,
+                         headers=headers).status_code == 201
+
+    response = requests.post(url, params={"on_conflict": "event_id,name"}, json=MEETS[2:4],
+                             headers={**headers, "Prefer": "resolution=merge-duplicates"})
+    assert (response.status_code, response.json()["code"]) == (400, "42P10")
+    assert len(stand_in.rows("lifting_results")) == 2
@@ -0,0 +1,156 @@
+# test_replay.py
+"""The sport80 client and the Supabase sync against the synthetic replay fixtures."""
+import json
+from datetime import date
+
+import pytest
+import requests
+
+from sport80 import SportEighty, Sport80FetchError
+from sport80.helpers import dedupe_rows
+from conftest import USAW_DOMAIN, USAW_FIXTURES
+from replay import ReplayAdapter, request_key
+
+EVENT_ROWS = {"1101": 60, "1102": 40, "1103": 18, "1104": 12, "1105": 7}
+
+
+def event_stub(event_id: str) -> dict:
+    return {"action": [{"route": f"{USAW_DOMAIN}/public/rankings/results/{event_id}"}]}
+
+
+def test_event_index_walks_every_page(api, replay):
+    events = api.event_index_range("2025-01-01", "2025-12-31")
+    assert len(events) == len(EVENT_ROWS)
+    assert [event["parsed_date"] for event in events.values()] == \
+        ["2025-07-19", "2025-06-28", "2025-06-07", "2025-05-17", "2025-04-14"]
+    assert not replay.misses
+
+
+@pytest.mark.parametrize("page_workers", [1, 4])
+def test_event_results_collates_every_page(replay_session, replay, page_workers):
+    api = SportEighty(USAW_DOMAIN, session=replay_session, page_workers=page_workers)
+    for event_id, row_count in EVENT_ROWS.items():
+        results = api.event_results(event_stub(event_id))
+        assert len(results) == row_count
+        assert list(results) == list(range(row_count))
+    assert not replay.misses
+
+
+def test_iter_event_results_matches_event_results(api):
+    collated = list(api.event_results(event_stub("1101")).values())
+    assert list(api.iter_event_results(event_stub("1101"))) == collated
+
+
+def test_rankings_walks_every_page(api, replay):
+    rankings = api.rankings("2025-01-01", "2025-12-31")
+    assert [row["rank"] for row in rankings] == [str(rank) for rank in range(1, 33)]
+    assert not replay.misses
+
+
+def test_failed_page_raises_after_retries(replay_session, replay):
+    api = SportEighty(USAW_DOMAIN, session=replay_session, max_retries=2, backoff_seconds=0)
+    with pytest.raises(Sport80FetchError) as raised:
+        api.event_results(event_stub("1199"))
+    assert raised.value.status == 502
+    assert max(replay.calls.values()) == 3
+    assert api.metrics.snapshot()["EVENT_RESULTS"]["retries"] == 2
+
+
+def test_sync_writes_every_meet_once(offline_sync, stand_in, replay):
+    offline_sync.main(["USAW"])
+    rows = stand_in.rows("lifting_results")
+    assert len(rows) == sum(EVENT_ROWS.values())
+    assert {row["event_id"] for row in rows} == set(EVENT_ROWS)
+    assert all(row["federation"] == "USAW" and row["name"] for row in rows)
+    assert not replay.misses
+
+    upserts = stand_in.stats()["requests"]["POST lifting_results"]
+    offline_sync.main(["USAW"])
+    assert stand_in.stats()["requests"]["POST lifting_results"] == upserts
+
+
+def test_meet_that_breaks_partway_isnt_written(offline_sync, stand_in, replay, tmp_path, monkeypatch):
+    # Small chunks so the rows before the bad page have been upserted by the time it turns up
+    monkeypatch.setattr(offline_sync, "SUPABASE_BATCH_SIZE", 10)
+    bad_page = json.dumps({"total": 60, "current_page": 1, "next_page_url": None, "data": 7}).encode()
+    replay.responses[request_key("POST", f"{USAW_DOMAIN}/api/events/1101/table/data?p=1&l=25&sort=&d=&s=")] = \
+        (200, {"Content-Type": "application/json"}, bad_page)
+    offline_sync.main(["USAW"])
+    assert {row["event_id"] for row in stand_in.rows("lifting_results")} == set(EVENT_ROWS) - {"1101"}
+    assert stand_in.stats()["requests"]["DELETE lifting_results"] == 1
+    # 1101 is the newest meet, so the watermark stops at the one before it and the next run fetches it again
+    watermark = json.loads((tmp_path / "watermark_usaw.json").read_text())
+    assert (watermark["last_event_date"], watermark["last_event_id"]) == ("2025-06-28", "1102")
+
+
+def answer_empty(replay, event_id: str):
+    """Serve the event's results as a page with no rows, like a meet whose results haven't gone up yet."""
+    empty_page = json.dumps({"total": 0, "current_page": 0, "next_page_url": None, "data": []}).encode()
+    replay.responses[request_key("POST", f"{USAW_DOMAIN}/api/events/{event_id}/table/data")] = \
+        (200, {"Content-Type": "application/json"}, empty_page)
+
+
+def test_watermark_stays_behind_a_recent_event_with_no_results(offline_sync, stand_in, replay, tmp_path,
+                                                                monkeypatch):
+    # 1103 (2025-06-07) counts as recent when the lookback window reaches back to it
+    monkeypatch.setattr(offline_sync, "SYNC_LOOKBACK_DAYS", (date.today() - date(2025, 6, 7)).days + 1)
+    answer_empty(replay, "1103")
+    offline_sync.main(["USAW"])
+    watermark = json.loads((tmp_path / "watermark_usaw.json").read_text())
+    assert (watermark["last_event_date"], watermark["last_event_id"]) == ("2025-06-07", "1103")
+    assert {row["event_id"] for row in stand_in.rows("lifting_results")} == set(EVENT_ROWS) - {"1103"}
+
+
+def test_event_that_never_posts_results_doesnt_hold_the_watermark(offline_sync, stand_in, replay, tmp_path):
+    # 1103 is older than the lookback window and stays empty, e.g. a cancelled meet
+    answer_empty(replay, "1103")
+    for _ in range(2):
+        offline_sync.main(["USAW"])
+        watermark = json.loads((tmp_path / "watermark_usaw.json").read_text())
+        assert (watermark["last_event_date"], watermark["last_event_id"]) == ("2025-07-19", "1101")
+    assert replay.calls[request_key("POST", f"{USAW_DOMAIN}/api/events/1103/table/data")] == 2
+    assert {row["event_id"] for row in stand_in.rows("lifting_results")} == set(EVENT_ROWS) - {"1103"}
+
+
+def test_windowed_rankings_keep_each_result_once(api):
+    # The replay answers every window with the same rows, so each result turns up once per window
+    rankings = api.rankings("2025-01-01", "2025-12-31")
+    assert api.rankings_windowed("2025-01-01", "2025-03-31", window_days=31) == rankings
+    reranked = [{**row, "rank": str(int(row["rank"]) + 10)} for row in rankings[:5]]
+    assert dedupe_rows(rankings + reranked) == rankings
+
+
+def test_failed_ranking_window_raises(replay_session, replay):
+    rankings_url = f"{USAW_DOMAIN}/api/categories/all/rankings/table/data?p=0&l=1000&sort=&d=&s="
+    replay.responses[request_key("POST", rankings_url)] = (502, {"Content-Type": "text/html"}, b"Bad Gateway")
+    api = SportEighty(USAW_DOMAIN, session=replay_session, max_retries=0, backoff_seconds=0)
+    assert api.rankings("2025-01-01", "2025-12-31") == []
+    with pytest.raises(Sport80FetchError) as raised:
+        api.rankings_windowed("2025-01-01", "2025-12-31")
+    assert raised.value.status == 502
+
+
+class TimeoutRecordingAdapter(ReplayAdapter):
+    """Replays the fixtures, noting the timeout of every request and timing out the first read_timeouts of them."""
+
+    def __init__(self, read_timeouts: int = 0):
+        super().__init__(USAW_FIXTURES)
+        self.timeouts = []
+        self.read_timeouts = read_timeouts
+
+    def send(self, request, stream=False, timeout=None, **kwargs):
+        self.timeouts.append(timeout)
+        if len(self.timeouts) <= self.read_timeouts:
+            raise requests.exceptions.ReadTimeout(f"{request.url} timed out")
+        return super().send(request, stream=stream, timeout=timeout, **kwargs)
+
+
+def test_every_request_has_a_timeout():
+    adapter = TimeoutRecordingAdapter(read_timeouts=1)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    api = SportEighty(USAW_DOMAIN, session=session, backoff_seconds=0, timeout=(3, 20))
+    assert len(api.event_results(event_stub("1101"))) == EVENT_ROWS["1101"]
+    assert len(api.rankings("2025-01-01", "2025-12-31")) == 32
+    assert adapter.timeouts and all(timeout == (3, 20) for timeout in adapter.timeouts)
+    assert api.metrics.snapshot()["INDEX_PAGE"]["retries"] == 1
@@ -0,0 +1,52 @@
+# test_response_cache.py
+"""ResponseCache TTLs for event results: short while an event is recent, nothing stored for empty result sets."""
+import time
+from datetime import date, timedelta
+
+from sport80 import SportEighty, ResponseCache
+from sport80.response_cache import DAY, HOUR
+from conftest import USAW_DOMAIN
+from replay import request_key
+from test_replay import event_stub
+
+RESULTS_URL = USAW_DOMAIN + "/api/events/{}/table/data"
+
+
+def dated_stub(event_id: str, days_ago: int) -> dict:
+    return {**event_stub(event_id), "date": (date.today() - timedelta(days=days_ago)).isoformat()}
+
+
+def expires_in(cache: ResponseCache, event_id: str) -> float:
+    return cache.lookup(RESULTS_URL.format(event_id)).expires_at - time.time()
+
+
+def test_ttl_depends_on_how_long_ago_the_event_was():
+    cache = ResponseCache(":memory:")
+    url = RESULTS_URL.format("1101")
+    assert cache.ttl_for(url, "2020-03-07") == 30 * DAY
+    assert cache.ttl_for(url, date.today().isoformat()) == 6 * HOUR
+    assert cache.ttl_for(url, None) == 6 * HOUR
+    assert cache.ttl_for(USAW_DOMAIN + "/api/events/table/data", None) == 30 * 60
+
+
+def test_client_caches_recent_results_for_hours(replay_session):
+    cache = ResponseCache(":memory:")
+    api = SportEighty(USAW_DOMAIN, session=replay_session, cache=cache)
+    api.event_results(dated_stub("1101", days_ago=400))
+    api.event_results(dated_stub("1102", days_ago=3))
+    api.event_results(event_stub("1103"))
+    assert expires_in(cache, "1101") > 29 * DAY
+    assert 5 * HOUR < expires_in(cache, "1102") <= 6 * HOUR
+    assert 5 * HOUR < expires_in(cache, "1103") <= 6 * HOUR
+
+
+def test_empty_result_sets_are_not_stored(replay_session, replay):
+    replay.responses[request_key("POST", RESULTS_URL.format("1106"))] = (
+        200, {"Content-Type": "application/json"},
+        b'{"total": 0, "items_per_page": 25, "current_page": 0, "next_page_url": null, "data": []}')
+    cache = ResponseCache(":memory:")
+    api = SportEighty(USAW_DOMAIN, session=replay_session, cache=cache)
+    assert api.event_results(dated_stub("1106", days_ago=400)) == {}
+    assert cache.lookup(RESULTS_URL.format("1106")) is None
+    api.event_results(dated_stub("1106", days_ago=400))
+    assert replay.calls[request_key("POST", RESULTS_URL.format("1106"))] == 2
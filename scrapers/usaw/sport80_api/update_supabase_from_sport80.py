@@ -1,8 +1,32 @@
 # update_supabase_from_sport80.py
+"""
+Syncs new Sport80 meet results into Supabase for one or more federations.
+
+    python update_supabase_from_sport80.py --federations USAW,BWL
+
+Every federation listed runs at the same time in this one process, on one shared HTTP connection pool and one
+response cache, so a combined run takes about as long as the slower federation on its own. This is the only copy
+of the sync, bwl/sport80_api/update_supabase_from_sport80.py just runs it with BWL as the default.
+"""
 import os
+import sys
+import json
+import argparse
+import threading
 import requests
 import logging
-from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone, timedelta
+from typing import Optional, Iterable, Iterator
+from requests.adapters import HTTPAdapter
+
+try:
+    from dotenv import load_dotenv
+    # Load environment variables from .env file
+    load_dotenv()
+except ImportError:
+    pass
 
 # Assuming your sport80 library is in a package named 'sport80_scraper'
 # located in the same parent directory as this script, or installed.
@@ -10,28 +34,78 @@ from datetime import datetime, timezone
 # from sport80_scraper import SportEighty
 # If sport80.py is directly in the same directory (not as a package):
 # from sport80 import SportEighty
-from sport80 import SportEighty # Adjust if your structure differs
+from sport80 import SportEighty, ResponseCache, RequestMetrics, Sport80FetchError, event_datetime, event_sort_key # Adjust if your structure differs
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'shared'))
+from lifting_results_db import LiftingResultsWriter, LiftingResultRow, find_existing_event_ids
 
 # --- Configuration ---
 # Supabase Configuration
 SUPABASE_URL = os.environ.get("SUPABASE_URL")
 SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
 SUPABASE_TABLE_NAME = "lifting_results" # Your table name
-# Column in Supabase that stores the unique meet name
-SUPABASE_MEET_NAME_COLUMN = "meet"
+# Rows per upsert request
+SUPABASE_BATCH_SIZE = int(os.environ.get("SUPABASE_BATCH_SIZE", "500"))
+EXISTENCE_CHECK_CHUNK_SIZE = int(os.environ.get("EXISTENCE_CHECK_CHUNK_SIZE", "150"))  # event IDs per lookup
+EXISTENCE_CHECK_WORKERS = 4  # lookups in flight at once
 
 # Sport80 Configuration
-USAW_DOMAIN = "https://usaweightlifting.sport80.com"
-
-# Slack Configuration
-SLACK_WEBHOOK_URL = os.environ.get("SLACK_WEBHOOK_URL")
+# Comma separated federation codes (keys of FEDERATIONS) to sync when --federations isn't given
+SYNC_FEDERATIONS = os.environ.get("SYNC_FEDERATIONS", "USAW")
+# Pages fetched at once when an event index or result set spans several pages
+SPORT80_PAGE_WORKERS = int(os.environ.get("SPORT80_PAGE_WORKERS", "8"))
+# On-disk response cache so reruns don't re-download unchanged pages, set to "" to turn it off
+SPORT80_CACHE_PATH = os.environ.get("SPORT80_CACHE_PATH", ".sport80_cache.sqlite")
+# Log every Sport80 request as a JSON line as well as the end of run summary
+SPORT80_JSON_LOGS = os.environ.get("SPORT80_JSON_LOGS", "").lower() in ("1", "true", "yes")
+
+# Incremental sync: only events dated from the last one ingested onwards get requested.
+# Keep the watermark file between runs (e.g. actions/cache), without it the run falls back to a full sync.
+SYNC_MODE = os.environ.get("SYNC_MODE", "incremental")  # "full" re-reads two years and takes the newest 20
+# One watermark per federation, {federation} is filled in with the lowercase federation code
+SYNC_WATERMARK_PATH = os.environ.get("SYNC_WATERMARK_PATH", "sport80_sync_watermark_{federation}.json")
+# Results often get posted a while after the meet, so look back this far before the watermark
+SYNC_LOOKBACK_DAYS = int(os.environ.get("SYNC_LOOKBACK_DAYS", "14"))
+
+
+
+@dataclass(frozen=True)
+class FederationConfig:
+    """Everything that differs between the federations this script can sync."""
+    code: str  # Stored in the federation column
+    domain: str
+    meet_name_field: str  # Field on a Sport80 event index entry that holds the meet name
+    slack_webhook_url: Optional[str]
+    slack_flag: str
+
+    @property
+    def watermark_path(self) -> str:
+        return SYNC_WATERMARK_PATH.format(federation=self.code.lower())
+
+
+FEDERATIONS = {
+    "USAW": FederationConfig(
+        code="USAW",
+        domain="https://usaweightlifting.sport80.com",
+        meet_name_field="meet",
+        slack_webhook_url=os.environ.get("SLACK_WEBHOOK_URL"),
+        slack_flag="🇺🇸",
+    ),
+    "BWL": FederationConfig(
+        code="BWL",
+        domain="https://bwl.sport80.com",
+        meet_name_field="event",  # BWL uses "event" as the field name (not "meet")
+        slack_webhook_url=os.environ.get("SLACK_BWL_RESULTS_WEBHOOK_URL"),
+        slack_flag="🇬🇧",
+    ),
+}
 
 # --- Logging Setup ---
 # GitHub Actions will capture stdout/stderr, so basic config is usually fine.
 # The sport80 library also has its own logging/print statements.
+# Each federation syncs on a thread named after it, so the thread name says which one a line is from.
 logging.basicConfig(
     level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(module)s - %(message)s",
+    format="%(asctime)s - %(levelname)s - %(threadName)s - %(module)s - %(message)s",
     handlers=[logging.StreamHandler()],
 )
 
@@ -49,108 +123,51 @@ def get_nested_value(data_dict, primary_key, column_name=None, sub_key="value"):
 
 def parse_event_date(event_data_dict):
     """
-    Tries to parse a date string from event data into a datetime object.
-    Sport80 API might return dates in various fields or formats.
+    The event's date as a UTC datetime, datetime.min (UTC) if it has none.
+    Events from the sport80 event index already carry a parsed_date, so this doesn't parse anything for them.
     """
-    date_str = get_nested_value(event_data_dict, "date", "Start Date") or \
-               get_nested_value(event_data_dict, "start_date")
-
-    if not date_str:
-        return datetime.min.replace(
-            tzinfo=timezone.utc
-        ) # Default for sorting
-
-    possible_formats = [
-        "%Y-%m-%d %H:%M:%S",
-        "%Y-%m-%d",
-        "%d/%m/%Y %H:%M:%S", # Common UK/EU format
-        "%d/%m/%Y",
-        "%m/%d/%Y %H:%M:%S", # Common US format
-        "%m/%d/%Y",
-    ]
-    for fmt in possible_formats:
-        try:
-            # Take only date part if time is included
-            dt_str_part = str(date_str).split(" ")[0]
-            dt = datetime.strptime(dt_str_part, fmt)
-            return dt.replace(tzinfo=timezone.utc) # Assume UTC
-        except (ValueError, TypeError):
-            continue
-    logging.warning(f"Could not parse date string: {date_str} for event.")
-    return datetime.min.replace(tzinfo=timezone.utc)
+    return event_datetime(event_data_dict)
 
 
-def filter_already_existing_event_ids(candidate_event_ids: list[str]) -> set[str]:
-    """Given a list of candidate event IDs, query Supabase to find which ones already exist."""
+def filter_already_existing_event_ids(candidate_event_ids: list[str], federation: FederationConfig,
+                                      session: Optional[requests.Session] = None) -> set[str]:
+    """Given a list of candidate event IDs, query Supabase to find which ones already exist for the federation."""
     if not candidate_event_ids:
         logging.info("No candidate event IDs provided to check for existence.")
         return set()
 
     if not SUPABASE_URL or not SUPABASE_KEY:
         logging.error("Supabase URL or Key not configured for checking event IDs.")
-        return set() # Or raise an error
-
-    # Format for the "in" clause: (id1,id2,id3)
-    # Supabase/PostgREST expects a comma-separated list for the `in` filter.
-    # Ensure IDs are quoted if they are strings, but event_id seems to be stored as text/string non-quoted in db based on logs.
-    # The event_ids extracted are already strings.
-    event_ids_str = ",".join(candidate_event_ids)
-    url = f"{SUPABASE_URL}/rest/v1/{SUPABASE_TABLE_NAME}?select=event_id&event_id=in.({event_ids_str})"
-    
-    headers = {
-        "apikey": SUPABASE_KEY,
-        "Authorization": f"Bearer {SUPABASE_KEY}",
-        "Accept": "application/json" # Explicitly ask for JSON
-    }
-    
-    existing_ids_in_db = set()
-    try:
-        logging.info(f"Querying Supabase for existing event_ids: {candidate_event_ids}")
-        resp = requests.get(url, headers=headers, timeout=45)
-        resp.raise_for_status() # Raises HTTPError for bad responses (4xx or 5xx)
-        
-        results = resp.json()
-        for row in results:
-            if "event_id" in row and row["event_id"]:
-                existing_ids_in_db.add(str(row["event_id"]).strip())
-        logging.info(f"Supabase check found {len(existing_ids_in_db)} existing event IDs: {existing_ids_in_db}")
-        return existing_ids_in_db
-    except requests.exceptions.RequestException as e:
-        logging.error(f"Error querying Supabase for existing event IDs: {e}")
-        if hasattr(e, 'response') and e.response is not None:
-            logging.error(f"Supabase response content for event_id check: {e.response.text}")
-        return set() # Return empty set on error, so script might try to re-add
-    except ValueError: # JSONDecodeError
-        logging.error(f"Error decoding JSON from Supabase event_id check: {resp.text if resp else 'No response'}")
-        return set()
+        return set() # Return empty set, so script might try to re-add
 
+    # Only the candidates are looked up, in chunks checked concurrently, and only distinct event IDs come back
+    # (filtered by federation so BWL and USAW events with the same ID don't hide each other)
+    existing_ids_in_db = find_existing_event_ids(SUPABASE_URL, SUPABASE_KEY, candidate_event_ids,
+                                                 federation=federation.code, table=SUPABASE_TABLE_NAME,
+                                                 chunk_size=EXISTENCE_CHECK_CHUNK_SIZE,
+                                                 max_workers=EXISTENCE_CHECK_WORKERS, session=session)
+    logging.info(f"Of the {len(candidate_event_ids)} candidates, {len(existing_ids_in_db)} already exist in DB")
+    return existing_ids_in_db
 
-def add_meet_results_to_supabase(results_to_insert: list):
-    """Insert a batch of results for a new meet into Supabase."""
+
+def add_meet_results_to_supabase(results_to_insert: Iterable[LiftingResultRow], writer: Optional[LiftingResultsWriter] = None):
+    """
+    Upsert a meet's results into Supabase in chunks, keyed on (event_id, name, federation).
+    results_to_insert can be a generator, only one chunk of it is held at a time.
+    """
     if not SUPABASE_URL or not SUPABASE_KEY:
         logging.error("Supabase URL or Key not configured for adding results.")
         return None
-    if not results_to_insert:
-        logging.info("No results to insert.")
-        return None
 
-    url = f"{SUPABASE_URL}/rest/v1/{SUPABASE_TABLE_NAME}"
-    headers = {
-        "apikey": SUPABASE_KEY,
-        "Authorization": f"Bearer {SUPABASE_KEY}",
-        "Content-Type": "application/json",
-        "Prefer": "return=minimal",
-    }
-    try:
-        resp = requests.post(url, headers=headers, json=results_to_insert, timeout=60)
-        resp.raise_for_status()
-        logging.info(f"Successfully inserted {len(results_to_insert)} results via Supabase API.")
-        return resp
-    except requests.exceptions.RequestException as e:
-        logging.error(f"Error inserting meet results to Supabase: {e}")
-        if hasattr(e, 'response') and e.response is not None:
-            logging.error(f"Supabase response content: {e.response.text}")
-        return None
+    writer = writer or LiftingResultsWriter(SUPABASE_URL, SUPABASE_KEY, SUPABASE_TABLE_NAME,
+                                            batch_size=SUPABASE_BATCH_SIZE)
+    upsert_result = writer.upsert(results_to_insert)
+    if upsert_result.ok:
+        logging.info(f"Successfully upserted {upsert_result.rows_written} results via Supabase API.")
+    else:
+        logging.error(f"Error upserting meet results to Supabase: {upsert_result.rows_failed} rows failed. "
+                      f"{upsert_result.failed_chunks}")
+    return upsert_result
 
 
 def fetch_recent_events_from_sport80(api_client: SportEighty, num_events: int = 30) -> list:
@@ -182,15 +199,69 @@ def fetch_recent_events_from_sport80(api_client: SportEighty, num_events: int =
         logging.warning("No events fetched from Sport80.")
         return []
 
-    all_event_dictionaries.sort(key=parse_event_date, reverse=True)
+    all_event_dictionaries.sort(key=event_sort_key, reverse=True)
     
     logging.info(f"Total event items fetched and sorted: {len(all_event_dictionaries)}")
     return all_event_dictionaries[:num_events]
 
 
-def fetch_meet_results_from_sport80(api_client: SportEighty, event_data_dict: dict) -> list:
+def load_sync_watermark(federation: FederationConfig) -> Optional[dict]:
+    """Read the federation's last ingested event date and ID, None if there isn't a usable watermark yet."""
+    watermark_path = federation.watermark_path
+    try:
+        with open(watermark_path, encoding="utf-8") as watermark_file:
+            watermark = json.load(watermark_file)
+        datetime.strptime(watermark["last_event_date"], "%Y-%m-%d")
+        return watermark
+    except FileNotFoundError:
+        logging.info(f"No sync watermark at {watermark_path}.")
+    except (ValueError, KeyError, TypeError) as e:
+        logging.warning(f"Ignoring unreadable sync watermark at {watermark_path}: {e}")
+    return None
+
+
+def save_sync_watermark(federation: FederationConfig, last_event_date: str, last_event_id: str):
+    """Persist the newest event date and ID of the federation's that are now in Supabase."""
+    watermark = {
+        "last_event_date": last_event_date,
+        "last_event_id": last_event_id,
+        "updated_at": datetime.now(timezone.utc).isoformat(),
+    }
+    with open(federation.watermark_path, "w", encoding="utf-8") as watermark_file:
+        json.dump(watermark, watermark_file, indent=2)
+    logging.info(f"Sync watermark moved to {last_event_date} (event ID {last_event_id}).")
+
+
+def fetch_events_since_watermark(api_client: SportEighty, watermark: dict) -> list:
+    """
+    Fetches only the events dated between the watermark (minus SYNC_LOOKBACK_DAYS) and today, newest first.
+    Nothing is cut off, so every meet that landed since the last run gets checked.
+    """
+    watermark_date = datetime.strptime(watermark["last_event_date"], "%Y-%m-%d")
+    range_start = (watermark_date - timedelta(days=SYNC_LOOKBACK_DAYS)).strftime("%Y-%m-%d")
+    range_end = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    logging.info(f"Incremental sync from {range_start} to {range_end} "
+                 f"(watermark {watermark['last_event_date']}, event ID {watermark.get('last_event_id')}).")
+
+    try:
+        events_dict = api_client.event_index_range(range_start, range_end)
+    except Exception as e:
+        logging.error(f"Error fetching Sport80 events from {range_start} to {range_end}: {e}", exc_info=True)
+        return []
+    if not isinstance(events_dict, dict):
+        logging.warning(f"event_index_range did not return a dict: {type(events_dict)}")
+        return []
+
+    events = list(events_dict.values())
+    events.sort(key=event_sort_key, reverse=True)
+    logging.info(f"Total event items fetched since watermark: {len(events)}")
+    return events
+
+
+def fetch_meet_results_from_sport80(api_client: SportEighty, event_data_dict: dict) -> Iterator[dict]:
     """
-    Fetches results for a specific event.
+    Yields the result rows for a specific event as each page of them comes back from Sport80.
+    Raises Sport80FetchError if a page can't be fetched or read, so a meet is never written as if it were complete.
     The event_data_dict MUST contain the necessary structure for event_id extraction
     (i.e., event_data_dict['action'][0]['route']) as used by the library.
     """
@@ -203,49 +274,28 @@ def fetch_meet_results_from_sport80(api_client: SportEighty, event_data_dict: di
                 "route" in event_data_dict["action"][0]):
             logging.error(f"Event data for '{meet_name_for_log}' is missing 'action':'route' structure needed for fetching results. Skipping.")
             logging.debug(f"Problematic event_data_dict: {str(event_data_dict)[:500]}") # Log part of the dict
-            return []
+            return
 
         logging.info(f"Fetching results for meet: {meet_name_for_log}")
-        # SportEighty.event_results returns a dict: {0: result1, 1: result2, ...}
-        results_dict = api_client.event_results(event_dict=event_data_dict)
-        if isinstance(results_dict, dict):
-            return list(results_dict.values()) # Return list of result row dictionaries
-        logging.warning(f"event_results for {meet_name_for_log} did not return a dict: {type(results_dict)}")
-        return []
+        # Rows come straight off each page, the whole meet is never collated in memory
+        yield from api_client.iter_event_results(event_dict=event_data_dict)
+    except Sport80FetchError:
+        raise
     except Exception as e:
+        # A malformed page partway through leaves the rows so far short of the meet, same as a page that failed
         logging.error(f"Error fetching results for {meet_name_for_log}: {e}", exc_info=True)
-        return []
+        raise Sport80FetchError(event_data_dict["action"][0]["route"], reason=f"{type(e).__name__}: {e}") from e
 
 
-def fetch_max_id_from_supabase() -> int:
-    """Fetch the highest ID value from the Supabase database."""
-    if not SUPABASE_URL or not SUPABASE_KEY:
-        logging.error("Supabase URL or Key not configured.")
-        return 0
-
-    url = f"{SUPABASE_URL}/rest/v1/{SUPABASE_TABLE_NAME}?select=id&order=id.desc&limit=1"
-    headers = {
-        "apikey": SUPABASE_KEY,
-        "Authorization": f"Bearer {SUPABASE_KEY}",
-    }
-    try:
-        resp = requests.get(url, headers=headers, timeout=30)
-        resp.raise_for_status()
-        results = resp.json()
-        if results and len(results) > 0:
-            return results[0]["id"]
-        return 0
-    except requests.exceptions.RequestException as e:
-        logging.error(f"Error fetching max ID from Supabase: {e}")
-        return 0
-    except (ValueError, KeyError, IndexError) as e:
-        logging.error(f"Error processing max ID from Supabase: {e}")
-        return 0
+def format_result_row(result_item: dict, event_id: str, meet_name: str, meet_date_for_db: Optional[str],
+                      federation_code: str) -> LiftingResultRow:
+    """Turn one Sport80 result row into a lifting_results row."""
+    return LiftingResultRow.from_sport80(result_item, event_id, meet_name, meet_date_for_db, federation_code)
 
 
-def send_slack_notification(added_meet_names: list[str]):
+def send_slack_notification(added_meet_names: list[str], federation: FederationConfig):
     """Send a Slack notification with the names of meets added and timestamp."""
-    if not SLACK_WEBHOOK_URL:
+    if not federation.slack_webhook_url:
         logging.info("Slack webhook URL not configured. Skipping notification.")
         return
 
@@ -254,19 +304,19 @@ def send_slack_notification(added_meet_names: list[str]):
     
     # Create the message
     if not added_meet_names:
-        message = f"🇺🇸 No new USAW meet results added to Supabase"
+        message = f"{federation.slack_flag} No new {federation.code} meet results added to Supabase"
     elif len(added_meet_names) == 1:
-        message = f"🇺🇸 1 USAW Meet Result Added to Supabase:\n• {added_meet_names[0]}"
+        message = f"{federation.slack_flag} 1 {federation.code} Meet Result Added to Supabase:\n• {added_meet_names[0]}"
     else:
         meet_list = "\n".join([f"• {name}" for name in added_meet_names])
-        message = f"🇺🇸 {len(added_meet_names)} USAW Meet Results Added to Supabase:\n{meet_list}"
+        message = f"{federation.slack_flag} {len(added_meet_names)} {federation.code} Meet Results Added to Supabase:\n{meet_list}"
     
     payload = {
         "text": message
     }
     
     try:
-        response = requests.post(SLACK_WEBHOOK_URL, json=payload, timeout=30)
+        response = requests.post(federation.slack_webhook_url, json=payload, timeout=30)
         response.raise_for_status()
         logging.info(f"Slack notification sent successfully: {message}")
     except requests.exceptions.RequestException as e:
@@ -275,16 +325,22 @@ def send_slack_notification(added_meet_names: list[str]):
             logging.error(f"Slack webhook response: {e.response.text}")
 
 
-def main():
-    logging.info("Starting Sport80 to Supabase sync process...")
+def sync_federation(federation: FederationConfig, session: requests.Session,
+                    sport80_cache: Optional[ResponseCache], writer: LiftingResultsWriter,
+                    metrics: Optional[RequestMetrics] = None):
+    """Sync one federation's new meets into Supabase, using the HTTP session, cache, writer and metrics passed in."""
+    threading.current_thread().name = federation.code
+    logging.info(f"Starting Sport80 to Supabase sync for {federation.code}...")
 
-    if not SUPABASE_URL or not SUPABASE_KEY:
-        logging.critical("SUPABASE_URL and SUPABASE_KEY must be set. Exiting.")
-        return
-
-    sport80_api = SportEighty(subdomain=USAW_DOMAIN, return_dict=True, debug=logging.WARNING)
-    # Keeping num_events=1 for this test, can be changed back to 30 later.
-    recent_sport80_events_data = fetch_recent_events_from_sport80(sport80_api, num_events=20)
+    sport80_api = SportEighty(subdomain=federation.domain, return_dict=True, debug=logging.WARNING,
+                              page_workers=SPORT80_PAGE_WORKERS, cache=sport80_cache, session=session,
+                              metrics=metrics)
+    watermark = load_sync_watermark(federation) if SYNC_MODE == "incremental" else None
+    if watermark:
+        recent_sport80_events_data = fetch_events_since_watermark(sport80_api, watermark)
+    else:
+        logging.info("Running a full sync of the newest events from the last two years.")
+        recent_sport80_events_data = fetch_recent_events_from_sport80(sport80_api, num_events=20)
 
     if not recent_sport80_events_data:
         logging.info("No recent events fetched from Sport80. Exiting.")
@@ -293,7 +349,7 @@ def main():
 
     candidate_event_details = []
     for event_data_item in recent_sport80_events_data:
-        meet_name = get_nested_value(event_data_item, "meet") # Primary source for meet name from Sport80
+        meet_name = event_data_item.get(federation.meet_name_field) # Primary source for meet name from Sport80
         event_id_str = "N/A"
         try:
             event_id_str = str(event_data_item['action'][0]['route'].split('/')[-1]).strip()
@@ -304,7 +360,7 @@ def main():
                 event_id_str = str(event_id_from_data).strip()
         
         if not meet_name:
-            logging.warning(f"Event data missing 'meet' field. Event ID: {event_id_str}. Data: {str(event_data_item)[:200]}")
+            logging.warning(f"Event data missing '{federation.meet_name_field}' field. Event ID: {event_id_str}. Data: {str(event_data_item)[:200]}")
             # Decide if you want to skip or use a placeholder for meet_name
             # meet_name = f"Unknown Meet (ID: {event_id_str})" # Example placeholder
             # For now, let's rely on later checks to skip if name is truly essential elsewhere
@@ -321,14 +377,13 @@ def main():
     candidate_ids_to_check_in_db = [details["id"] for details in candidate_event_details]
     
     # Query Supabase for which of these candidate IDs already exist
-    already_existing_event_ids_in_db = filter_already_existing_event_ids(candidate_ids_to_check_in_db)
+    already_existing_event_ids_in_db = filter_already_existing_event_ids(candidate_ids_to_check_in_db, federation, session)
     logging.info(f"Checked {len(candidate_ids_to_check_in_db)} candidate event IDs. Found {len(already_existing_event_ids_in_db)} existing in DB: {already_existing_event_ids_in_db}")
 
-    max_id_in_db = fetch_max_id_from_supabase()
-    next_id_for_new_rows = max_id_in_db + 1
-    logging.info(f"Highest existing primary ID in Supabase table: {max_id_in_db}. Next row ID will start from: {next_id_for_new_rows}")
-
     processed_event_ids_this_run = set() # To prevent re-processing if Sport80 API sends duplicates in one batch
+    synced_events = []  # (date, event ID) of every event that is in Supabase after this run, for the watermark
+    unsynced_events = []  # (date, event ID) of events that failed to fetch or write, the watermark stays behind them
+    empty_events = []  # (date, event ID) of events with no results yet, the watermark only waits for recent ones
     added_meet_names = []  # Track the names of meets that were successfully added
 
     for event_details in candidate_event_details:
@@ -344,6 +399,7 @@ def main():
 
         if current_event_id in already_existing_event_ids_in_db:
             logging.info(f"Event ID '{current_event_id}' ('{current_meet_name}') already exists in Supabase (checked via DB query). Skipping.")
+            synced_events.append((parse_event_date(event_data_for_api), current_event_id))
             continue
         
         if current_event_id in processed_event_ids_this_run:
@@ -352,59 +408,104 @@ def main():
 
         logging.info(f"Treating as new meet for DB: '{current_meet_name}' (Event ID: {current_event_id})")
         
-        detailed_results_list = fetch_meet_results_from_sport80(sport80_api, event_data_for_api)
-
-        if not detailed_results_list:
-            logging.warning(f"No detailed results found/fetched for '{current_meet_name}' (ID: {current_event_id}). Adding ID to processed list to prevent re-check this run.")
-            processed_event_ids_this_run.add(current_event_id)
-            continue
-
-        formatted_results_for_supabase = []
         meet_date_obj = parse_event_date(event_data_for_api)
         meet_date_for_db = meet_date_obj.strftime("%Y-%m-%d") if meet_date_obj > datetime.min.replace(tzinfo=timezone.utc) else None
+        detailed_results = fetch_meet_results_from_sport80(sport80_api, event_data_for_api)
+        formatted_results_for_supabase = (
+            format_result_row(result_item, current_event_id, current_meet_name, meet_date_for_db, federation.code)
+            for result_item in detailed_results
+        )
+        try:
+            insert_response = add_meet_results_to_supabase(formatted_results_for_supabase, writer)
+        except Sport80FetchError as e:
+            # Chunks already upserted would make the existence check skip this meet for good, so take them out
+            logging.error(f"Incomplete results for '{current_meet_name}' (ID: {current_event_id}), not adding it: {e}")
+            if not writer.delete_event(current_event_id, federation.code):
+                logging.error(f"Rows already written for event {current_event_id} could not be removed, "
+                              f"delete them by hand so the next run picks the meet up again.")
+            unsynced_events.append((meet_date_obj, current_event_id))
+            processed_event_ids_this_run.add(current_event_id)
+            continue
 
-        for result_item in detailed_results_list:
-            lifter_name = get_nested_value(result_item, "lifter", "Athlete") or get_nested_value(result_item, "name", "Name")
-            age_cat = get_nested_value(result_item, "age_category", "Age Category") or get_nested_value(result_item, "age", "Age")
-            body_w = get_nested_value(result_item, "body_weight_kg", "Bodyweight") or get_nested_value(result_item, "body_weight_(kg)")
-            sn1 = get_nested_value(result_item, "snatch_lift_1", "Snatch 1")
-            sn2 = get_nested_value(result_item, "snatch_lift_2", "Snatch 2")
-            sn3 = get_nested_value(result_item, "snatch_lift_3", "Snatch 3")
-            best_sn = get_nested_value(result_item, "best_snatch", "Best Snatch")
-            cj1 = get_nested_value(result_item, "cj_lift_1", "Clean & Jerk 1") or get_nested_value(result_item, "c&j_lift_1")
-            cj2 = get_nested_value(result_item, "cj_lift_2", "Clean & Jerk 2") or get_nested_value(result_item, "c&j_lift_2")
-            cj3 = get_nested_value(result_item, "cj_lift_3", "Clean & Jerk 3") or get_nested_value(result_item, "c&j_lift_3")
-            best_cj = get_nested_value(result_item, "best_cj", "Best Clean & Jerk") or get_nested_value(result_item, "best_c&j")
-            total_lifted = get_nested_value(result_item, "total", "Total")
-
-            formatted_results_for_supabase.append({
-                "id": next_id_for_new_rows,
-                "event_id": current_event_id,
-                SUPABASE_MEET_NAME_COLUMN: current_meet_name,
-                "date": meet_date_for_db,
-                "name": lifter_name,
-                "age": age_cat,
-                "body_weight": body_w,
-                "snatch1": sn1, "snatch2": sn2, "snatch3": sn3, "snatch_best": best_sn,
-                "cj1": cj1, "cj2": cj2, "cj3": cj3, "cj_best": best_cj,
-                "total": total_lifted,
-                "federation": "USAW",
-            })
-            next_id_for_new_rows += 1
-
-        if formatted_results_for_supabase:
-            add_meet_results_to_supabase(formatted_results_for_supabase)
+        if insert_response and not insert_response.rows_written and not insert_response.rows_failed:
+            logging.warning(f"No detailed results found/fetched for '{current_meet_name}' (ID: {current_event_id}). Adding ID to processed list to prevent re-check this run.")
+            empty_events.append((meet_date_obj, current_event_id))
+        elif insert_response and insert_response.ok:
             added_meet_names.append(current_meet_name)  # Add the meet name to our list
-            logging.info(f"Successfully added {len(formatted_results_for_supabase)} results for '{current_meet_name}' (ID: {current_event_id}).")
+            synced_events.append((meet_date_obj, current_event_id))
+            logging.info(f"Successfully added {insert_response.rows_written} results for '{current_meet_name}' (ID: {current_event_id}).")
         else:
-            logging.warning(f"No results formatted for Supabase for meet: '{current_meet_name}' (ID: {current_event_id}).")
-        
+            logging.error(f"Failed to add results for '{current_meet_name}' (ID: {current_event_id}).")
+            unsynced_events.append((meet_date_obj, current_event_id))
+
         processed_event_ids_this_run.add(current_event_id) # Add here after attempting to process
 
-    logging.info(f"Finished Sport80 to Supabase sync. Added results for {len(added_meet_names)} new meet(s).")
+    logging.info(f"Finished Sport80 to Supabase sync for {federation.code}. Added results for {len(added_meet_names)} new meet(s).")
+
+    dated_synced_events = [event for event in synced_events if event[0] > datetime.min.replace(tzinfo=timezone.utc)]
+    if dated_synced_events:
+        newest_date, newest_event_id = max(dated_synced_events)
+        # A meet that never posts results (cancelled or abandoned) would hold the watermark forever, so an empty
+        # one only holds it while it's inside the lookback window. Failed ones hold it until they go in.
+        lookback_start = datetime.now(timezone.utc) - timedelta(days=SYNC_LOOKBACK_DAYS)
+        dated_unsynced_events = [event for event in unsynced_events
+                                 if event[0] > datetime.min.replace(tzinfo=timezone.utc)]
+        dated_unsynced_events += [event for event in empty_events if event[0] >= lookback_start]
+        if dated_unsynced_events and min(dated_unsynced_events)[0] < newest_date:
+            # Moving past an event that failed or is waiting on results would leave it out of the next run's range
+            newest_date, newest_event_id = min(dated_unsynced_events)
+            logging.info(f"Holding the watermark at {newest_date.strftime('%Y-%m-%d')}, event ID {newest_event_id} "
+                         f"isn't in Supabase yet.")
+        if not watermark or newest_date.strftime("%Y-%m-%d") >= watermark["last_event_date"]:
+            save_sync_watermark(federation, newest_date.strftime("%Y-%m-%d"), newest_event_id)
 
     # Send Slack notification with meet names
-    send_slack_notification(added_meet_names)
+    send_slack_notification(added_meet_names, federation)
+    return added_meet_names
+
+
+def main(federation_codes: list[str]):
+    logging.info(f"Starting Sport80 to Supabase sync process for {', '.join(federation_codes)}...")
+
+    if not SUPABASE_URL or not SUPABASE_KEY:
+        logging.critical("SUPABASE_URL and SUPABASE_KEY must be set. Exiting.")
+        return
+    unknown_codes = [code for code in federation_codes if code not in FEDERATIONS]
+    if unknown_codes:
+        logging.critical(f"Unknown federation(s) {unknown_codes}, expected some of {list(FEDERATIONS)}. Exiting.")
+        return
+
+    # One pool for Sport80 and Supabase across every federation, sized so no thread waits on a connection
+    session = requests.Session()
+    pool_size = len(federation_codes) * max(SPORT80_PAGE_WORKERS, EXISTENCE_CHECK_WORKERS)
+    pooled_adapter = HTTPAdapter(pool_maxsize=max(10, pool_size))
+    session.mount("https://", pooled_adapter)
+    session.mount("http://", pooled_adapter)
+    sport80_cache = ResponseCache(SPORT80_CACHE_PATH) if SPORT80_CACHE_PATH else None
+    writer = LiftingResultsWriter(SUPABASE_URL, SUPABASE_KEY, SUPABASE_TABLE_NAME, batch_size=SUPABASE_BATCH_SIZE,
+                                  session=session)
+    metrics = RequestMetrics(json_logs=SPORT80_JSON_LOGS)
+
+    with ThreadPoolExecutor(max_workers=len(federation_codes)) as pool:
+        futures = {code: pool.submit(sync_federation, FEDERATIONS[code], session, sport80_cache, writer, metrics)
+                   for code in federation_codes}
+    for code, future in futures.items():
+        try:
+            added_meet_names = future.result()
+            logging.info(f"{code}: {len(added_meet_names or [])} new meet(s) added.")
+        except Exception as e:
+            logging.error(f"{code} sync failed: {e}", exc_info=True)
+    metrics.write_summary(f"Sport80 sync ({', '.join(federation_codes)}): requests")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Sync new Sport80 meet results into Supabase.")
+    parser.add_argument("--federations", default=SYNC_FEDERATIONS,
+                        help=f"Comma separated federations to sync at once, any of {', '.join(FEDERATIONS)} "
+                             f"(default: {SYNC_FEDERATIONS})")
+    args = parser.parse_args()
+    return [code.strip().upper() for code in args.federations.split(",") if code.strip()]
+
 
 if __name__ == "__main__":
-    main()
+    main(parse_args())
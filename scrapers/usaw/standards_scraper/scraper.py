@@ -15,6 +15,9 @@ USAGE:
   
   # Full run (update database)
   source venv/bin/activate && python scraper.py
+  
+  # Parse and sync even if the PDF hasn't changed since the last sync
+  source venv/bin/activate && python scraper.py --force
 """
 
 import os
@@ -22,13 +25,16 @@ import sys
 import argparse
 import re
 import requests
-from io import BytesIO
-from typing import List, Dict, Any, Optional, Tuple
+from typing import BinaryIO, List, Dict, Any, Optional, Tuple
 from datetime import datetime
 from dotenv import load_dotenv
 import pdfplumber
 from bs4 import BeautifulSoup
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'shared'))
+from pdf_cache import CachedPDF, fetch_pdf
+from parsed_pdf_cache import default_parsed_cache
+
 try:
     from supabase import create_client, Client
 except ImportError:
@@ -38,6 +44,8 @@ except ImportError:
 # Load environment variables
 load_dotenv()
 
+PARSER_VERSION = "1"  # of extract_standards_from_pdf(), see parsed_pdf_cache
+
 
 class StandardsScraper:
     """Scraper for USA Weightlifting standards PDF."""
@@ -128,19 +136,10 @@ class StandardsScraper:
             print(f"✗ Error fetching page: {e}")
             return None
     
-    def download_pdf(self, url: str) -> BytesIO:
-        """Download PDF from URL."""
+    def download_pdf(self, url: str) -> CachedPDF:
+        """Download PDF from URL, or reuse the cached copy if it hasn't changed."""
         print(f"Downloading PDF from {url}...")
-        
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-        }
-        
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()
-        
-        print("✓ PDF downloaded")
-        return BytesIO(response.content)
+        return fetch_pdf(url)
     
     def _parse_int(self, value: Any) -> Optional[int]:
         """Parse integer value, handling various formats."""
@@ -230,7 +229,7 @@ class StandardsScraper:
         
         return None
     
-    def extract_standards_from_pdf(self, pdf_file: BytesIO) -> List[Dict[str, Any]]:
+    def extract_standards_from_pdf(self, pdf_file: BinaryIO) -> List[Dict[str, Any]]:
         """
         Extract standards data from PDF.
         
@@ -535,8 +534,14 @@ class StandardsScraper:
         except requests.exceptions.RequestException as e:
             print(f"⚠ Failed to send Slack notification: {e}")
     
-    def run(self, dry_run: bool = False):
-        """Main execution method."""
+    def run(self, dry_run: bool = False, force: bool = False):
+        """
+        Main execution method.
+        
+        Args:
+            dry_run: If True, preview changes without updating database
+            force: If True, parse and sync the PDF even if it hasn't changed since the last sync
+        """
         print("="*60)
         print("USA Weightlifting Standards Scraper")
         print("="*60 + "\n")
@@ -550,10 +555,17 @@ class StandardsScraper:
         self.pdf_url = pdf_url
         
         # Download PDF
-        pdf_file = self.download_pdf(pdf_url)
+        pdf = self.download_pdf(pdf_url)
         
         # Extract standards
-        standards = self.extract_standards_from_pdf(pdf_file)
+        def parse():
+            with pdf.buffer() as pdf_buffer:
+                return self.extract_standards_from_pdf(pdf_buffer)
+        
+        parsed_cache = default_parsed_cache()
+        standards, already_synced = parsed_cache.load_or_parse("standards", PARSER_VERSION, pdf.sha256, parse, force)
+        if already_synced:
+            return
         
         if not standards:
             print("✗ No standards extracted from PDF. Exiting.")
@@ -580,6 +592,7 @@ class StandardsScraper:
             print("="*60 + "\n")
             result = self.upsert_to_supabase(standards)
             print(f"\n✓ Complete: {len(result['inserted'])} inserted, {len(result['updated'])} updated")
+            parsed_cache.mark_synced("standards", PARSER_VERSION, pdf.sha256)
             
             # Send Slack notification
             self.send_slack_notification(result['inserted'], result['updated'])
@@ -595,11 +608,16 @@ def main():
         action='store_true',
         help='Preview changes without updating database'
     )
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Parse and sync the PDF even if it has not changed since the last sync'
+    )
     
     args = parser.parse_args()
     
     scraper = StandardsScraper()
-    scraper.run(dry_run=args.dry_run)
+    scraper.run(dry_run=args.dry_run, force=args.force)
 
 
 if __name__ == "__main__":
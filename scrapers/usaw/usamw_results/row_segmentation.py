@@ -0,0 +1,65 @@
+# row_segmentation.py
+"""
+Whitespace row segmentation of rendered USAMW result pages, split out of usamw_results_scraper so it only needs
+numpy (and PIL images to crop) rather than the scraper's OpenAI, Supabase and Google dependencies.
+"""
+from typing import List, Tuple
+
+import numpy as np
+
+# Grayscale level below which a pixel counts as content when splitting page images into rows
+WHITE_THRESHOLD = 250
+
+
+def content_row_spans(content: np.ndarray, min_row_height: int = 40) -> List[List[Tuple[int, int]]]:
+    """
+    Find the runs of content rows on each page.
+
+    Args:
+        content: Boolean array of shape (pages, height), or (height,) for one page, True where a pixel row has content
+        min_row_height: Minimum number of rows in a run
+
+    Returns:
+        (start_y, end_y) of each run at least min_row_height tall for each page, end_y exclusive
+    """
+    content = np.atleast_2d(content)
+    pages, height = content.shape
+
+    # With a blank row either side of every page, each run starts where the row-to-row difference is +1 and ends
+    # where it's -1. Flattened, a page's starts and ends come in order and pair up one to one.
+    padded = np.zeros((pages, height + 2), dtype=np.int8)
+    padded[:, 1:-1] = content
+    edges = np.diff(padded, axis=1).ravel()
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+
+    tall_enough = ends - starts >= min_row_height
+    starts, ends = starts[tall_enough], ends[tall_enough]
+    page_of_run = starts // (height + 1)
+    spans = np.column_stack((starts % (height + 1), ends % (height + 1)))
+    return [[tuple(span) for span in page_spans.tolist()]
+            for page_spans in np.split(spans, np.searchsorted(page_of_run, np.arange(1, pages)))]
+
+
+def split_into_rows(images: list, min_row_height: int = 40) -> list:
+    """
+    Split several page images into horizontal rows based on whitespace, finding the rows of all pages at once.
+
+    Args:
+        images: PIL Images to split, they don't need to be the same size
+        min_row_height: Minimum height for a row
+
+    Returns:
+        List of cropped row images for each image, in order
+    """
+    if not images:
+        return []
+
+    # One reduction per page over the pixel columns: a pixel row has content if any pixel in it isn't white.
+    # Shorter pages are padded with blank rows so the run boundaries can be found for all pages together.
+    content = np.zeros((len(images), max(image.height for image in images)), dtype=bool)
+    for index, image in enumerate(images):
+        content[index, :image.height] = (np.asarray(image.convert('L')) < WHITE_THRESHOLD).any(axis=1)
+
+    return [[image.crop((0, start_y, image.width, end_y)) for start_y, end_y in spans]
+            for image, spans in zip(images, content_row_spans(content, min_row_height))]
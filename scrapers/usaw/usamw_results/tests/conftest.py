@@ -0,0 +1,7 @@
+# conftest.py
+"""Puts the USAMW results scripts on the path for the tests."""
+import os
+import sys
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TESTS_DIR))
@@ -0,0 +1,113 @@
+# test_row_segmentation.py
+"""
+Whitespace row segmentation of USAMW result pages, for the vision path's split_image(s)_into_rows. The pages are
+drawn with PyMuPDF and rendered at 300 DPI the way USAMWResultsScraper.pdf_to_images does:
+
+    python -m pytest tests/test_row_segmentation.py --benchmark-json=segmentation.json
+"""
+import io
+
+import pytest
+
+for module in ("numpy", "fitz", "PIL", "pytest_benchmark"):
+    pytest.importorskip(module)
+
+import fitz  # noqa: E402
+import numpy as np  # noqa: E402
+from PIL import Image  # noqa: E402
+
+from row_segmentation import content_row_spans, split_into_rows  # noqa: E402
+
+SAMPLE_PAGES = 6
+RESULT_LINES = 24
+
+
+def sample_results_pdf() -> bytes:
+    """SAMPLE_PAGES results pages laid out like the USAMW PDFs, every third one A4 instead of letter."""
+    doc = fitz.open()
+    for page_number in range(SAMPLE_PAGES):
+        page = doc.new_page(width=595 if page_number % 3 == 2 else 612, height=842 if page_number % 3 == 2 else 792)
+        page.insert_text((40, 50), f"Women's Masters (45-49) {64 + page_number}kg", fontsize=16)
+        page.draw_line((40, 62), (560, 62))
+        for line in range(RESULT_LINES):
+            y = 90 + line * 27 + (line // 8) * 12  # a wider gap between groups of results
+            page.insert_text((40, y), f"{line + 1}  LIFTER Name{line}  Anywhere WLC  63.{line}  -60  62  65  "
+                                      f"80  -84  84  149", fontsize=10)
+    pdf_bytes = doc.tobytes()
+    doc.close()
+    return pdf_bytes
+
+
+def render_pages(pdf_bytes: bytes) -> list:
+    """Each page as a 300 DPI PIL Image, as pdf_to_images renders them."""
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    pages = [Image.open(io.BytesIO(page.get_pixmap(matrix=fitz.Matrix(300 / 72, 300 / 72)).tobytes("png")))
+             for page in doc]
+    doc.close()
+    return pages
+
+
+def row_spans_by_scan(gray: np.ndarray, min_row_height: int = 40) -> list:
+    """The row by row scan split_image_into_rows used to do, to check the vectorized version against."""
+    spans = []
+    in_content = False
+    start_y = 0
+    for y in range(gray.shape[0]):
+        has_content = np.any(gray[y, :] < 250)
+        if has_content and not in_content:
+            start_y = y
+            in_content = True
+        elif not has_content and in_content:
+            if y - start_y >= min_row_height:
+                spans.append((start_y, y))
+            in_content = False
+    if in_content and gray.shape[0] - start_y >= min_row_height:
+        spans.append((start_y, gray.shape[0]))
+    return spans
+
+
+@pytest.fixture(scope="module")
+def rendered_pages() -> list:
+    pages = render_pages(sample_results_pdf())
+    assert len(pages) == SAMPLE_PAGES
+    return pages
+
+
+@pytest.mark.parametrize("min_row_height", [1, 40])
+def test_matches_the_row_by_row_scan(rendered_pages, min_row_height):
+    batch = split_into_rows(rendered_pages, min_row_height)
+    for page, rows in zip(rendered_pages, batch):
+        expected = row_spans_by_scan(np.asarray(page.convert("L")), min_row_height)
+        assert [row.height for row in rows] == [end_y - start_y for start_y, end_y in expected]
+        assert [row.width for row in rows] == [page.width] * len(expected)
+    assert any(batch)
+
+
+def test_single_page_and_batch_agree(rendered_pages):
+    batch = split_into_rows(rendered_pages, min_row_height=1)
+    for page, rows in zip(rendered_pages, batch):
+        single, = split_into_rows([page], min_row_height=1)
+        assert [row.tobytes() for row in single] == [row.tobytes() for row in rows]
+    assert split_into_rows([]) == []
+
+
+def test_content_row_spans_edges():
+    content = np.array([[1, 1, 0, 0, 1, 0, 1, 1, 1],
+                        [0, 0, 0, 0, 0, 0, 0, 0, 0],
+                        [1, 1, 1, 1, 1, 1, 1, 1, 1]], dtype=bool)
+    assert content_row_spans(content, min_row_height=1) == [[(0, 2), (4, 5), (6, 9)], [], [(0, 9)]]
+    assert content_row_spans(content, min_row_height=2) == [[(0, 2), (6, 9)], [], [(0, 9)]]
+    assert content_row_spans(content[0], min_row_height=3) == [[(6, 9)]]
+
+
+def test_segmentation_scan(benchmark, rendered_pages):
+    def scan_pages():
+        return [[page.crop((0, start_y, page.width, end_y))
+                 for start_y, end_y in row_spans_by_scan(np.asarray(page.convert("L")))] for page in rendered_pages]
+
+    assert len(benchmark(scan_pages)) == SAMPLE_PAGES
+
+
+def test_segmentation_vectorized(benchmark, rendered_pages):
+    batch = benchmark(split_into_rows, rendered_pages)
+    assert len(batch) == SAMPLE_PAGES
@@ -9,6 +9,9 @@ USAGE:
   
   # Full run (update database)
   python usamw_results_scraper.py
+  
+  # Parse one PDF at a time instead of one per CPU
+  python usamw_results_scraper.py --workers 1
 """
 
 import os
@@ -17,13 +20,20 @@ import argparse
 import re
 import io
 import tempfile
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Set, Tuple
 from datetime import datetime
 import requests
 from dotenv import load_dotenv
 import base64
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 from pathlib import Path
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'shared'))
+from lifting_results_db import LiftingResultRow, LiftingResultsWriter, best_lift, parse_number
+from pdf_cache import fetch_pdf
+from row_segmentation import split_into_rows
+
 try:
     from tabulate import tabulate
 except ImportError:
@@ -49,6 +59,14 @@ PDF_URLS = [
 
 ]
 
+# PDFs downloaded at once, and processes extracting and parsing downloaded PDFs at once (1 = one PDF at a time)
+DOWNLOAD_WORKERS = int(os.getenv("USAMW_DOWNLOAD_WORKERS", "8"))
+PARSE_WORKERS = int(os.getenv("USAMW_PARSE_WORKERS", str(os.cpu_count() or 1)))
+
+# Rows per page when reading existing results (PostgREST's default max-rows), and rows per bulk insert
+SUPABASE_PAGE_SIZE = 1000
+INSERT_BATCH_SIZE = 500
+
 # ============================================================================
 
 # PDF and image processing
@@ -94,7 +112,8 @@ load_dotenv()
 class USAMWResultsScraper:
     """Scraper for USAMW competition results from Google Drive PDFs."""
     
-    def __init__(self, pdf_urls: List[str], meet_name: str, meet_date: str, event_id: str, adaptive: bool = False):
+    def __init__(self, pdf_urls: List[str], meet_name: str, meet_date: str, event_id: str, adaptive: bool = False,
+                 download_workers: int = DOWNLOAD_WORKERS, parse_workers: int = PARSE_WORKERS):
         """Initialize the scraper.
         
         Args:
@@ -103,14 +122,19 @@ class USAMWResultsScraper:
             meet_date: Date of the competition in YYYY-MM-DD format (e.g., "2025-03-15")
             event_id: Event ID for this competition (e.g., "7115")
             adaptive: Whether this is an adaptive meet (default: False)
+            download_workers: PDFs downloaded at once
+            parse_workers: Processes extracting and parsing PDFs at once, 1 processes them one after another
         """
         self.pdf_urls = pdf_urls
         self.meet_name = meet_name
         self.meet_date = meet_date
         self.event_id = event_id
         self.adaptive = adaptive
+        self.download_workers = max(1, download_workers)
+        self.parse_workers = max(1, parse_workers)
         self.openai_client: Optional[OpenAI] = None
         self.supabase: Optional[Client] = None
+        self.writer: Optional[LiftingResultsWriter] = None
         self.slack_webhook_url: Optional[str] = None
         
     def _extract_file_id_from_url(self, url: str) -> Optional[str]:
@@ -143,6 +167,8 @@ class USAMWResultsScraper:
             raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set in .env")
         
         self.supabase = create_client(supabase_url, supabase_key)
+        # Writes go through the same upsert on (event_id, name, federation) as the Sport80 syncs
+        self.writer = LiftingResultsWriter(supabase_url, supabase_key, batch_size=INSERT_BATCH_SIZE)
         print("✓ Supabase client initialized")
     
     def setup_slack(self):
@@ -153,7 +179,7 @@ class USAMWResultsScraper:
     
     
     def download_pdf_from_url(self, url: str) -> Optional[bytes]:
-        """Download PDF from URL (Google Drive or direct link)."""
+        """Download PDF from URL (Google Drive or direct link), or reuse the cached copy if it hasn't changed."""
         print(f"Downloading from: {url}")
         
         # Check if it's a Google Drive URL
@@ -163,21 +189,19 @@ class USAMWResultsScraper:
             # Google Drive file - use export download URL
             try:
                 download_url = f"https://drive.google.com/uc?export=download&id={file_id}"
-                response = requests.get(download_url, timeout=60)
-                response.raise_for_status()
+                content = fetch_pdf(download_url, timeout=60).read_bytes()
                 
                 # Check if we got a confirmation page (large files)
-                if b'Google Drive - Virus scan warning' in response.content or b'download_warning' in response.content:
+                if b'Google Drive - Virus scan warning' in content or b'download_warning' in content:
                     # Extract confirmation token
-                    match = re.search(r'confirm=([^&]+)', response.text)
+                    match = re.search(rb'confirm=([^&]+)', content)
                     if match:
-                        confirm_token = match.group(1)
-                        download_url = f"https://drive.google.com/uc?export=download&id={file_id}&confirm={confirm_token}"
-                        response = requests.get(download_url, timeout=60)
-                        response.raise_for_status()
+                        confirm_token = match.group(1).decode()
+                        # Cached under the plain download URL, the token is different every time
+                        content = fetch_pdf(f"{download_url}&confirm={confirm_token}", timeout=60,
+                                            key=download_url).read_bytes()
                 
-                print(f"✓ Downloaded {len(response.content)} bytes")
-                return response.content
+                return content
                 
             except Exception as e:
                 print(f"✗ Error downloading from Google Drive: {e}")
@@ -185,10 +209,7 @@ class USAMWResultsScraper:
         else:
             # Direct URL
             try:
-                response = requests.get(url, timeout=60)
-                response.raise_for_status()
-                print(f"✓ Downloaded {len(response.content)} bytes")
-                return response.content
+                return fetch_pdf(url, timeout=60).read_bytes()
             except Exception as e:
                 print(f"✗ Error downloading file: {e}")
                 return None
@@ -324,46 +345,20 @@ class USAMWResultsScraper:
         Returns:
             List of cropped row images
         """
-        # Convert to grayscale for easier analysis
-        import numpy as np
-        
-        gray = image.convert('L')
-        img_array = np.array(gray)
-        
-        # Find rows with content (non-white regions)
-        row_has_content = []
-        for y in range(img_array.shape[0]):
-            # Check if row has any non-white pixels
-            has_content = np.any(img_array[y, :] < 250)
-            row_has_content.append(has_content)
-        
-        # Find boundaries of content blocks
-        rows = []
-        in_content = False
-        start_y = 0
-        
-        for y, has_content in enumerate(row_has_content):
-            if has_content and not in_content:
-                # Start of content block
-                start_y = y
-                in_content = True
-            elif not has_content and in_content:
-                # End of content block
-                if y - start_y >= min_row_height:
-                    rows.append((start_y, y))
-                in_content = False
-        
-        # Handle case where content goes to end of image
-        if in_content and len(row_has_content) - start_y >= min_row_height:
-            rows.append((start_y, len(row_has_content)))
-        
-        # Crop image into rows
-        row_images = []
-        for start_y, end_y in rows:
-            row_img = image.crop((0, start_y, image.width, end_y))
-            row_images.append(row_img)
-        
-        return row_images
+        return self.split_images_into_rows([image], min_row_height)[0]
+    
+    def split_images_into_rows(self, images: List[Image.Image], min_row_height: int = 40) -> List[List[Image.Image]]:
+        """
+        Split several page images into horizontal rows based on whitespace, finding the rows of all pages at once.
+        
+        Args:
+            images: PIL Images to split, they don't need to be the same size
+            min_row_height: Minimum height for a row
+            
+        Returns:
+            List of cropped row images for each image, in order
+        """
+        return split_into_rows(images, min_row_height)
     
     def extract_results_from_image(self, image: Image.Image, page_num: int) -> Optional[str]:
         """
@@ -503,7 +498,7 @@ Only output the CSV data, no explanations. DOUBLE-CHECK COLUMN ALIGNMENT FOR EVE
             print(f"✗ Error calling OpenAI API: {e}")
             return None
     
-    def parse_results_from_text_blocks(self, page_data: Dict[int, List[Dict]], meet_name: str, meet_date: str) -> List[Dict[str, Any]]:
+    def parse_results_from_text_blocks(self, page_data: Dict[int, List[Dict]], meet_name: str, meet_date: str) -> List[LiftingResultRow]:
         """
         Parse results from text blocks with color information (extracted directly from PDF).
         
@@ -513,7 +508,7 @@ Only output the CSV data, no explanations. DOUBLE-CHECK COLUMN ALIGNMENT FOR EVE
             meet_date: Date of the meet
             
         Returns:
-            List of result dictionaries
+            List of result rows
         """
         import re
         results = []
@@ -645,28 +640,19 @@ Only output the CSV data, no explanations. DOUBLE-CHECK COLUMN ALIGNMENT FOR EVE
                                 total = int(float(values[8]))
                                 
                                 # Calculate best lifts (highest positive value - as integers)
-                                snatch_best = max([v for v in [sn1, sn2, sn3] if v > 0], default=0)
-                                cj_best = max([v for v in [cj1, cj2, cj3] if v > 0], default=0)
+                                snatch_best = best_lift(sn1, sn2, sn3)
+                                cj_best = best_lift(cj1, cj2, cj3)
                                 
-                                result = {
-                                    'event_id': self.event_id,
-                                    'meet': meet_name,
-                                    'date': meet_date,
-                                    'name': name,
-                                    'age': current_age_category,
-                                    'body_weight': body_weight,
-                                    'snatch1': sn1,
-                                    'snatch2': sn2,
-                                    'snatch3': sn3,
-                                    'snatch_best': snatch_best,
-                                    'cj1': cj1,
-                                    'cj2': cj2,
-                                    'cj3': cj3,
-                                    'cj_best': cj_best,
-                                    'total': total,
-                                    'adaptive': self.adaptive,
-                                    'federation': 'USAMW'
-                                }
+                                result = LiftingResultRow(
+                                    self.event_id, meet_name, meet_date, name,
+                                    age=current_age_category,
+                                    body_weight=body_weight,
+                                    snatch1=sn1, snatch2=sn2, snatch3=sn3, snatch_best=snatch_best,
+                                    cj1=cj1, cj2=cj2, cj3=cj3, cj_best=cj_best,
+                                    total=total,
+                                    federation='USAMW',
+                                    adaptive=self.adaptive
+                                )
                                 
                                 results.append(result)
                                 print(f"    ✓ Parsed: {name} - Total: {total}kg")
@@ -684,7 +670,7 @@ Only output the CSV data, no explanations. DOUBLE-CHECK COLUMN ALIGNMENT FOR EVE
         print(f"  Total results parsed from text: {len(results)}")
         return results
     
-    def parse_csv_results(self, csv_text: str, meet_name: str, meet_date: str) -> List[Dict[str, Any]]:
+    def parse_csv_results(self, csv_text: str, meet_name: str, meet_date: str) -> List[LiftingResultRow]:
         """
         Parse CSV text from OpenAI into structured records.
         
@@ -694,7 +680,7 @@ Only output the CSV data, no explanations. DOUBLE-CHECK COLUMN ALIGNMENT FOR EVE
             meet_date: Date of the meet (YYYY-MM-DD)
             
         Returns:
-            List of result dictionaries
+            List of result rows
         """
         results = []
         lines = csv_text.strip().split('\n')
@@ -715,25 +701,20 @@ Only output the CSV data, no explanations. DOUBLE-CHECK COLUMN ALIGNMENT FOR EVE
                 continue
             
             try:
-                result = {
-                    'event_id': self.event_id,
-                    'meet': meet_name,
-                    'date': meet_date,
-                    'name': parts[0],
-                    'age': parts[1],
-                    'body_weight': float(parts[2]) if parts[2] else None,
-                    'snatch1': float(parts[3]) if parts[3] else None,
-                    'snatch2': float(parts[4]) if parts[4] else None,
-                    'snatch3': float(parts[5]) if parts[5] else None,
-                    'snatch_best': float(parts[6]) if parts[6] else None,
-                    'cj1': float(parts[7]) if parts[7] else None,
-                    'cj2': float(parts[8]) if parts[8] else None,
-                    'cj3': float(parts[9]) if parts[9] else None,
-                    'cj_best': float(parts[10]) if parts[10] else None,
-                    'total': float(parts[11]) if len(parts) > 11 and parts[11] else None,
-                    'adaptive': self.adaptive,
-                    'federation': 'USAMW'
-                }
+                result = LiftingResultRow(
+                    self.event_id, meet_name, meet_date, parts[0],
+                    age=parts[1],
+                    body_weight=parts[2],
+                    snatch1=parts[3], snatch2=parts[4], snatch3=parts[5], snatch_best=parts[6],
+                    cj1=parts[7], cj2=parts[8], cj3=parts[9], cj_best=parts[10],
+                    total=parts[11] if len(parts) > 11 else None,
+                    federation='USAMW',
+                    adaptive=self.adaptive
+                )
+                # A cell that isn't blank but didn't parse means the line isn't a result row
+                unreadable = [part for part in parts[2:12] if part and parse_number(part) is None]
+                if unreadable:
+                    raise ValueError(f"not a number: {unreadable[0]!r}")
                 
                 results.append(result)
                 
@@ -744,7 +725,7 @@ Only output the CSV data, no explanations. DOUBLE-CHECK COLUMN ALIGNMENT FOR EVE
         
         return results
     
-    def process_pdf_url(self, url: str, index: int) -> List[Dict[str, Any]]:
+    def process_pdf_url(self, url: str, index: int) -> List[LiftingResultRow]:
         """
         Process a single PDF from URL.
         
@@ -778,7 +759,44 @@ Only output the CSV data, no explanations. DOUBLE-CHECK COLUMN ALIGNMENT FOR EVE
         print(f"\n✓ Total results from PDF #{index + 1}: {len(all_results)}")
         return all_results
     
-    def dry_run(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def process_pdf_urls(self, urls: List[str]) -> List[LiftingResultRow]:
+        """
+        Process several PDFs: downloads run on a thread pool, and each PDF is handed to a process pool for
+        extraction and parsing as soon as it arrives. Results are merged in URL order, however the work finished.
+        
+        Returns:
+            List of result records from every PDF
+        """
+        if self.parse_workers == 1 or len(urls) == 1:
+            return [result for index, url in enumerate(urls) for result in self.process_pdf_url(url, index)]
+        
+        print(f"Downloading with {self.download_workers} threads, parsing with {self.parse_workers} processes...")
+        results_by_url = [[] for _ in urls]
+        # spawn rather than fork, the download threads are already running when the first worker starts
+        with ThreadPoolExecutor(max_workers=self.download_workers) as downloads, \
+                ProcessPoolExecutor(max_workers=min(self.parse_workers, len(urls)),
+                                    mp_context=multiprocessing.get_context("spawn")) as parsers:
+            download_futures = {downloads.submit(self.download_pdf_from_url, url): index
+                                for index, url in enumerate(urls)}
+            parse_futures = {}
+            for download in as_completed(download_futures):
+                index = download_futures[download]
+                pdf_bytes = download.result()
+                if pdf_bytes:
+                    parse_futures[parsers.submit(extract_and_parse_pdf, pdf_bytes, self.meet_name, self.meet_date,
+                                                 self.event_id, self.adaptive)] = index
+            
+            for parse in as_completed(parse_futures):
+                index = parse_futures[parse]
+                try:
+                    results_by_url[index] = parse.result()
+                    print(f"✓ Total results from PDF #{index + 1}: {len(results_by_url[index])}")
+                except Exception as e:
+                    print(f"✗ Error processing PDF #{index + 1} ({urls[index]}): {e}")
+        
+        return [result for results in results_by_url for result in results]
+    
+    def dry_run(self, results: List[LiftingResultRow]) -> Dict[str, Any]:
         """
         Perform a dry run - show what would be inserted without making changes.
         
@@ -792,31 +810,26 @@ Only output the CSV data, no explanations. DOUBLE-CHECK COLUMN ALIGNMENT FOR EVE
         if not self.supabase:
             self.setup_supabase_client()
         
-        to_insert = []
-        duplicates = []
-        
-        for result in results:
-            # Check if result exists by event_id, meet, name, and federation
-            try:
-                existing = self.supabase.table('lifting_results').select('id, name, meet').eq(
-                    'event_id', result['event_id']
-                ).eq(
-                    'meet', result['meet']
-                ).eq(
-                    'name', result['name']
-                ).eq(
-                    'federation', result['federation']
-                ).execute()
-                
-                if existing.data:
-                    # Duplicate found
-                    duplicates.append(result)
-                else:
-                    # New record
+        split = self.split_duplicates(results)
+        if split is not None:
+            to_insert, duplicates = split
+        else:
+            print("⚠ Checking results one at a time instead")
+            to_insert = []
+            duplicates = []
+            
+            for result in results:
+                # Check if result exists by event_id, meet, name, and federation
+                try:
+                    if self.is_duplicate(result):
+                        # Duplicate found
+                        duplicates.append(result)
+                    else:
+                        # New record
+                        to_insert.append(result)
+                except Exception as e:
+                    print(f"⚠ Error checking record: {e}")
                     to_insert.append(result)
-            except Exception as e:
-                print(f"⚠ Error checking record: {e}")
-                to_insert.append(result)
         
         # Print summary
         print(f"Summary:")
@@ -835,38 +848,23 @@ Only output the CSV data, no explanations. DOUBLE-CHECK COLUMN ALIGNMENT FOR EVE
                           'cj1', 'cj2', 'cj3', 'cj_best', 'total', 'adaptive', 'federation']
                 table_data = []
                 for result in to_insert:
-                    table_data.append([
-                        result['name'],
-                        result['age'],
-                        result['body_weight'],
-                        result['snatch1'],
-                        result['snatch2'],
-                        result['snatch3'],
-                        result['snatch_best'],
-                        result['cj1'],
-                        result['cj2'],
-                        result['cj3'],
-                        result['cj_best'],
-                        result['total'], 
-                        result['adaptive'],
-                        result['federation']
-                    ])
+                    table_data.append([getattr(result, column) for column in headers])
                 print(tabulate(table_data, headers=headers, tablefmt='grid'))
             else:
                 # Fallback to CSV format
                 print("event_id,meet,date,name,age,body_weight,snatch1,snatch2,snatch3,snatch_best,cj1,cj2,cj3,cj_best,total,adaptive,federation")
                 for result in to_insert:
-                    print(f"{result['event_id']},{result['meet']},{result['date']},{result['name']},{result['age']},"
-                          f"{result['body_weight']},{result['snatch1']},{result['snatch2']},{result['snatch3']},{result['snatch_best']},"
-                          f"{result['cj1']},{result['cj2']},{result['cj3']},{result['cj_best']},{result['total']},"
-                          f"{result['adaptive']},{result['federation']}")
+                    print(f"{result.event_id},{result.meet},{result.date},{result.name},{result.age},"
+                          f"{result.body_weight},{result.snatch1},{result.snatch2},{result.snatch3},{result.snatch_best},"
+                          f"{result.cj1},{result.cj2},{result.cj3},{result.cj_best},{result.total},"
+                          f"{result.adaptive},{result.federation}")
             print()
         
         if duplicates:
             print("⚠ DUPLICATE Records (will NOT be inserted):")
             print()
             for dup in duplicates:
-                print(f"  ✗ {dup['name']} - Event ID: {dup['event_id']}, Meet: {dup['meet']}, Federation: {dup['federation']}")
+                print(f"  ✗ {dup.name} - Event ID: {dup.event_id}, Meet: {dup.meet}, Federation: {dup.federation}")
             print()
         
         return {
@@ -875,74 +873,112 @@ Only output the CSV data, no explanations. DOUBLE-CHECK COLUMN ALIGNMENT FOR EVE
             'total': len(results)
         }
     
-    def fetch_max_id_from_supabase(self) -> int:
-        """Fetch the highest ID value from the Supabase database."""
-        if not self.supabase:
-            self.setup_supabase_client()
+    def fetch_existing_names(self, event_id: str, meet: str, federation: str) -> Optional[Set[str]]:
+        """
+        Names already in the database for one meet, read a page at a time so meets with more lifters than
+        one page are read in full.
         
+        Returns:
+            Set of lifter names, or None if the lookup failed
+        """
+        names = set()
+        start = 0
         try:
-            response = self.supabase.table('lifting_results').select('id').order('id', desc=True).limit(1).execute()
-            if response.data and len(response.data) > 0:
-                return response.data[0]['id']
-            return 0
+            while True:
+                response = self.supabase.table('lifting_results').select('name').eq(
+                    'event_id', event_id
+                ).eq(
+                    'meet', meet
+                ).eq(
+                    'federation', federation
+                ).order('id').range(start, start + SUPABASE_PAGE_SIZE - 1).execute()
+                
+                names.update(row['name'] for row in response.data)
+                if len(response.data) < SUPABASE_PAGE_SIZE:
+                    return names
+                start += SUPABASE_PAGE_SIZE
         except Exception as e:
-            print(f"⚠ Error fetching max ID from Supabase: {e}")
-            return 0
+            print(f"⚠ Error fetching existing results for event {event_id} ({meet}): {e}")
+            return None
     
-    def insert_to_supabase(self, results: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    def split_duplicates(self, results: List[LiftingResultRow]) -> Optional[Tuple[List[LiftingResultRow], List[LiftingResultRow]]]:
         """
-        Insert results to Supabase (skips duplicates).
+        Split results into new rows and duplicates (same event_id, meet, name and federation), with one paged
+        query per meet instead of one per row. A result repeated within this run counts as a duplicate too.
         
         Returns:
-            Dictionary with 'inserted' and 'skipped' lists
+            (to_insert, duplicates), or None if existing results couldn't be read
         """
-        if not self.supabase:
-            self.setup_supabase_client()
+        existing_names: Dict[Tuple[str, str, str], Set[str]] = {}
+        to_insert = []
+        duplicates = []
         
-        # Fetch the max ID to start incrementing from
-        max_id = self.fetch_max_id_from_supabase()
-        next_id = max_id + 1
-        print(f"Starting inserts from ID: {next_id}")
+        for result in results:
+            meet_key = (result.event_id, result.meet, result.federation)
+            if meet_key not in existing_names:
+                names = self.fetch_existing_names(*meet_key)
+                if names is None:
+                    return None
+                existing_names[meet_key] = names
+            
+            names = existing_names[meet_key]
+            if result.name in names:
+                duplicates.append(result)
+            else:
+                names.add(result.name)
+                to_insert.append(result)
         
-        inserted = []
-        skipped = []
+        return to_insert, duplicates
+    
+    def is_duplicate(self, result: LiftingResultRow) -> bool:
+        """Check a single result against the database (the row by row fallback)."""
+        existing = self.supabase.table('lifting_results').select('id, name, meet').eq(
+            'event_id', result.event_id
+        ).eq(
+            'meet', result.meet
+        ).eq(
+            'name', result.name
+        ).eq(
+            'federation', result.federation
+        ).execute()
+        return bool(existing.data)
+    
+    def insert_to_supabase(self, results: List[LiftingResultRow]) -> Dict[str, List[LiftingResultRow]]:
+        """
+        Upsert results to Supabase (skips duplicates).
         
-        for result in results:
-            try:
-                # Check if duplicate exists (event_id, meet, name, federation)
-                existing = self.supabase.table('lifting_results').select('id, name, meet').eq(
-                    'event_id', result['event_id']
-                ).eq(
-                    'meet', result['meet']
-                ).eq(
-                    'name', result['name']
-                ).eq(
-                    'federation', result['federation']
-                ).execute()
-                
-                if existing.data and len(existing.data) > 0:
-                    # Duplicate found - skip insert
-                    skipped.append(result)
-                    print(f"  ✗ SKIPPED (duplicate): {result['name']} - Event ID: {result['event_id']}, Meet: {result['meet']}")
-                else:
-                    # Prepare data with manually assigned ID
-                    data = {k: v for k, v in result.items() if k not in ['created_at']}
-                    data['id'] = next_id
-                    
-                    # Insert new record
-                    insert_response = self.supabase.table('lifting_results').insert(data).execute()
-                    inserted.append(result)
-                    print(f"  ✓ Inserted: {result['name']} (ID: {next_id})")
-                    next_id += 1
-                    
-            except Exception as e:
-                error_detail = str(e)
-                print(f"✗ Error inserting {result.get('name', 'unknown')}: {error_detail}")
-                skipped.append(result)
+        Duplicates are found with one query per meet and new results are upserted in one writer call, which sends
+        them INSERT_BATCH_SIZE at a time on (event_id, name, federation) with ids generated by the database. Results
+        in a batch that failed are counted as skipped. If the existing results can't be read, every result is
+        upserted, which leaves rows already there as they were.
+        
+        Returns:
+            Dictionary with 'inserted' and 'skipped' lists
+        """
+        if not self.writer:
+            self.setup_supabase_client()
+        
+        split = self.split_duplicates(results)
+        if split is None:
+            print("⚠ Upserting every result instead, rows already in the database are matched on their natural key")
+            to_insert, skipped = results, []
+        else:
+            to_insert, skipped = split
+        for result in skipped:
+            print(f"  ✗ SKIPPED (duplicate): {result.name} - Event ID: {result.event_id}, Meet: {result.meet}")
+        
+        upsert_result = self.writer.upsert(to_insert)
+        failed_keys = set(upsert_result.failed_keys)
+        inserted = [result for result in to_insert if result.key not in failed_keys]
+        skipped.extend(result for result in to_insert if result.key in failed_keys)
+        if inserted:
+            print(f"  ✓ Inserted {len(inserted)} results")
+        if not upsert_result.ok:
+            print(f"✗ Error inserting {upsert_result.rows_failed} results: {'; '.join(upsert_result.failed_chunks)}")
         
         return {'inserted': inserted, 'skipped': skipped}
     
-    def send_slack_notification(self, inserted: List[Dict[str, Any]], skipped: List[Dict[str, Any]]):
+    def send_slack_notification(self, inserted: List[LiftingResultRow], skipped: List[LiftingResultRow]):
         """Send Slack notification with insert summary."""
         if not self.slack_webhook_url:
             print("⚠ Slack webhook not configured, skipping notification")
@@ -964,7 +1000,7 @@ Only output the CSV data, no explanations. DOUBLE-CHECK COLUMN ALIGNMENT FOR EVE
         if inserted:
             message += f"\n\n*New Results ({len(inserted)}):*\n"
             inserted_text = "\n".join([
-                f"• {r['name']} - {r['age']} - Total: {r['total']}kg"
+                f"• {r.name} - {r.age} - Total: {r.total}kg"
                 for r in inserted[:10]  # Limit to first 10
             ])
             message += inserted_text
@@ -975,7 +1011,7 @@ Only output the CSV data, no explanations. DOUBLE-CHECK COLUMN ALIGNMENT FOR EVE
         if skipped:
             message += f"\n\n*Skipped Duplicates ({len(skipped)}):*\n"
             skipped_text = "\n".join([
-                f"• {r['name']} - {r['meet']}"
+                f"• {r.name} - {r.meet}"
                 for r in skipped[:10]  # Limit to first 10
             ])
             message += skipped_text
@@ -1022,11 +1058,8 @@ Only output the CSV data, no explanations. DOUBLE-CHECK COLUMN ALIGNMENT FOR EVE
         if limit_files:
             valid_urls = valid_urls[:limit_files]
         
-        # Process each PDF
-        all_results = []
-        for i, url in enumerate(valid_urls):
-            results = self.process_pdf_url(url, i)
-            all_results.extend(results)
+        # Process the PDFs, several at once
+        all_results = self.process_pdf_urls(valid_urls)
         
         if not all_results:
             print("\n✗ No results extracted. Exiting.")
@@ -1051,6 +1084,17 @@ Only output the CSV data, no explanations. DOUBLE-CHECK COLUMN ALIGNMENT FOR EVE
             self.send_slack_notification(result['inserted'], result['skipped'])
 
 
+def extract_and_parse_pdf(pdf_bytes: bytes, meet_name: str, meet_date: str, event_id: str,
+                          adaptive: bool) -> List[LiftingResultRow]:
+    """Process pool worker: extract the text spans from one downloaded PDF and parse them into result rows."""
+    scraper = USAMWResultsScraper([], meet_name, meet_date, event_id, adaptive)
+    page_data = scraper.extract_text_with_color_from_pdf(pdf_bytes)
+    if not page_data:
+        print("✗ No text data extracted")
+        return []
+    return scraper.parse_results_from_text_blocks(page_data, meet_name, meet_date)
+
+
 def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(
@@ -1067,6 +1111,12 @@ def main():
         default=None,
         help='Limit number of PDF files to process (for testing)'
     )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=PARSE_WORKERS,
+        help=f'Processes extracting and parsing PDFs at once, 1 for one at a time (default: {PARSE_WORKERS})'
+    )
     
     args = parser.parse_args()
     
@@ -1089,7 +1139,7 @@ def main():
     print(f"  Adaptive: {ADAPTIVE}")
     print(f"  PDF URLs: {len(PDF_URLS)}\n")
     
-    scraper = USAMWResultsScraper(PDF_URLS, MEET_NAME, MEET_DATE, EVENT_ID, ADAPTIVE)
+    scraper = USAMWResultsScraper(PDF_URLS, MEET_NAME, MEET_DATE, EVENT_ID, ADAPTIVE, parse_workers=args.workers)
     scraper.run(dry_run=args.dry_run, limit_files=args.limit)
 
 
@@ -25,6 +25,9 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'shared'))
+from pdf_cache import fetch_pdf
+
 try:
     from supabase import create_client, Client
 except ImportError:
@@ -67,18 +70,12 @@ class WSORecordsNewYorkScraper:
             print("✓ Slack webhook configured")
     
     def download_pdf(self):
-        """Download PDF from URL."""
+        """Download PDF from URL (or the cache, if it hasn't changed) to pdf_path."""
         print(f"Downloading PDF from {self.pdf_url}...")
-        
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-        }
-        
-        response = requests.get(self.pdf_url, headers=headers, timeout=30)
-        response.raise_for_status()
+        pdf = fetch_pdf(self.pdf_url)
         
         with open(self.pdf_path, 'wb') as f:
-            f.write(response.content)
+            f.write(pdf.read_bytes())
         
         print(f"✓ PDF downloaded to {self.pdf_path}")
     